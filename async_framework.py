@@ -0,0 +1,1086 @@
+# -*- coding: utf-8 -*-
+"""基于asyncio的Playwright测试框架
+
+与test_framework中的同步框架一一对应：AsyncBaseTestModule + 各混入类 + AsyncTestRunner。
+一个事件循环共享一个浏览器，同时驱动多个页面/路由器，各模块的等待可以相互重叠。
+
+命名空间、分页、命名空间过滤校验、导入文件过滤、导出文件的sha256等逻辑直接复用同步框架的实现，
+这里只有需要await浏览器的部分。现有的同步模块通过SyncModuleAdapter在线程中运行，无需改写。
+"""
+import asyncio
+import os
+import shutil
+import time
+from abc import abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from playwright.async_api import async_playwright, expect, Page, Locator
+
+from router_api import base_url_from_router_url
+from test_framework import (
+    BaseTestModule, FormField, FormOperationsMixin, FormSchema, ImportExportMixin, RouterTable,
+    RouterTestConfig, SessionStore, TableOperationsMixin, TableRow, TestRunner, WaitEngine, instrument_step,
+    EMPTY_TABLE_WORDS, FIRST_PAGE_SELECTORS, MODAL_SELECTORS, NEXT_PAGE_SELECTORS, TABLE_HEADER_WORDS,
+    _ANY_VISIBLE_JS, _DATA_ROW_COUNT_JS, _DOM_QUIET_JS, _FORM_FILL_JS, _TABLE_PAGER_JS, _TABLE_SNAPSHOT_JS,
+)
+
+class AsyncWaitEngine(WaitEngine):
+    """异步条件等待引擎 - 统计逻辑与WaitEngine共用，等待方法为协程"""
+
+    async def until(self, condition: Callable, timeout: float = None,
+                    legacy_sleep: float = 0.0, description: str = "") -> bool:
+        """轮询条件直到满足或超时，condition可以是普通函数或协程函数
+
+        轮询间隔用asyncio.sleep，期间事件循环继续驱动其他模块。
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        satisfied = False
+        while True:
+            # 条件里没有经过计数的调用时按一次往返计
+            before = self.round_trips.count
+            try:
+                result = condition()
+                if asyncio.iscoroutine(result):
+                    result = await result
+                satisfied = bool(result)
+            except Exception:
+                satisfied = False
+            if self.round_trips.count == before:
+                self.round_trips.add()
+            if satisfied or time.perf_counter() - start >= timeout:
+                break
+            await asyncio.sleep(self.poll_interval)
+        self._record(description, legacy_sleep, time.perf_counter() - start, satisfied)
+        return satisfied
+
+    async def pause(self, seconds: float, description: str = "固定等待", legacy_sleep: float = None):
+        """无法用条件替代的固定等待（同样计入统计），legacy_sleep默认与seconds相同"""
+        await asyncio.sleep(seconds)
+        self._record(description, seconds if legacy_sleep is None else legacy_sleep, seconds, True)
+
+    async def for_action_call(self, marker: int, timeout: float = None, legacy_sleep: float = 0.0,
+                              description: str = "/Action/call响应") -> bool:
+        """等待marker之后的/Action/call响应"""
+        return await self.until(lambda: self.has_action_call_since(marker), timeout, legacy_sleep, description)
+
+    async def row_count(self) -> int:
+        """当前表格数据行数"""
+        self.round_trips.add()
+        return await self.page.evaluate(_DATA_ROW_COUNT_JS, [TABLE_HEADER_WORDS, EMPTY_TABLE_WORDS])
+
+    async def for_row_count_change(self, previous: int, timeout: float = None, legacy_sleep: float = 0.0,
+                                   description: str = "表格行数变化") -> bool:
+        """等待表格数据行数与previous不同"""
+        async def changed():
+            return await self.row_count() != previous
+        return await self.until(changed, timeout, legacy_sleep, description)
+
+    async def for_row_count(self, expected: int, timeout: float = None, legacy_sleep: float = 0.0,
+                            description: str = "表格行数达到预期") -> bool:
+        """等待表格数据行数等于expected"""
+        async def reached():
+            return await self.row_count() == expected
+        return await self.until(reached, timeout, legacy_sleep, description)
+
+    async def is_visible(self, selector: str) -> bool:
+        """一次evaluate判断选择器是否有可见元素（仅支持CSS选择器）"""
+        self.round_trips.add()
+        return await self.page.evaluate(_ANY_VISIBLE_JS, selector)
+
+    async def for_visible(self, selector: str, timeout: float = None, legacy_sleep: float = 0.0,
+                          description: str = "元素出现") -> bool:
+        """等待Playwright选择器匹配到的第一个元素可见"""
+        timeout = self.default_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        self.round_trips.add()
+        try:
+            await self.page.locator(selector).first.wait_for(state="visible", timeout=timeout * 1000)
+            satisfied = True
+        except Exception:
+            satisfied = False
+        self._record(description, legacy_sleep, time.perf_counter() - start, satisfied)
+        return satisfied
+
+    async def for_modal(self, timeout: float = None, legacy_sleep: float = 0.0,
+                        description: str = "弹窗出现") -> bool:
+        """等待确认弹窗出现"""
+        return await self.until(lambda: self.is_visible(MODAL_SELECTORS), timeout, legacy_sleep, description)
+
+    async def for_modal_gone(self, timeout: float = None, legacy_sleep: float = 0.0,
+                             description: str = "弹窗消失") -> bool:
+        """等待所有弹窗消失"""
+        async def gone():
+            return not await self.is_visible(MODAL_SELECTORS)
+        return await self.until(gone, timeout, legacy_sleep, description)
+
+    async def for_dom_quiet(self, quiet_ms: int = 300, timeout: float = None, legacy_sleep: float = 0.0,
+                            description: str = "DOM静默") -> bool:
+        """等待DOM在quiet_ms毫秒内没有任何变更"""
+        timeout = self.default_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        self.round_trips.add()
+        try:
+            await self.page.wait_for_function(_DOM_QUIET_JS, arg=quiet_ms, timeout=timeout * 1000, polling=50)
+            satisfied = True
+        except Exception:
+            satisfied = False
+        self._record(description, legacy_sleep, time.perf_counter() - start, satisfied)
+        return satisfied
+
+class AsyncBaseTestModule(BaseTestModule):
+    """异步基础测试模块抽象类
+
+    命名空间、步骤计时事件、往返计数和选择器缓存与BaseTestModule共用，
+    访问浏览器的方法改为协程；子类的step*方法和run_full_test写成协程即可，同样自动计时。
+    """
+
+    def setup(self, page: Page):
+        """设置页面对象"""
+        if self.waits:
+            self.waits.close()
+        self.page = page
+        self.waits = AsyncWaitEngine(page, round_trips=self.round_trips)
+
+    async def find_element(self, name: str, selectors: List[str], scope=None, visible: bool = True,
+                           accept: Callable = None) -> Optional[Tuple[str, Locator]]:
+        """按学习结果查找元素，返回(命中的选择器, 元素)；accept可以是协程函数"""
+        scope = scope or self.page
+        key = self._selector_cache_key(name)
+        cached = self.selector_cache.get(key)
+        ordered = list(selectors)
+        if cached in ordered:
+            ordered.remove(cached)
+            ordered.insert(0, cached)
+
+        for selector in ordered:
+            try:
+                candidates = scope.locator(selector)
+                self.round_trips.add()
+                for i in range(await candidates.count()):
+                    element = candidates.nth(i)
+                    if visible:
+                        self.round_trips.add()
+                        if not await element.is_visible():
+                            continue
+                    if accept:
+                        accepted = accept(selector, element)
+                        if asyncio.iscoroutine(accepted):
+                            accepted = await accepted
+                        if not accepted:
+                            continue
+                    if selector == cached:
+                        self.selector_cache.hits += 1
+                    else:
+                        self.selector_cache.misses += 1
+                        self.selector_cache.learn(key, selector)
+                    return selector, element
+            except Exception:
+                continue
+
+        if cached:
+            self.selector_cache.misses += 1
+            self.selector_cache.forget(key)
+        return None
+
+    async def snapshot_table(self, selector: str = 'table') -> RouterTable:
+        """一次性读取当前页面表格"""
+        self.round_trips.add()
+        return RouterTable.from_snapshot(await self.page.evaluate(_TABLE_SNAPSHOT_JS, selector))
+
+    @abstractmethod
+    async def navigate_to_module(self):
+        """导航到模块页面"""
+        pass
+
+    async def login(self):
+        """通用登录功能（优先复用已保存的登录态）"""
+        print(f"步骤1: 登录")
+        if self.session_restored and await self._validate_session():
+            print("登录成功（复用已保存的登录态）")
+            return
+
+        await self.page.goto(self.config.router_url)
+        await self.page.get_by_placeholder("用户名").fill(self.config.username)
+        await self.page.get_by_placeholder("密码").fill(self.config.password)
+        await self.page.get_by_role("button", name="登录").click()
+        await expect(self.page.locator('a:has-text("系统概况")')).to_be_visible(timeout=10000)
+        print("登录成功")
+
+        if getattr(self.config, "reuse_session", False) and await self._save_session():
+            print("💾 已保存登录态，后续模块将复用")
+
+    async def _save_session(self) -> Optional[str]:
+        """保存登录态（与SessionStore.save相同的文件；同一进程内可能有多个模块同时保存，临时文件带上实例id）"""
+        store = SessionStore(self.config.session_state_dir)
+        path = store.path_for(self.config)
+        temp_file = f"{path}.{os.getpid()}.{id(self)}.tmp"
+        try:
+            os.makedirs(store.state_dir, exist_ok=True)
+            await self.page.context.storage_state(path=temp_file)
+            os.replace(temp_file, path)
+            return path
+        except Exception as e:
+            print(f"⚠️  保存登录态失败: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            return None
+
+    async def _validate_session(self) -> bool:
+        """打开首页，看到"系统概况"说明登录态有效，看到登录框说明已过期"""
+        home = self.page.locator('a:has-text("系统概况")')
+        login_box = self.page.get_by_placeholder("用户名")
+        try:
+            await self.page.goto(base_url_from_router_url(self.config.router_url) + '/')
+
+            async def either_visible():
+                return await home.first.is_visible() or await login_box.first.is_visible()
+
+            await self.waits.until(either_visible, timeout=10, description="校验登录态")
+            if await home.first.is_visible():
+                return True
+        except Exception as e:
+            print(f"⚠️  校验登录态出错: {e}")
+        print("⚠️  登录态已过期，重新登录")
+        SessionStore(self.config.session_state_dir).discard(self.config)
+        return False
+
+class AsyncTableOperationsMixin:
+    """异步表格操作混入类（分页、命名空间过滤与TableOperationsMixin一致）"""
+
+    # 不访问浏览器的部分直接复用同步实现
+    reserve_router_subnets = TableOperationsMixin.reserve_router_subnets
+    _check_namespace_filter = TableOperationsMixin._check_namespace_filter
+
+    async def table_pager(self) -> Dict[str, Any]:
+        """读取表格分页信息 {total, page, hasNext}，没有分页控件时total/page为None"""
+        try:
+            self.round_trips.add()
+            return await self.page.evaluate(_TABLE_PAGER_JS) or {}
+        except Exception:
+            return {}
+
+    async def goto_table_page(self, which: str = "next") -> bool:
+        """翻到下一页（next）或第一页（first），页码变化后返回True"""
+        pager = await self.table_pager()
+        current = pager.get("page")
+        if which == "first" and current in (None, 1):
+            return True
+        if which == "next" and not pager.get("hasNext"):
+            return False
+
+        name, selectors = ("分页下一页", NEXT_PAGE_SELECTORS) if which == "next" else ("分页第一页", FIRST_PAGE_SELECTORS)
+        found = await self.find_element(name, selectors)
+        if not found:
+            print(f"⚠️  未找到{name}按钮")
+            return False
+        try:
+            await found[1].click()
+        except Exception as e:
+            print(f"⚠️  点击{name}失败: {e}")
+            return False
+
+        async def page_changed():
+            page = (await self.table_pager()).get("page")
+            return page == 1 if which == "first" else page != current
+
+        return await self.waits.until(page_changed, timeout=10, description=f"{name}加载")
+
+    async def iter_table_rows(self, selector: str = 'table', from_first: bool = True, max_pages: int = None,
+                              current: RouterTable = None):
+        """逐页读取表格数据行的异步生成器（用async for遍历），翻页规则同TableOperationsMixin.iter_table_rows"""
+        if from_first and current is None:
+            await self.goto_table_page("first")
+        pages = 0
+        while True:
+            table = current if current is not None else await self.snapshot_table(selector)
+            current = None
+            pages += 1
+            for row in table:
+                yield row
+            if max_pages and pages >= max_pages:
+                return
+            if not await self.goto_table_page("next"):
+                return
+
+    async def find_table_row(self, predicate: Callable[[TableRow], bool], selector: str = 'table') -> Optional[TableRow]:
+        """逐页查找第一条满足条件的数据行，找到后停止翻页"""
+        async for row in self.iter_table_rows(selector):
+            if predicate(row):
+                return row
+        return None
+
+    async def count_table_rows(self, selector: str = 'table') -> int:
+        """表格数据总行数：优先读取分页显示的总条数，否则逐页统计"""
+        total = (await self.table_pager()).get("total")
+        if total is not None:
+            return total
+        return len([row async for row in self.iter_table_rows(selector)])
+
+    async def count_configs(self, table: RouterTable = None) -> int:
+        """统计当前命名空间的配置行数（不传table时包含所有分页）"""
+        if table is not None:
+            return TableOperationsMixin.count_configs(self, table)
+        if not self.namespace:
+            return await self.count_table_rows()
+        return len([row async for row in self.iter_table_rows() if self.namespace in row.text])
+
+    async def reserve_existing_values(self, allocator) -> List[TableRow]:
+        """把路由器自身网段和表格（所有分页）中已有的名称、MAC和IP登记到分配器"""
+        self.reserve_router_subnets(allocator)
+        rows = [row async for row in self.iter_table_rows()]
+        for row in rows:
+            allocator.reserve(names=row.cells)
+            allocator.reserve_values(row.cells)
+        print(f"🧮 已登记路由器上现有的 {len(rows)} 条配置，分配时跳过")
+        return rows
+
+    async def filter_to_namespace(self) -> bool:
+        """用搜索框只显示当前命名空间的配置，之后的全选/批量操作只作用于这些行"""
+        if not self.namespace:
+            return True
+        print(f"🏷️ 按命名空间过滤表格: {self.namespace}")
+        search_input = await self._find_search_input()
+        if not search_input or not await self._perform_search(search_input, self.namespace):
+            print("❌ 无法按命名空间过滤，为避免影响其他数据，跳过批量操作")
+            return False
+        return self._check_namespace_filter(await self.snapshot_table())
+
+    @instrument_step()
+    async def select_all_configs(self, operation_name: str = "操作") -> bool:
+        """通用的全选配置功能"""
+        if not await self.filter_to_namespace():
+            return False
+        scope = f"命名空间 {self.namespace} 的" if self.namespace else "所有"
+        print(f"🔲 点击表头全选框，选中{scope}配置...")
+
+        select_all_selectors = [
+            'th:last-child input[type="checkbox"]',
+            'input.chk_all',
+            'thead th:last-child input, tr:first-child th:last-child input',
+            'thead th:last-child label, tr:first-child th:last-child label',
+            'thead th:last-child span, tr:first-child th:last-child span'
+        ]
+
+        found = await self.find_element("表头全选框", select_all_selectors)
+        if not found:
+            print(f"❌ 无法找到全选框，跳过{operation_name}")
+            return False
+
+        try:
+            selector, checkbox = found
+            await checkbox.scroll_into_view_if_needed()
+            await checkbox.click()
+            print(f"✅ 成功点击表头全选框: {selector}")
+        except Exception as e:
+            print(f"❌ 点击全选框失败: {e}")
+            return False
+
+        await self.waits.for_dom_quiet(200, legacy_sleep=1, description="全选后DOM静默")
+        print("✅ 全选操作完成")
+        return True
+
+    @instrument_step()
+    async def batch_operation(self, operation_type: str, button_selectors: List[str]) -> bool:
+        """通用批量操作"""
+        print(f"🔄 执行批量{operation_type}操作...")
+
+        marker = self.waits.mark()
+        found = await self.find_element(f"批量{operation_type}按钮", button_selectors)
+        if not found:
+            print(f"❌ 未找到批量{operation_type}按钮")
+            return False
+
+        try:
+            button = found[1]
+            await button.scroll_into_view_if_needed()
+            await button.click()
+            print(f"✅ 成功点击批量{operation_type}按钮")
+        except Exception as e:
+            print(f"❌ 点击批量{operation_type}按钮失败: {e}")
+            return False
+
+        # 操作生效的标志：弹出确认框（删除）或收到/Action/call响应（启用/停用）
+        async def responded():
+            return self.waits.has_action_call_since(marker) or await self.waits.is_visible(MODAL_SELECTORS)
+
+        await self.waits.until(responded, timeout=5, legacy_sleep=2, description=f"批量{operation_type}响应")
+        print(f"✅ 批量{operation_type}操作执行完成")
+        return True
+
+    @instrument_step()
+    async def batch_delete_all_configs(self, need_select_all: bool = True) -> bool:
+        """批量删除所有配置
+
+        表格分页时全选只选中当前页，每删除一页后继续删除剩余的配置，直到清空或不再减少。
+        """
+        print("🗑️ 执行批量删除所有配置...")
+
+        while True:
+            deleted, total_before = await self._delete_selected_page(need_select_all)
+            if not deleted:
+                return False
+
+            try:
+                row_count = await self.count_configs()
+                print(f"🔍 删除后剩余配置数量: {row_count}")
+
+                if row_count == 0:
+                    print("✅ 所有配置已成功删除")
+                    return True
+                if total_before is None or row_count >= total_before:
+                    print(f"⚠️  仍有 {row_count} 个配置未删除")
+                    return False
+
+                print(f"📄 表格分页，继续删除剩余的 {row_count} 个配置")
+                need_select_all = True
+
+            except Exception as e:
+                print(f"检查删除结果时出错: {e}")
+                return False
+
+    async def _delete_selected_page(self, need_select_all: bool) -> Tuple[bool, Optional[int]]:
+        """全选当前页并删除，返回(是否完成删除操作, 删除前分页显示的总条数)"""
+        if need_select_all:
+            if not await self.select_all_configs("批量删除"):
+                return False, None
+        else:
+            print("🔲 全选框已选中，跳过全选步骤")
+
+        delete_selectors = [
+            'a:has-text("删除")',
+            'button:has-text("删除")',
+            '.btn:has-text("删除")',
+            'input[value="删除"]'
+        ]
+
+        total_before = (await self.table_pager()).get("total")
+        if not await self.batch_operation("删除", delete_selectors):
+            return False, total_before
+
+        # 处理确认弹窗
+        await self.waits.for_modal(timeout=5, legacy_sleep=1)
+        marker = self.waits.mark()
+        try:
+            found_modal = await self.find_element("删除确认弹窗", MODAL_SELECTORS.split(', '))
+            found_confirm = None
+            if found_modal:
+                print(f"✅ 找到确认弹窗")
+                confirm_selectors = [
+                    'button:has-text("确定")',
+                    'button:has-text("删除")',
+                    'button.el-button--primary',
+                    '.btn-primary'
+                ]
+                found_confirm = await self.find_element("删除确认按钮", confirm_selectors, scope=found_modal[1])
+            if not found_confirm:
+                print("❌ 未找到确认弹窗")
+                return False, total_before
+            await found_confirm[1].click()
+            print(f"✅ 点击确定删除按钮")
+        except Exception as e:
+            print(f"处理确认弹窗时出错: {e}")
+            return False, total_before
+
+        await self.waits.for_action_call(marker, timeout=10, legacy_sleep=1, description="批量删除响应")
+        await self.waits.for_modal_gone(timeout=5, legacy_sleep=1)
+
+        # 不分页时表格清空；分页时下一页的数据会补上来，以总条数变化为准
+        async def refreshed():
+            if await self.waits.row_count() == 0:
+                return True
+            return total_before is not None and (await self.table_pager()).get("total") != total_before
+
+        await self.waits.until(refreshed, timeout=5, legacy_sleep=1, description="删除后表格刷新")
+        print("✅ 批量删除操作执行完成")
+        return True, total_before
+
+class AsyncSearchOperationsMixin:
+    """异步搜索操作混入类"""
+
+    @instrument_step()
+    async def search_function_test(self, test_cases: List[Dict[str, str]], clear_after_each: bool = True):
+        """通用搜索功能测试，test_cases格式同SearchOperationsMixin.search_function_test"""
+        print("🔍 开始搜索功能验证...")
+        search_input = await self._find_search_input()
+        if not search_input:
+            print("❌ 未找到搜索框，跳过搜索测试")
+            return False
+
+        all_passed = True
+        for i, test_case in enumerate(test_cases, 1):
+            field = test_case.get('field', '')
+            value = test_case.get('value', '')
+            description = test_case.get('description', f'测试用例{i}')
+            print(f"\n🔍 搜索测试 {i}/{len(test_cases)}: {description}")
+            print(f"   搜索字段: {field}, 搜索值: {value}")
+
+            if not await self._perform_search(search_input, value):
+                print(f"❌ 搜索操作失败")
+                all_passed = False
+            elif await self._verify_search_results(value, field):
+                print(f"✅ 搜索测试通过: 找到包含 '{value}' 的结果")
+            else:
+                print(f"❌ 搜索测试失败: 结果中未找到包含 '{value}' 的内容")
+                all_passed = False
+
+            if clear_after_each and i < len(test_cases):
+                await self._clear_search(search_input)
+                await self.waits.for_dom_quiet(300, legacy_sleep=1, description="清空搜索后DOM静默")
+
+        print(f"\n🧹 清空搜索框，显示所有结果...")
+        await self._clear_search(search_input)
+        await self.waits.for_dom_quiet(300, legacy_sleep=2, description="清空搜索后DOM静默")
+        print("✅ 所有搜索测试都通过" if all_passed else "⚠️  部分搜索测试失败")
+        return all_passed
+
+    async def _find_search_input(self):
+        """查找搜索输入框"""
+        search_selectors = [
+            'input[placeholder*="搜索"]',
+            'input[placeholder*="查找"]',
+            'input.search_inpt',
+            'input[name="searchText"]',
+            'input[type="text"].search',
+            '.search input[type="text"]',
+            '.search-box input',
+            'input[class*="search"]'
+        ]
+        found = await self.find_element("搜索框", search_selectors)
+        if found:
+            print(f"✅ 找到搜索框: {found[0]}")
+            return found[1]
+        print("❌ 未找到搜索输入框")
+        return None
+
+    async def _perform_search(self, search_input, search_value: str) -> bool:
+        """执行搜索操作（回车触发，找到搜索按钮时再点一次）"""
+        try:
+            await search_input.clear()
+            await search_input.fill(search_value)
+            await search_input.press('Enter')
+            await self.waits.for_dom_quiet(300, legacy_sleep=2, description="搜索后DOM静默")
+
+            search_button_selectors = [
+                'button:has-text("搜索")',
+                'button:has-text("查找")',
+                'input[value="搜索"]',
+                '.search-btn',
+                '.search_icon',
+                'button[type="submit"]'
+            ]
+            found = await self.find_element("搜索按钮", search_button_selectors)
+            if found:
+                try:
+                    await found[1].click()
+                    print(f"✅ 点击搜索按钮")
+                except Exception:
+                    pass
+
+            await self.waits.for_dom_quiet(300, legacy_sleep=2, description="搜索后DOM静默")
+            return True
+        except Exception as e:
+            print(f"❌ 搜索操作失败: {e}")
+            return False
+
+    async def _verify_search_results(self, search_value: str, target_field: str = "") -> bool:
+        """验证搜索结果"""
+        try:
+            table = await self.snapshot_table()
+            if len(table.rows) == 0:
+                print(f"⚠️  搜索结果为空")
+                return False
+            found_matching_results = False
+            for row in table:
+                if search_value.lower() in row.text.lower():
+                    found_matching_results = True
+                    print(f"   ✓ 找到匹配行: {row.text[:100]}...")
+                else:
+                    print(f"   ⚠️  发现不匹配行: {row.text[:100]}...")
+            return found_matching_results
+        except Exception as e:
+            print(f"❌ 验证搜索结果时出错: {e}")
+            return False
+
+    async def _clear_search(self, search_input):
+        """清空搜索框"""
+        try:
+            await search_input.clear()
+            await search_input.press('Enter')
+            print("🧹 已清空搜索框")
+        except Exception as e:
+            print(f"❌ 清空搜索框失败: {e}")
+
+class AsyncFormOperationsMixin:
+    """异步表单操作混入类"""
+
+    _form_payload = FormOperationsMixin._form_payload
+
+    async def fill_form_field(self, field_selector: str, value: str, field_name: str = ""):
+        """填写表单字段"""
+        try:
+            field = self.page.locator(field_selector).first
+            await expect(field).to_be_visible(timeout=5000)
+            await field.fill(value)
+            if field_name:
+                print(f"{field_name}填写: {value}")
+        except Exception as e:
+            print(f"填写字段 {field_name} 失败: {e}")
+            raise
+
+    async def select_option(self, select_selector: str, option_value: str, field_name: str = ""):
+        """选择下拉框选项"""
+        try:
+            select = self.page.locator(select_selector).first
+            await expect(select).to_be_visible(timeout=5000)
+            await select.select_option(option_value)
+            if field_name:
+                print(f"{field_name}选择: {option_value}")
+        except Exception as e:
+            print(f"选择 {field_name} 失败: {e}")
+            raise
+
+    async def click_checkbox(self, checkbox_selector: str, field_name: str = ""):
+        """点击复选框"""
+        try:
+            checkbox = self.page.locator(checkbox_selector).first
+            await expect(checkbox).to_be_visible(timeout=5000)
+            await checkbox.click()
+            if field_name:
+                print(f"{field_name}已点击")
+        except Exception as e:
+            print(f"点击 {field_name} 失败: {e}")
+            raise
+
+    async def fill_form(self, schema: FormSchema, values: Dict[str, Any]) -> bool:
+        """按表单声明填写表单（一次evaluate），规则同FormOperationsMixin.fill_form"""
+        bound = schema.bind(values)
+        payload = self._form_payload(bound)
+
+        start = time.perf_counter()
+        try:
+            self.round_trips.add()
+            results = await self.page.evaluate(_FORM_FILL_JS, payload)
+        except Exception as e:
+            print(f"⚠️  {schema.name}批量填写失败，改为逐个字段填写: {e}")
+            results = [{"label": field.label, "found": False, "ok": False} for field, _ in bound]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        failed = []
+        for (field, value), result in zip(bound, results):
+            if result.get("selector"):
+                key = self._selector_cache_key(f"form:{field.label}")
+                if self.selector_cache.get(key) == result["selector"]:
+                    self.selector_cache.hits += 1
+                else:
+                    self.selector_cache.misses += 1
+                    self.selector_cache.learn(key, result["selector"])
+            if result.get("message"):
+                print(f"⚠️  {field.label}: {result['message']}")
+            if result.get("ok"):
+                print(f"{field.label}填写: {value}")
+            else:
+                failed.append((field, value, result))
+        print(f"⚡ {schema.name}一次填写 {len(bound) - len(failed)}/{len(bound)} 个字段，用时 {elapsed_ms:.0f}ms")
+
+        success = True
+        for field, value, result in failed:
+            if await self._fill_form_field_fallback(field, value, result):
+                continue
+            if field.required:
+                print(f"❌ {field.label}填写失败")
+                success = False
+            else:
+                print(f"⚠️  {field.label}填写失败（非必填）")
+        return success
+
+    async def _fill_form_field_fallback(self, field: FormField, value: Any, result: Dict[str, Any]) -> bool:
+        """批量填写未成功的字段，用Playwright逐个定位填写"""
+        if result.get("error"):
+            print(f"⚠️  {field.label}: {result['error']}")
+        found = await self.find_element(f"form:{field.label}", field.fallback_selectors)
+        if not found:
+            return False
+        selector, element = found
+        try:
+            if field.kind == "checkbox":
+                await element.set_checked(bool(value))
+            elif field.kind == "select":
+                await element.select_option(str(value))
+            else:
+                await element.fill(str(value))
+            print(f"{field.label}填写: {value} (逐个填写: {selector})")
+            return True
+        except Exception as e:
+            print(f"填写字段 {field.label} 失败: {e}")
+            return False
+
+    async def save_form(self, save_button_text: str = "保存"):
+        """保存表单"""
+        try:
+            await self.page.get_by_role("button", name=save_button_text).click()
+            print(f"表单已保存")
+        except Exception as e:
+            print(f"保存表单失败: {e}")
+            raise
+
+class AsyncImportExportMixin:
+    """异步导入导出操作混入类（文件名、sha256、命名空间过滤与ImportExportMixin一致）"""
+
+    last_export_sha256: Optional[str] = None
+
+    # 不访问浏览器的部分直接复用同步实现
+    get_filename_from_url = ImportExportMixin.get_filename_from_url
+    _store_export = ImportExportMixin._store_export
+    filter_file_to_namespace = ImportExportMixin.filter_file_to_namespace
+    _prepare_import = ImportExportMixin._prepare_import
+
+    @instrument_step()
+    async def export_data(self, format_type: str, download_path: str, filename: str = None) -> Optional[str]:
+        """导出数据
+
+        监听浏览器的download事件，文件到达后写入download_path并计算sha256，
+        filename为空时使用服务器给出的文件名。导出接口明确失败时不再等待下载。
+        """
+        print(f"🔹 导出{format_type.upper()}格式...")
+
+        downloads = []
+        export_results = []
+
+        def handle_download(download):
+            downloads.append(download)
+
+        async def handle_response(response):
+            try:
+                if "/Action/call" in response.url and "EXPORT" in (response.request.post_data or ""):
+                    export_results.append(await response.json())
+                    print(f"🔍 捕获到导出API响应: {response.url}")
+            except Exception:
+                export_results.append({})
+
+        def handle_page(page):
+            # 部分固件在新窗口中打开下载链接
+            page.on("download", handle_download)
+
+        context = self.page.context
+        self.page.on("download", handle_download)
+        self.page.on("response", handle_response)
+        context.on("page", handle_page)
+
+        try:
+            found = await self.find_element("导出按钮", [
+                'a:has-text("导出")',
+                'button:has-text("导出")',
+                '.btn:has-text("导出")',
+                'input[value="导出"]'
+            ])
+            if not found:
+                print(f"❌ 未找到导出按钮")
+                return None
+            print(f"✅ 找到可见的导出按钮")
+            await found[1].scroll_into_view_if_needed()
+            await found[1].click()
+
+            await self.waits.for_visible(f'a:has-text("{format_type.upper()}"), li:has-text("{format_type.upper()}")',
+                                         timeout=5, legacy_sleep=1, description="导出下拉菜单")
+
+            found = await self.find_element(f"导出{format_type.upper()}选项", [
+                f'a:has-text("{format_type.upper()}")',
+                f'li:has-text("{format_type.upper()}")',
+                f'[data-format="{format_type}"]'
+            ])
+            if not found:
+                print(f"❌ 未找到{format_type.upper()}选项")
+                return None
+            print(f"✅ 找到{format_type.upper()}选项")
+            await found[1].click()
+
+            def export_failed():
+                return any(result.get("Result") not in (None, 30000) for result in export_results)
+
+            await self.waits.until(lambda: bool(downloads) or export_failed(), timeout=15, legacy_sleep=3,
+                                   description="导出文件下载")
+            if not downloads:
+                if export_failed():
+                    print(f"❌ 导出接口返回失败: {export_results[-1].get('ErrMsg', export_results[-1])}")
+                else:
+                    print(f"❌ 未检测到导出文件下载")
+                return None
+
+            return await self._save_download(downloads[0], download_path, filename, format_type)
+
+        except Exception as e:
+            print(f"❌ 导出{format_type.upper()}格式时出错: {e}")
+            return None
+        finally:
+            self.page.remove_listener("download", handle_download)
+            self.page.remove_listener("response", handle_response)
+            context.remove_listener("page", handle_page)
+
+    async def _save_download(self, download, download_path: str, filename: Optional[str], format_type: str) -> Optional[str]:
+        """等待下载完成，在线程中复制文件并计算sha256，不阻塞事件循环"""
+        failure = await download.failure()
+        if failure:
+            print(f"❌ 下载失败: {failure}")
+            return None
+        source_path = await download.path()
+        return await asyncio.to_thread(self._store_export, source_path, download_path, format_type, filename or
+                                       download.suggested_filename or self.get_filename_from_url(download.url))
+
+    async def import_data(self, file_path: str, file_type: str, merge_to_current: bool = False) -> bool:
+        """导入数据（设置了命名空间时只导入本命名空间的行，并且总是合并导入）"""
+        prepared = self._prepare_import(file_path, file_type, merge_to_current)
+        if prepared is None:
+            return False
+        file_path, merge_to_current, filtered_dir = prepared
+        try:
+            return await self._import_file(file_path, file_type, merge_to_current)
+        finally:
+            if filtered_dir:
+                shutil.rmtree(filtered_dir, ignore_errors=True)
+
+    async def _import_file(self, file_path: str, file_type: str, merge_to_current: bool) -> bool:
+        """通过导入弹窗上传file_path并确认导入"""
+        try:
+            found = await self.find_element("导入按钮", [
+                'a:has-text("导入")',
+                'button:has-text("导入")',
+                '.btn:has-text("导入")',
+                'input[value="导入"]'
+            ])
+            if not found:
+                print("❌ 未找到导入按钮")
+                return False
+            await found[1].scroll_into_view_if_needed()
+            await found[1].click()
+
+            file_inputs = self.page.locator('input[type="file"]')
+
+            async def has_file_input():
+                return await file_inputs.count() > 0
+
+            await self.waits.until(has_file_input, timeout=5, legacy_sleep=2, description="导入弹窗")
+
+            file_input_selectors = [
+                'input[type="file"]',
+                'input[accept*="csv"]',
+                'input[accept*="txt"]',
+                '.type_file_file input',
+                '[class*="file"] input[type="file"]',
+                'input[class*="fileField"]'
+            ]
+
+            async def try_set_file(selector, file_input):
+                try:
+                    await file_input.set_input_files(file_path)
+                    return True
+                except Exception:
+                    return False
+
+            # 文件输入框通常是隐藏的，不要求可见，能成功设置文件即命中
+            if await self.find_element("导入文件输入框", file_input_selectors,
+                                       visible=False, accept=try_set_file) is None:
+                print("❌ 所有文件输入框都无法使用")
+                return False
+            print(f"✅ 成功选择文件: {os.path.basename(file_path)}")
+
+            await self.waits.for_dom_quiet(300, legacy_sleep=2, description="选择文件后DOM静默")
+
+            if merge_to_current:
+                await self._check_merge_option()
+
+            marker = self.waits.mark()
+            found = await self.find_element("确定导入按钮", [
+                'button:has-text("确定导入")',
+                'button:has-text("确定")',
+                'button:has-text("导入")',
+                '.btn:has-text("确定导入")',
+                '.btn:has-text("确定")',
+                '.btn_green:has-text("确定")',
+                '.el-button--primary:has-text("确定")'
+            ])
+            if not found:
+                print("❌ 未找到确定导入按钮")
+                return False
+            await found[1].scroll_into_view_if_needed()
+            await found[1].click()
+
+            await self.waits.for_action_call(marker, timeout=15, legacy_sleep=2, description="导入响应")
+            await self.waits.for_modal_gone(timeout=5, legacy_sleep=1)
+
+            async def has_rows():
+                return await self.waits.row_count() > 0
+
+            await self.waits.until(has_rows, timeout=5, legacy_sleep=2, description="导入后表格刷新")
+            print("✅ 导入操作执行完成")
+
+            imported_count = await self.count_table_rows()
+            print(f"🔍 导入后配置数量: {imported_count}")
+            if imported_count > 0:
+                print(f"✅ 成功导入 {imported_count} 个{file_type.upper()}配置")
+                return True
+            print(f"⚠️  未检测到导入的配置")
+            return False
+        except Exception as e:
+            print(f"❌ 导入{file_type.upper()}文件时出错: {e}")
+            return False
+
+    async def _check_merge_option(self):
+        """勾选合并到当前数据选项"""
+        print("🔍 查找'合并到当前数据'选项...")
+        merge_option_selectors = [
+            'input[type="checkbox"]:near(:text("合并到当前数据"))',
+            'label:has-text("合并到当前数据") input[type="checkbox"]',
+            'label:has-text("合并到当前数据")',
+            ':text("合并到当前数据")',
+            'input[type="checkbox"]'
+        ]
+
+        async def is_merge_option(selector, option):
+            # 通用复选框需要确认其父元素包含"合并到当前数据"
+            if selector == 'input[type="checkbox"]':
+                return "合并到当前数据" in (await option.locator('..').text_content() or "")
+            return True
+
+        found = await self.find_element("合并到当前数据选项", merge_option_selectors, accept=is_merge_option)
+        if not found:
+            print("⚠️  未找到'合并到当前数据'选项，继续执行导入")
+            return
+        selector, option = found
+        try:
+            if selector == 'input[type="checkbox"]' and await option.is_checked():
+                print("✅ '合并到当前数据'选项已经勾选")
+            else:
+                await option.click()
+                print("✅ 已勾选'合并到当前数据'选项")
+        except Exception as e:
+            print(f"⚠️  勾选'合并到当前数据'选项失败: {e}")
+
+class AsyncRouterTestModule(AsyncBaseTestModule, AsyncTableOperationsMixin, AsyncSearchOperationsMixin,
+                            AsyncFormOperationsMixin, AsyncImportExportMixin):
+    """异步路由器测试模块基类，组合所有功能"""
+    pass
+
+class SyncModuleAdapter:
+    """同步模块适配器 - 在工作线程中用同步TestRunner运行现有模块
+
+    同步Playwright不能与事件循环共享浏览器，因此每个适配的模块使用自己的浏览器进程，
+    但运行在线程中，不会阻塞事件循环里的其他异步模块。
+    """
+
+    def __init__(self, module_class, headless: bool = False):
+        self.module_class = module_class
+        self.headless = headless
+
+    async def run(self, config: RouterTestConfig, test_methods: List[str] = None):
+        """在线程中运行同步模块"""
+        runner = TestRunner(config, headless=self.headless)
+        await asyncio.to_thread(runner.run_test_module, self.module_class, test_methods)
+
+class AsyncTestRunner:
+    """异步测试运行器 - 一个事件循环、一个浏览器，并发运行多个模块/路由器
+
+    每个异步模块在共享浏览器的独立上下文中运行，最多max_concurrency个同时进行；
+    同步模块（BaseTestModule子类）交给SyncModuleAdapter。
+    """
+
+    def __init__(self, headless: bool = False, max_concurrency: int = 4, slow_mo: int = 0):
+        self.headless = headless
+        self.max_concurrency = max(1, max_concurrency)
+        self.slow_mo = slow_mo
+        self.browser = None
+        self.results: Dict[str, bool] = {}
+
+    async def _run_async_module(self, module_class, config: RouterTestConfig, test_methods: List[str] = None):
+        """在共享浏览器的独立上下文中运行异步模块"""
+        state_path = None
+        if getattr(config, "reuse_session", False):
+            state_path = SessionStore(config.session_state_dir).load(config)
+        if state_path:
+            context = await self.browser.new_context(storage_state=state_path)
+        else:
+            context = await self.browser.new_context()
+        page = await context.new_page()
+
+        module = module_class(config)
+        module.setup(page)
+        module.session_restored = bool(state_path)
+
+        module.events.emit({"event": "module_start", "methods": test_methods or ["run_full_test"]})
+        module_start = time.perf_counter()
+        outcome = "passed"
+        try:
+            with module.step_span("step1_login"):
+                await module.login()
+            with module.step_span("step2_navigate"):
+                await module.navigate_to_module()
+
+            if test_methods:
+                for method_name in test_methods:
+                    if hasattr(module, method_name):
+                        print(f"\n=== 运行测试方法: {method_name} ===")
+                        await getattr(module, method_name)()
+                    else:
+                        print(f"警告: 测试模块中不存在方法 {method_name}")
+            elif hasattr(module, 'run_full_test'):
+                await module.run_full_test()
+            else:
+                print("警告: 测试模块中没有 run_full_test 方法")
+        except Exception as e:
+            outcome = "failed"
+            print(f"❌ 测试失败: {e}")
+            error_screenshot = f"error_{module_class.__name__}_{id(module)}.png"
+            try:
+                await page.screenshot(path=error_screenshot)
+                print(f"错误截图已保存: {error_screenshot}")
+            except Exception:
+                pass
+            raise
+        finally:
+            module.events.emit({"event": "module_end", "outcome": outcome,
+                                "wall_ms": round((time.perf_counter() - module_start) * 1000, 1)})
+            module.waits.report()
+            module.waits.close()
+            module.selector_cache.report()
+            await context.close()
+
+    async def _run_job(self, semaphore: asyncio.Semaphore, name: str, module_class,
+                       config: RouterTestConfig, test_methods: List[str] = None):
+        """运行单个任务并记录结果"""
+        async with semaphore:
+            print(f"\n🚀 开始: {name}")
+            try:
+                if issubclass(module_class, AsyncBaseTestModule):
+                    await self._run_async_module(module_class, config, test_methods)
+                else:
+                    await SyncModuleAdapter(module_class, self.headless).run(config, test_methods)
+                self.results[name] = True
+                print(f"✅ 完成: {name}")
+            except Exception as e:
+                self.results[name] = False
+                print(f"❌ 失败: {name}: {e}")
+
+    async def run(self, jobs: List[Tuple[Any, RouterTestConfig, Optional[List[str]]]]) -> Dict[str, bool]:
+        """并发运行任务列表，每个任务为(模块类, 配置, 测试方法列表或None)"""
+        self.results = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with async_playwright() as p:
+            self.browser = await p.chromium.launch(headless=self.headless, slow_mo=self.slow_mo)
+            try:
+                tasks = []
+                for index, (module_class, config, test_methods) in enumerate(jobs, 1):
+                    host = base_url_from_router_url(config.router_url)
+                    name = f"{module_class.__name__}@{host}#{index}"
+                    tasks.append(self._run_job(semaphore, name, module_class, config, test_methods))
+                await asyncio.gather(*tasks)
+            finally:
+                await self.browser.close()
+                self.browser = None
+
+        passed = sum(1 for ok in self.results.values() if ok)
+        print(f"\n📊 并发运行完成: {passed}/{len(self.results)} 个任务通过")
+        return self.results
+
+    def run_all(self, jobs: List[Tuple[Any, RouterTestConfig, Optional[List[str]]]]) -> Dict[str, bool]:
+        """同步入口"""
+        return asyncio.run(self.run(jobs))
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""步骤级基准测试
+
+对选定的模块重复运行N次（可以指向本地模拟器），从步骤事件流统计每个步骤的
+p50/p95/max耗时并写成JSON；与保存的基线比较，有步骤退化超过阈值时返回非零退出码。
+
+用法：
+    python benchmark.py --simulator --iterations 5 --baseline benchmark_baseline.json
+    python benchmark.py --router-ip 10.66.0.40 --modules vlan --iterations 3 --update-baseline
+    python benchmark.py --events benchmark_events.jsonl --baseline benchmark_baseline.json
+"""
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+# 可参与基准测试的模块：名称 -> (模块路径, 类名)
+BENCH_MODULES = {
+    "vlan": ("modules.vlan_module", "VLANTestModule"),
+    "pptp": ("modules.pptp_module", "PPTPTestModule"),
+    "l2tp": ("modules.l2tp_module", "L2TPTestModule"),
+}
+
+DEFAULT_RESULTS_FILE = "benchmark_results.json"
+DEFAULT_EVENTS_FILE = "benchmark_events.jsonl"
+DEFAULT_BASELINE_FILE = "benchmark_baseline.json"
+METRICS = ("p50_ms", "p95_ms", "max_ms")
+
+def percentile(values: List[float], q: float) -> float:
+    """线性插值百分位数（q取0-100）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def load_step_events(path: str) -> List[Dict]:
+    """读取事件流中的step_end事件（跳过损坏的行）"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("event") == "step_end":
+                events.append(event)
+    return events
+
+def summarize(events: List[Dict], steps: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """按"模块.步骤"汇总耗时分布"""
+    samples: Dict[str, List[Dict]] = {}
+    for event in events:
+        if steps and event.get("step") not in steps:
+            continue
+        samples.setdefault(f"{event.get('module', '')}.{event.get('step', '')}", []).append(event)
+
+    summary = {}
+    for key, items in sorted(samples.items()):
+        wall = [float(item.get("wall_ms", 0.0)) for item in items]
+        summary[key] = {
+            "count": len(items),
+            "failures": sum(1 for item in items if item.get("outcome") != "passed"),
+            "p50_ms": round(percentile(wall, 50), 1),
+            "p95_ms": round(percentile(wall, 95), 1),
+            "max_ms": round(max(wall), 1),
+            "mean_ms": round(sum(wall) / len(wall), 1),
+            "round_trips_p50": percentile([item.get("round_trips", 0) for item in items], 50),
+        }
+    return summary
+
+def compare(current: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float,
+            metric: str = "p95_ms", min_delta_ms: float = 0.0) -> List[Dict]:
+    """找出相对基线变慢超过threshold（比例）且绝对差值不小于min_delta_ms的步骤"""
+    regressions = []
+    for key, stats in current.items():
+        base = baseline.get(key)
+        if not base or not base.get(metric):
+            continue
+        before, after = float(base[metric]), float(stats[metric])
+        if after > before * (1 + threshold) and after - before >= min_delta_ms:
+            regressions.append({
+                "step": key,
+                "metric": metric,
+                "baseline_ms": before,
+                "current_ms": after,
+                "change": round(after / before - 1, 3),
+            })
+    return regressions
+
+def print_summary(summary: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None, metric: str = "p95_ms"):
+    """打印每个步骤的统计（有基线时附带变化比例）"""
+    print(f"\n{'步骤':<60} {'次数':>4} {'失败':>4} {'p50':>9} {'p95':>9} {'max':>9} {'变化':>8}")
+    for key, stats in summary.items():
+        change = ""
+        base = (baseline or {}).get(key)
+        if base and base.get(metric):
+            change = f"{stats[metric] / base[metric] - 1:+.0%}"
+        print(f"{key:<60} {stats['count']:>4} {stats['failures']:>4} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['max_ms']:>9.1f} {change:>8}")
+
+def load_module_classes(names: List[str]) -> List:
+    """按名称导入测试模块类"""
+    classes = []
+    for name in names:
+        module_path, class_name = BENCH_MODULES[name]
+        classes.append(getattr(importlib.import_module(module_path), class_name))
+    return classes
+
+def run_benchmark(config, module_names: List[str], iterations: int, methods: Optional[List[str]],
+                  headless: bool = True) -> float:
+    """依次运行每个模块iterations次（共用一个浏览器池），返回总耗时（秒）"""
+    from test_framework import TestRunner
+
+    module_classes = load_module_classes(module_names)
+    runner = TestRunner(config, headless=headless)
+    start = time.perf_counter()
+    runner.run_suite(module_classes * iterations, methods)
+    return time.perf_counter() - start
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='步骤级基准测试')
+    target = parser.add_argument_group('测试目标')
+    target.add_argument('--ip', '--router-ip', dest='router_ip', help='路由器IP地址或URL')
+    target.add_argument('--username', default='admin', help='登录用户名 (默认: admin)')
+    target.add_argument('--password', default='admin123', help='登录密码 (默认: admin123)')
+    target.add_argument('--firmware', default='', help='路由器固件版本，用于区分选择器缓存')
+    target.add_argument('--simulator', action='store_true', help='启动本地路由器模拟器作为测试目标')
+    target.add_argument('--sim-latency', type=float, default=0.0, help='模拟器接口延迟，毫秒 (默认: 0)')
+    target.add_argument('--sim-entries', type=int, default=0, help='模拟器每个配置表预置条数 (默认: 0)')
+
+    run = parser.add_argument_group('运行')
+    run.add_argument('--modules', default=','.join(BENCH_MODULES),
+                     help=f'逗号分隔的模块 (默认: {",".join(BENCH_MODULES)})')
+    run.add_argument('--iterations', '-n', type=int, default=3, help='每个模块运行次数 (默认: 3)')
+    run.add_argument('--methods', help='逗号分隔的无参测试方法，默认运行run_full_test')
+    run.add_argument('--steps', help='逗号分隔的步骤名，只统计这些步骤 (默认: 全部)')
+    run.add_argument('--headed', action='store_true', help='显示浏览器窗口')
+    run.add_argument('--events', help='不运行测试，直接统计已有的事件文件')
+
+    result = parser.add_argument_group('结果与基线')
+    result.add_argument('--output', default=DEFAULT_RESULTS_FILE, help=f'结果JSON (默认: {DEFAULT_RESULTS_FILE})')
+    result.add_argument('--baseline', default=DEFAULT_BASELINE_FILE, help=f'基线JSON (默认: {DEFAULT_BASELINE_FILE})')
+    result.add_argument('--update-baseline', action='store_true', help='把本次结果保存为基线')
+    result.add_argument('--threshold', type=float, default=0.2, help='允许的退化比例 (默认: 0.2，即20%%)')
+    result.add_argument('--metric', choices=METRICS, default='p95_ms', help='比较使用的指标 (默认: p95_ms)')
+    result.add_argument('--min-delta-ms', type=float, default=50.0,
+                        help='退化的最小绝对差值，过滤毫秒级抖动 (默认: 50)')
+    return parser.parse_args()
+
+def main() -> int:
+    args = parse_arguments()
+    steps = [step.strip() for step in args.steps.split(',')] if args.steps else None
+    meta = {"created": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+    if args.events:
+        events_path = args.events
+        meta["events"] = events_path
+        print(f"📂 统计已有事件文件: {events_path}")
+    else:
+        module_names = [name.strip() for name in args.modules.split(',') if name.strip()]
+        unknown = [name for name in module_names if name not in BENCH_MODULES]
+        if unknown:
+            print(f"❌ 未知模块: {', '.join(unknown)}")
+            return 2
+        methods = [method.strip() for method in args.methods.split(',')] if args.methods else None
+
+        simulator = None
+        if args.simulator:
+            from router_simulator import RouterSimulator
+            simulator = RouterSimulator(port=0, username=args.username, password=args.password,
+                                        latency_ms=args.sim_latency, entries=args.sim_entries).start()
+            router_url = simulator.router_url
+            print(f"🧪 已启动本地模拟器: {router_url}")
+        elif args.router_ip:
+            router_ip = args.router_ip
+            router_url = router_ip if router_ip.startswith('http') else f"http://{router_ip}/login#/login"
+        else:
+            print("❌ 请指定 --router-ip 或 --simulator")
+            return 2
+
+        from test_framework import RouterTestConfig
+
+        events_path = os.path.abspath(DEFAULT_EVENTS_FILE)
+        if os.path.exists(events_path):
+            os.remove(events_path)
+        config = RouterTestConfig(router_url=router_url, username=args.username, password=args.password,
+                                  firmware=args.firmware, events_file=events_path)
+        print(f"🚀 基准测试: {', '.join(module_names)} × {args.iterations} 次")
+        try:
+            elapsed = run_benchmark(config, module_names, args.iterations, methods, headless=not args.headed)
+        finally:
+            if simulator:
+                simulator.stop()
+        meta.update({"target": "simulator" if simulator else router_url, "modules": module_names,
+                     "iterations": args.iterations, "methods": methods or ["run_full_test"],
+                     "elapsed_s": round(elapsed, 1), "events": events_path})
+
+    if not os.path.exists(events_path):
+        print(f"❌ 事件文件不存在: {events_path}")
+        return 2
+    summary = summarize(load_step_events(events_path), steps)
+    if not summary:
+        print("❌ 没有统计到任何步骤")
+        return 2
+
+    results = {"meta": meta, "steps": summary}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"💾 结果已保存: {args.output}")
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get("steps", {})
+    print_summary(summary, baseline, args.metric)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📌 已更新基线: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\n⚠️  基线不存在: {args.baseline}（使用 --update-baseline 保存）")
+        return 0
+
+    regressions = compare(summary, baseline, args.threshold, args.metric, args.min_delta_ms)
+    if regressions:
+        print(f"\n❌ {len(regressions)} 个步骤退化超过 {args.threshold:.0%}（{args.metric}）:")
+        for item in regressions:
+            print(f"  - {item['step']}: {item['baseline_ms']:.1f}ms -> {item['current_ms']:.1f}ms ({item['change']:+.0%})")
+        return 1
+
+    print(f"\n✅ 没有步骤退化超过 {args.threshold:.0%}（{args.metric}）")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""多路由器并发测试
+
+从路由器清单（JSON/CSV/文本）读取IP、账号和固件版本，对每台路由器启动一个
+模块脚本子进程，按最大并发数限制同时运行，最后按路由器汇总结果。
+
+清单格式：
+    JSON:  [{"name": "lab-01", "ip": "10.66.0.40", "username": "admin", "password": "admin123", "firmware": "3.7.10"}]
+    CSV:   name,ip,username,password,firmware（首行为表头）
+    文本:  每行 "IP [用户名 密码 [固件版本]]"，#开头为注释
+
+用法：
+    python fleet_runner.py --inventory routers.json --module vlan --max-parallel 4
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from test_framework import EVENTS_ENV_VAR
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules")
+DEFAULT_OUTPUT_DIR = "fleet_results"
+
+class RouterTarget:
+    """清单中的一台路由器"""
+
+    def __init__(self, ip: str, name: str = "", username: str = "admin", password: str = "admin123",
+                 ssh_user: str = "sshd", ssh_pass: str = "ikuai8.com", firmware: str = ""):
+        self.ip = ip
+        self.name = name or ip
+        self.username = username
+        self.password = password
+        self.ssh_user = ssh_user
+        self.ssh_pass = ssh_pass
+        self.firmware = firmware
+
+    @property
+    def slug(self) -> str:
+        """用于日志文件名"""
+        return re.sub(r'[^\w.-]+', '_', self.name)
+
+    def cli_args(self) -> List[str]:
+        """传给模块脚本的命令行参数"""
+        args = ['--ip', self.ip, '--username', self.username, '--password', self.password,
+                '--ssh-user', self.ssh_user, '--ssh-pass', self.ssh_pass]
+        if self.firmware:
+            args += ['--firmware', self.firmware]
+        return args
+
+def load_inventory(path: str, defaults: Dict[str, str] = None) -> List[RouterTarget]:
+    """读取路由器清单，缺省字段使用defaults"""
+    defaults = {key: value for key, value in (defaults or {}).items() if value}
+    rows: List[Dict[str, str]] = []
+
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        rows = data.get("routers", []) if isinstance(data, dict) else data
+    elif path.lower().endswith('.csv'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split('#', 1)[0].split()
+                if parts:
+                    rows.append(dict(zip(["ip", "username", "password", "firmware"], parts)))
+
+    targets = []
+    seen = set()
+    for row in rows:
+        row = {key: str(value).strip() for key, value in row.items() if value not in (None, "")}
+        if not row.get("ip"):
+            print(f"⚠️  清单中缺少IP的条目已跳过: {row}")
+            continue
+        target = RouterTarget(**dict(defaults, **{key: value for key, value in row.items()
+                                                   if key in RouterTarget.__init__.__code__.co_varnames}))
+        if target.name in seen:
+            target.name = f"{target.name}_{len(targets) + 1}"
+        seen.add(target.name)
+        targets.append(target)
+    return targets
+
+def resolve_module_script(module: str) -> str:
+    """模块名（vlan）或脚本路径 -> 脚本绝对路径"""
+    if os.path.exists(module):
+        return os.path.abspath(module)
+    script = os.path.join(MODULES_DIR, f"{module}_module.py")
+    if not os.path.exists(script):
+        raise FileNotFoundError(f"找不到模块脚本: {module}")
+    return script
+
+def summarize_events(events_path: str) -> Dict:
+    """从步骤事件流统计一台路由器的步骤结果"""
+    summary = {"outcome": None, "steps_passed": 0, "steps_failed": 0, "failed_steps": []}
+    if not os.path.exists(events_path):
+        return summary
+    with open(events_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("event") == "module_end":
+                summary["outcome"] = event.get("outcome")
+            elif event.get("event") == "step_end":
+                if event.get("outcome") == "passed":
+                    summary["steps_passed"] += 1
+                else:
+                    summary["steps_failed"] += 1
+                    summary["failed_steps"].append(event.get("step"))
+    return summary
+
+class FleetRunner:
+    """对多台路由器并发运行同一个模块脚本（每台一个子进程）"""
+
+    def __init__(self, script_path: str, targets: List[RouterTarget], max_parallel: int = 4,
+                 output_dir: str = DEFAULT_OUTPUT_DIR, headless: bool = True, method: Optional[str] = None,
+                 timeout: Optional[float] = None, extra_args: List[str] = None):
+        self.script_path = os.path.abspath(script_path)
+        self.targets = targets
+        self.max_parallel = max(1, max_parallel)
+        self.output_dir = os.path.abspath(output_dir)
+        self.headless = headless
+        self.method = method
+        self.timeout = timeout
+        self.extra_args = extra_args or []
+        self.print_lock = threading.Lock()
+
+    def _log(self, message: str):
+        with self.print_lock:
+            print(message, flush=True)
+
+    def _command(self, target: RouterTarget) -> List[str]:
+        cmd = [sys.executable, '-u', self.script_path] + target.cli_args()
+        if self.headless:
+            cmd.append('--headless')
+        if self.method:
+            cmd += ['--method', self.method]
+        return cmd + self.extra_args
+
+    def run_one(self, target: RouterTarget) -> Dict:
+        """在子进程中测试一台路由器，输出写入独立日志"""
+        log_path = os.path.join(self.output_dir, f"{target.slug}.log")
+        events_path = os.path.join(self.output_dir, f"{target.slug}.events.jsonl")
+        if os.path.exists(events_path):
+            os.remove(events_path)
+
+        # 每台路由器独立的工作目录：导出/导入文件(downloads/)和错误截图互不覆盖
+        work_dir = os.path.join(self.output_dir, target.slug)
+        os.makedirs(work_dir, exist_ok=True)
+
+        env = os.environ.copy()
+        env[EVENTS_ENV_VAR] = events_path
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['PYTHONUNBUFFERED'] = '1'
+
+        self._log(f"🚀 [{target.name}] 开始测试 {target.ip} (固件: {target.firmware or '未知'})")
+        start = time.perf_counter()
+        return_code = None
+        error = ""
+        with open(log_path, 'w', encoding='utf-8') as log_file:
+            try:
+                process = subprocess.run(self._command(target), stdout=log_file, stderr=subprocess.STDOUT,
+                                         env=env, cwd=work_dir, timeout=self.timeout)
+                return_code = process.returncode
+            except subprocess.TimeoutExpired:
+                error = f"超时（{self.timeout:.0f}秒）"
+            except Exception as e:
+                error = str(e)
+
+        result = {
+            "name": target.name,
+            "ip": target.ip,
+            "firmware": target.firmware,
+            "return_code": return_code,
+            "duration_s": round(time.perf_counter() - start, 1),
+            "log": log_path,
+            "events": events_path,
+            "work_dir": work_dir,
+            "error": error,
+        }
+        result.update(summarize_events(events_path))
+        result["passed"] = (return_code == 0 and not error and result["outcome"] == "passed"
+                            and result["steps_failed"] == 0)
+
+        icon = "✅" if result["passed"] else "❌"
+        detail = error or f"步骤 {result['steps_passed']} 通过 / {result['steps_failed']} 失败"
+        self._log(f"{icon} [{target.name}] 完成，用时 {result['duration_s']}s，{detail}")
+        return result
+
+    def run(self) -> List[Dict]:
+        """并发运行所有路由器，结果按清单顺序返回"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        print(f"🌐 {len(self.targets)} 台路由器，最大并发 {self.max_parallel}，脚本: {os.path.basename(self.script_path)}")
+
+        results: Dict[str, Dict] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            futures = {executor.submit(self.run_one, target): target for target in self.targets}
+            for future in concurrent.futures.as_completed(futures):
+                target = futures[future]
+                try:
+                    results[target.name] = future.result()
+                except Exception as e:
+                    self._log(f"❌ [{target.name}] 执行异常: {e}")
+                    results[target.name] = {"name": target.name, "ip": target.ip, "firmware": target.firmware,
+                                            "passed": False, "error": str(e)}
+        return [results[target.name] for target in self.targets]
+
+def print_report(results: List[Dict]):
+    """打印按路由器和按固件汇总的结果"""
+    print(f"\n{'路由器':<20} {'IP':<22} {'固件':<12} {'结果':<6} {'通过':>4} {'失败':>4} {'用时':>8}  失败步骤")
+    for item in results:
+        status = "通过" if item.get("passed") else "失败"
+        failed = ", ".join(item.get("failed_steps") or []) or item.get("error", "")
+        print(f"{item['name']:<20} {item['ip']:<22} {item.get('firmware') or '-':<12} {status:<6} "
+              f"{item.get('steps_passed', 0):>4} {item.get('steps_failed', 0):>4} "
+              f"{item.get('duration_s', 0):>7}s  {failed}")
+
+    by_firmware: Dict[str, List[bool]] = {}
+    for item in results:
+        by_firmware.setdefault(item.get("firmware") or "未知", []).append(bool(item.get("passed")))
+    print("\n📊 按固件汇总:")
+    for firmware, outcomes in sorted(by_firmware.items()):
+        print(f"  {firmware}: {sum(outcomes)}/{len(outcomes)} 台通过")
+
+    passed = sum(1 for item in results if item.get("passed"))
+    print(f"\n📊 总计: {passed}/{len(results)} 台路由器通过")
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='多路由器并发测试')
+    parser.add_argument('--inventory', '-i', required=True, help='路由器清单文件 (JSON/CSV/文本)')
+    parser.add_argument('--module', required=True, help='模块名 (vlan/pptp/l2tp) 或脚本路径')
+    parser.add_argument('--max-parallel', '-j', type=int, default=4, help='最大并发路由器数 (默认: 4)')
+    parser.add_argument('--method', '-m', help='只运行指定的测试方法')
+    parser.add_argument('--headed', action='store_true', help='显示浏览器窗口 (默认无头)')
+    parser.add_argument('--timeout', type=float, help='单台路由器超时时间，秒')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help=f'日志和结果目录 (默认: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--username', help='清单未指定时使用的用户名')
+    parser.add_argument('--password', help='清单未指定时使用的密码')
+    parser.add_argument('--ssh-user', help='清单未指定时使用的SSH用户名')
+    parser.add_argument('--ssh-pass', help='清单未指定时使用的SSH密码')
+    args, extra_args = parser.parse_known_args()
+    return args, extra_args
+
+def main() -> int:
+    args, extra_args = parse_arguments()
+    targets = load_inventory(args.inventory, {
+        "username": args.username, "password": args.password,
+        "ssh_user": args.ssh_user, "ssh_pass": args.ssh_pass,
+    })
+    if not targets:
+        print("❌ 路由器清单为空")
+        return 2
+
+    runner = FleetRunner(resolve_module_script(args.module), targets, max_parallel=args.max_parallel,
+                         output_dir=args.output_dir, headless=not args.headed, method=args.method,
+                         timeout=args.timeout, extra_args=extra_args)
+    results = runner.run()
+    print_report(results)
+
+    results_path = os.path.join(runner.output_dir, "results.json")
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump({"module": args.module, "routers": results}, f, ensure_ascii=False, indent=2)
+    print(f"💾 汇总结果已保存: {results_path}")
+    return 0 if all(item.get("passed") for item in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
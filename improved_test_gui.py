@@ -5,11 +5,13 @@ import sys
 import os
 import subprocess
 import datetime
+import html
 import json
 import traceback
 import webbrowser
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from collections import deque
 import io
 import threading
 import time
@@ -21,22 +23,64 @@ sys.path.insert(0, current_dir)
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QLabel,
-    QMessageBox, QFileDialog, QTextEdit, QTreeWidget, QTreeWidgetItem,
+    QMessageBox, QFileDialog, QTreeWidget, QTreeWidgetItem,
     QCheckBox, QDialog, QFormLayout, QDialogButtonBox, QSpinBox, QListWidget,
     QTabWidget, QGroupBox, QComboBox, QTableWidget, QTableWidgetItem,
     QHeaderView, QSplitter, QFrame, QButtonGroup, QRadioButton, QScrollArea,
-    QProgressBar, QListWidgetItem
+    QProgressBar, QListWidgetItem, QPlainTextEdit
 )
 from PyQt5.QtCore import QThread, pyqtSignal, Qt, QTimer, QObject
-from PyQt5.QtGui import QTextCursor, QFont, QIcon
+from PyQt5.QtGui import QFont, QIcon
 
 try:
-    from test_framework import RouterTestConfig
+    from test_framework import RouterTestConfig, make_namespace, NAMESPACE_ENV_VAR
+    from worker_pool import WorkerPool
+    from log_classifier import LogClassifier
+    from log_store import ModuleLogStore
+    from report_writer import HtmlReportWriter
 except ImportError as e:
     print(f"导入错误: {e}")
     print("请确保 test_framework.py 文件在当前目录下")
     sys.exit(1)
 
+# 输出视图最多显示的行数（更早的行只保留在磁盘日志中）
+MAX_LOG_VIEW_LINES = 5000
+
+# 内存中保留的输出行数，切换模块筛选时从这里重建视图
+MAX_LOG_MEMORY_LINES = 50000
+
+# 输出批量刷新到界面的间隔，毫秒
+LOG_FLUSH_INTERVAL_MS = 100
+
+# 每次测试的完整输出日志目录
+LOG_DIR = "test_logs"
+
+# 运行中向界面推送成功/失败步骤数的最短间隔，秒
+STEP_COUNT_INTERVAL = 0.5
+
+class LogBuffer:
+    """线程安全的输出缓冲 - 执行线程只追加，界面定时器批量取走
+
+    "[模块名] 内容"格式的行归属到该模块，其余行归为系统消息（模块名为空）。
+    """
+
+    MODULE_TAG = re.compile(r'^\[([^\]]+)\] ')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending: List[Tuple[str, str]] = []
+
+    def add_text(self, text: str):
+        match = self.MODULE_TAG.match(text)
+        with self.lock:
+            self.pending.append((match.group(1) if match else "", text))
+
+    def drain(self) -> List[Tuple[str, str]]:
+        """取走所有待显示的(模块名, 文本)"""
+        with self.lock:
+            lines, self.pending = self.pending, []
+        return lines
+
 class TestResult:
     """用于存储一次测试的结果和日志"""
     def __init__(self, test_id, test_name):
@@ -47,10 +91,12 @@ class TestResult:
         self.status = "未执行"
         self.fail_steps = 0
         self.success_steps = 0
-        self.execution_logs = []
-        self.failure_logs = []
+        self.failure_logs = []  # 失败行摘录
         self.test_steps = ""
-        self.full_output = ""
+        # 完整输出在压缩日志文件中，这里只记录位置、行数和大小
+        self.log_path = ""
+        self.log_lines = 0
+        self.log_bytes = 0
         self.step_details = []
 
     def get_duration_seconds(self):
@@ -295,17 +341,24 @@ class ScriptExecutionThread(QThread):
     finished_signal = pyqtSignal(bool, list)
     progress_signal = pyqtSignal(int, str)
     module_status_signal = pyqtSignal(int, str)
+    step_count_signal = pyqtSignal(int, int, int)
     report_ready = pyqtSignal(list, str, str)
     
     def __init__(self, config: RouterTestConfig, selected_modules: List[Dict], 
-                 execution_mode: str = "sequential", continue_on_error: bool = True):
+                 execution_mode: str = "sequential", continue_on_error: bool = True,
+                 worker_pool: Optional[WorkerPool] = None):
         super().__init__()
         self.config = config
         self.selected_modules = selected_modules
         self.execution_mode = execution_mode
         self.continue_on_error = continue_on_error
+        # 设置后脚本在常驻工作进程中运行，否则每个脚本启动一个Python子进程
+        self.worker_pool = worker_pool
         self.is_cancelled = False
         self.test_results = []
+        # 每个脚本的输出边运行边写入各自的压缩日志
+        self.log_store = ModuleLogStore(os.path.join(
+            LOG_DIR, f"modules_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"))
         
     def run(self):
         """运行测试"""
@@ -317,6 +370,9 @@ class ScriptExecutionThread(QThread):
             self.output_signal.emit(f"🎯 目标路由器: {self.config.router_url}")
             self.output_signal.emit("=" * 60)
             
+            if self.worker_pool is not None:
+                self.worker_pool.log = self.output_signal.emit
+            
             if self.execution_mode == "sequential":
                 self._execute_sequential()
             else:
@@ -362,7 +418,7 @@ class ScriptExecutionThread(QThread):
                 self.output_signal.emit(f"❌ 脚本 {module_info['info']['name']} 执行失败，停止后续测试")
                 break
             
-            if i < len(self.selected_modules) - 1 and not self.is_cancelled:
+            if i < len(self.selected_modules) - 1 and not self.is_cancelled and self.worker_pool is None:
                 self.output_signal.emit("⏳ 等待 2 秒后执行下一个脚本...")
                 time.sleep(2)
         
@@ -406,6 +462,25 @@ class ScriptExecutionThread(QThread):
         test_result.start_time = datetime.datetime.now()
         test_result.status = "运行中"
         
+        # 输出逐行分类，运行中就能看到成功/失败步骤数
+        module_name = module_info['info']['name']
+        classifier = LogClassifier()
+        last_count_emit = [0.0]
+        
+        try:
+            module_log = self.log_store.open(test_result.test_id, module_name)
+        except OSError as e:
+            module_log = None
+            self.output_signal.emit(f"⚠️ 无法创建模块日志文件: {e}")
+        
+        def on_line(line: str):
+            self.output_signal.emit(f"[{module_name}] {line}")
+            if module_log:
+                module_log.write(line)
+            if classifier.feed(line) and time.time() - last_count_emit[0] >= STEP_COUNT_INTERVAL:
+                last_count_emit[0] = time.time()
+                self.step_count_signal.emit(index, classifier.success_steps, classifier.fail_steps)
+        
         try:
             script_path = module_info['module_path']
             
@@ -417,13 +492,21 @@ class ScriptExecutionThread(QThread):
             router_ip = re.search(r'://([^:/]+)', self.config.router_url).group(1) if self.config.router_url else "10.66.0.40"
             
             # 设置环境变量传递配置
+            job_env = {
+                'ROUTER_URL': self.config.router_url,
+                'ROUTER_IP': router_ip,
+                'ROUTER_USERNAME': self.config.username,
+                'ROUTER_PASSWORD': self.config.password,
+                'SSH_USER': self.config.ssh_user,
+                'SSH_PASS': self.config.ssh_pass,
+            }
+            
+            # 每个脚本使用独立的命名空间，并行执行时清理/校验互不影响
+            namespace = make_namespace()
+            job_env[NAMESPACE_ENV_VAR] = namespace
+            
             env = os.environ.copy()
-            env['ROUTER_URL'] = self.config.router_url
-            env['ROUTER_IP'] = router_ip
-            env['ROUTER_USERNAME'] = self.config.username
-            env['ROUTER_PASSWORD'] = self.config.password
-            env['SSH_USER'] = self.config.ssh_user
-            env['SSH_PASS'] = self.config.ssh_pass
+            env.update(job_env)
             
             # 解决Windows编码问题
             env['PYTHONIOENCODING'] = 'utf-8'
@@ -435,56 +518,22 @@ class ScriptExecutionThread(QThread):
             self.output_signal.emit(f"🌐 目标路由器URL: {env['ROUTER_URL']}")
             self.output_signal.emit(f"🔗 目标路由器IP: {env['ROUTER_IP']}")
             self.output_signal.emit(f"👤 用户名: {env['ROUTER_USERNAME']}")
+            self.output_signal.emit(f"🏷️ 命名空间: {namespace}")
             
             # 使用脚本原有的参数格式调用
-            cmd = [
-                sys.executable, '-u', script_path,
+            script_args = [
                 '--ip', router_ip,
                 '--username', self.config.username,
                 '--password', self.config.password,
                 '--ssh-user', self.config.ssh_user,
-                '--ssh-pass', self.config.ssh_pass
+                '--ssh-pass', self.config.ssh_pass,
+                '--namespace', namespace
             ]
             
-            self.output_signal.emit(f"🚀 执行命令: {' '.join(cmd)}")
-            
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                env=env,
-                cwd=os.path.dirname(script_path),
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # 实时读取输出
-            output_lines = []
-            self.output_signal.emit(f"🔄 开始读取脚本输出...")
-            
-            while True:
-                if self.is_cancelled:
-                    process.terminate()
-                    break
-                    
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                    
-                if output:
-                    line = output.rstrip()
-                    if line:
-                        self.output_signal.emit(f"[{module_info['info']['name']}] {line}")
-                        output_lines.append(line)
-            
-            # 等待进程结束
-            return_code = process.wait()
-            
-            test_result.full_output = '\n'.join(output_lines)
-            test_result.execution_logs = output_lines.copy()
+            if self.worker_pool is not None:
+                return_code = self._run_in_worker(script_path, script_args, job_env, on_line)
+            else:
+                return_code = self._run_in_subprocess(script_path, script_args, env, on_line)
             
             self.output_signal.emit(f"🏁 脚本执行完毕，退出码: {return_code}")
             
@@ -511,89 +560,84 @@ class ScriptExecutionThread(QThread):
             
         finally:
             test_result.end_time = datetime.datetime.now()
-        
-        # 分析输出日志
-        self._analyze_test_logs(test_result, test_result.full_output)
+            if module_log:
+                module_log.close()
+                test_result.log_path = module_log.path
+                test_result.log_lines = module_log.lines
+                test_result.log_bytes = module_log.bytes
+        
+        # 汇总输出日志的分类结果
+        self._apply_log_classification(test_result, classifier)
+        self.step_count_signal.emit(index, classifier.success_steps, classifier.fail_steps)
         self.test_results.append(test_result)
         
         return test_result.status == "成功"
     
-    def _analyze_test_logs(self, test_result: TestResult, output: str):
-        """分析测试日志 - 更精确的失败判断"""
-        lines = output.split('\n')
-        
-        test_result.success_steps = 0
-        test_result.fail_steps = 0
-        test_result.failure_logs = []
-        
-        # 真正的失败关键词（排除误判）
-        real_failure_keywords = [
-            '测试失败', '执行失败', '连接失败', '登录失败', '创建失败', '删除失败', 
-            'FAIL', 'failed', 'Exception', 'Traceback', 'Error:', '异常',
-            '无法连接', '超时', 'timeout', '找不到元素', '元素不存在'
-        ]
-        
-        # 成功关键词
-        success_keywords = [
-            '成功', '完成', '✅', 'SUCCESS', '已启用', '已停用', 
-            '创建成功', 'passed', '测试通过', '验证成功', '连接成功',
-            '删除成功', '配置成功', '保存成功'
-        ]
-        
-        # 需要忽略的"错误"（这些不是真正的失败）
-        ignore_patterns = [
-            r'服务器地址/域名.*字段必填',
-            r'字段必填',
-            r'请输入',
-            r'请选择',
-            r'格式不正确',
-            r'用户.*请求',
-        ]
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 检查是否应该忽略的"错误"
-            should_ignore = False
-            for pattern in ignore_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    should_ignore = True
-                    break
-            
-            if should_ignore:
-                continue
-            
-            # 检查真正的失败
-            is_failure = False
-            for keyword in real_failure_keywords:
-                if keyword.lower() in line.lower():
-                    is_failure = True
-                    break
-            
-            if is_failure:
-                test_result.fail_steps += 1
-                test_result.failure_logs.append(line)
-            
-            # 检查成功
-            is_success = False
-            for keyword in success_keywords:
-                if keyword.lower() in line.lower():
-                    is_success = True
-                    break
-            
-            if is_success:
-                test_result.success_steps += 1
+    def _run_in_subprocess(self, script_path: str, script_args: List[str], env: Dict[str, str],
+                           on_line: Callable[[str], None]) -> int:
+        """启动独立的Python子进程运行脚本，逐行交给on_line，返回退出码"""
+        cmd = [sys.executable, '-u', script_path] + script_args
+        self.output_signal.emit(f"🚀 执行命令: {' '.join(cmd)}")
+        
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            env=env,
+            cwd=os.path.dirname(script_path),
+            bufsize=1,
+            universal_newlines=True
+        )
         
-        # 基于步骤数量和退出码判断状态
-        if test_result.fail_steps > 0:
-            if test_result.success_steps > test_result.fail_steps:
-                test_result.status = "部分失败"
-            else:
-                test_result.status = "失败"
-        elif test_result.success_steps > 0:
-            test_result.status = "成功"
+        # 实时读取输出
+        self.output_signal.emit(f"🔄 开始读取脚本输出...")
+        
+        while True:
+            if self.is_cancelled:
+                process.terminate()
+                break
+                
+            output = process.stdout.readline()
+            if output == '' and process.poll() is not None:
+                break
+                
+            if output:
+                line = output.rstrip()
+                if line:
+                    on_line(line)
+        
+        # 等待进程结束
+        return process.wait()
+    
+    def _run_in_worker(self, script_path: str, script_args: List[str], job_env: Dict[str, str],
+                       on_line: Callable[[str], None]) -> Optional[int]:
+        """在常驻工作进程中运行脚本（已预加载Playwright并启动浏览器），返回退出码"""
+        self.output_signal.emit(f"🧰 在常驻工作进程中执行: {os.path.basename(script_path)} {' '.join(script_args)}")
+        
+        def on_output(line: str):
+            line = line.rstrip()
+            if line:
+                on_line(line)
+        
+        result = self.worker_pool.run(script_path, script_args, env=job_env, cwd=os.path.dirname(script_path),
+                                      on_output=on_output, should_cancel=lambda: self.is_cancelled)
+        if result.get("error"):
+            self.output_signal.emit(f"⚠️ 工作进程 #{result.get('worker')}: {result['error']}")
+        self.output_signal.emit(f"⏱️ 脚本用时 {result.get('duration_s', 0)}s (工作进程 #{result.get('worker')})")
+        return result.get("return_code")
+    
+    def _apply_log_classification(self, test_result: TestResult, classifier: LogClassifier):
+        """根据流式分类结果汇总步骤数和状态 - 更精确的失败判断"""
+        test_result.success_steps = classifier.success_steps
+        test_result.fail_steps = classifier.fail_steps
+        test_result.failure_logs = list(classifier.failure_logs)
+        
+        # 基于步骤数量判断状态，没有可判断的输出时保留退出码得出的状态
+        if classifier.status:
+            test_result.status = classifier.status
     
     def cancel(self):
         """取消测试"""
@@ -612,6 +656,20 @@ class ImprovedTestGUI(QWidget):
         self.test_thread = None
         self.modules = []
         self.selected_modules = []
+        # 常驻工作进程池，第一次测试时创建，多次测试之间复用，关闭窗口时停止
+        self.worker_pool = None
+        
+        # 本次测试各脚本的状态和实时成功/失败步骤数，按选择顺序索引
+        self.module_statuses = {}
+        self.module_step_counts = {}
+        
+        # 输出先进入缓冲，由定时器批量刷新到界面并写入完整日志
+        self.log_buffer = LogBuffer()
+        self.log_lines = deque(maxlen=MAX_LOG_MEMORY_LINES)
+        self.log_file = None
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_output)
+        self.log_timer.start(LOG_FLUSH_INTERVAL_MS)
         
         self.is_testing = False
         
@@ -779,6 +837,12 @@ class ImprovedTestGUI(QWidget):
         self.continue_on_error_checkbox.setStyleSheet("font-size: 15px;")
         options_layout.addWidget(self.continue_on_error_checkbox)
         
+        self.reuse_worker_checkbox = QCheckBox("🧰 常驻工作进程 (预加载Playwright和浏览器)")
+        self.reuse_worker_checkbox.setChecked(True)
+        self.reuse_worker_checkbox.setStyleSheet("font-size: 15px;")
+        self.reuse_worker_checkbox.setToolTip("脚本在常驻进程中运行，省去每个脚本启动Python、导入Playwright和启动浏览器的时间")
+        options_layout.addWidget(self.reuse_worker_checkbox)
+        
         control_layout.addLayout(options_layout)
         
         # 执行按钮
@@ -830,11 +894,12 @@ class ImprovedTestGUI(QWidget):
         output_title.setStyleSheet("font-size: 20px; font-weight: bold;")
         output_layout.addWidget(output_title)
         
-        self.output_text = QTextEdit()
+        self.output_text = QPlainTextEdit()
         self.output_text.setReadOnly(True)
+        self.output_text.setMaximumBlockCount(MAX_LOG_VIEW_LINES)
         self.output_text.setFont(QFont("Consolas", 18))
         self.output_text.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #1e1e1e;
                 color: #ffffff;
                 border: 2px solid #ccc;
@@ -850,9 +915,19 @@ class ImprovedTestGUI(QWidget):
         
         clear_btn = QPushButton("🗑️ 清空输出")
         clear_btn.setStyleSheet("QPushButton { font-size: 16px; padding: 10px; }")
-        clear_btn.clicked.connect(self.output_text.clear)
+        clear_btn.clicked.connect(self.clear_output)
         output_control_layout.addWidget(clear_btn)
         
+        filter_label = QLabel("模块筛选:")
+        filter_label.setStyleSheet("font-size: 15px;")
+        output_control_layout.addWidget(filter_label)
+        
+        self.log_filter_combo = QComboBox()
+        self.log_filter_combo.setStyleSheet("font-size: 15px;")
+        self.log_filter_combo.addItem("全部", None)
+        self.log_filter_combo.currentIndexChanged.connect(self.rebuild_output_view)
+        output_control_layout.addWidget(self.log_filter_combo)
+        
         self.auto_scroll_checkbox = QCheckBox("自动滚动")
         self.auto_scroll_checkbox.setChecked(True)
         self.auto_scroll_checkbox.setStyleSheet("font-size: 15px;")
@@ -925,12 +1000,12 @@ SSH用户: {self.test_config.ssh_user}"""
             import re
             ip_match = re.search(r'://([^:/]+)', self.test_config.router_url)
             router_ip = ip_match.group(1) if ip_match else "未知"
-            self.output_text.append(f"✅ 配置已更新，目标路由器: {router_ip}")
+            self.append_output(f"✅ 配置已更新，目标路由器: {router_ip}")
     
     def load_modules(self):
         """加载测试脚本"""
         try:
-            self.output_text.append("正在扫描测试脚本...")
+            self.append_output("正在扫描测试脚本...")
             self.module_status_label.setText("脚本状态: 正在扫描...")
             
             self.module_list.clear()
@@ -952,10 +1027,10 @@ SSH用户: {self.test_config.ssh_user}"""
                     self.module_list.addItem(item)
                 
                 self.module_status_label.setText(f"已找到 {len(self.modules)} 个脚本")
-                self.output_text.append(f"✅ 发现 {len(self.modules)} 个测试脚本:")
+                self.append_output(f"✅ 发现 {len(self.modules)} 个测试脚本:")
                 
                 for i, module in enumerate(self.modules):
-                    self.output_text.append(f"  {i+1}. {module['info']['name']} - {module['file_name']}")
+                    self.append_output(f"  {i+1}. {module['info']['name']} - {module['file_name']}")
                 
                 self.start_btn.setEnabled(True)
                 self.module_list.setEnabled(True)
@@ -964,15 +1039,15 @@ SSH用户: {self.test_config.ssh_user}"""
                     
             else:
                 self.module_status_label.setText("未找到任何脚本")
-                self.output_text.append("❌ 未找到任何测试脚本")
-                self.output_text.append("💡 请检查modules目录下是否有*_module.py文件")
+                self.append_output("❌ 未找到任何测试脚本")
+                self.append_output("💡 请检查modules目录下是否有*_module.py文件")
                 
                 self.start_btn.setEnabled(False)
                 self.module_list.setEnabled(False)
             
         except Exception as e:
             error_msg = f"加载测试脚本失败: {str(e)}"
-            self.output_text.append(error_msg)
+            self.append_output(error_msg)
             self.module_status_label.setText("脚本状态: 加载失败")
     
     def select_all_modules(self):
@@ -1020,7 +1095,7 @@ SSH用户: {self.test_config.ssh_user}"""
         
         if count > 0:
             module_names = [m['info']['name'] for m in self.selected_modules]
-            self.output_text.append(f"📦 已选择 {count} 个测试脚本: {', '.join(module_names)}")
+            self.append_output(f"📦 已选择 {count} 个测试脚本: {', '.join(module_names)}")
     
     def start_test(self):
         """开始测试"""
@@ -1031,7 +1106,11 @@ SSH用户: {self.test_config.ssh_user}"""
             QMessageBox.warning(self, "无法开始测试", "请至少选择一个测试脚本")
             return
         
-        self.output_text.clear()
+        self.clear_output()
+        self.module_statuses.clear()
+        self.module_step_counts.clear()
+        self._set_log_filter_modules([module['info']['name'] for module in self.selected_modules])
+        self._open_run_log()
         
         import re
         ip_match = re.search(r'://([^:/]+)', self.test_config.router_url)
@@ -1039,17 +1118,27 @@ SSH用户: {self.test_config.ssh_user}"""
         
         execution_mode = "sequential" if self.sequential_radio.isChecked() else "parallel"
         
+        worker_pool = None
+        if self.reuse_worker_checkbox.isChecked():
+            if self.worker_pool is None:
+                # 并行模式最多同时执行4个脚本，工作进程按需启动
+                self.worker_pool = WorkerPool(size=4)
+            worker_pool = self.worker_pool
+        
         self.test_thread = ScriptExecutionThread(
             self.test_config,
             self.selected_modules,
             execution_mode,
-            self.continue_on_error_checkbox.isChecked()
+            self.continue_on_error_checkbox.isChecked(),
+            worker_pool
         )
         
-        self.test_thread.output_signal.connect(self.append_output)
+        # 直接在执行线程中写入缓冲（不经过逐行的跨线程信号），保持输出顺序
+        self.test_thread.output_signal.connect(self.log_buffer.add_text, Qt.DirectConnection)
         self.test_thread.finished_signal.connect(self.on_test_finished)
         self.test_thread.progress_signal.connect(self.update_progress)
         self.test_thread.module_status_signal.connect(self.update_module_status)
+        self.test_thread.step_count_signal.connect(self.update_module_step_counts)
         self.test_thread.report_ready.connect(self.on_report_ready)
         
         self.is_testing = True
@@ -1065,16 +1154,26 @@ SSH用户: {self.test_config.ssh_user}"""
         
         mode_name = "顺序执行" if execution_mode == "sequential" else "并行执行"
         
-        self.output_text.append(f"🚀 开始执行多脚本测试 (最小修改版)")
-        self.output_text.append(f"🎯 目标路由器: {router_ip}")
-        self.output_text.append(f"📊 选择脚本数: {len(self.selected_modules)}")
-        self.output_text.append(f"🔧 执行模式: {mode_name}")
-        self.output_text.append(f"⚙️ 测试设置: {'出错继续' if self.continue_on_error_checkbox.isChecked() else '出错停止'}")
-        self.output_text.append(f"⏰ 开始时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        self.output_text.append("=" * 60)
+        self.append_output(f"🚀 开始执行多脚本测试 (最小修改版)")
+        self.append_output(f"🎯 目标路由器: {router_ip}")
+        self.append_output(f"📊 选择脚本数: {len(self.selected_modules)}")
+        self.append_output(f"🔧 执行模式: {mode_name}")
+        self.append_output(f"⚙️ 测试设置: {'出错继续' if self.continue_on_error_checkbox.isChecked() else '出错停止'}")
+        self.append_output(f"🧰 执行方式: {'常驻工作进程' if worker_pool else '每个脚本独立进程'}")
+        self.append_output(f"⏰ 开始时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self.append_output("=" * 60)
+    
+    def closeEvent(self, event):
+        """关闭窗口时停止常驻工作进程，关闭完整日志"""
+        self._close_run_log()
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+            self.worker_pool = None
+        super().closeEvent(event)
     
     def update_module_status(self, module_index: int, status: str):
         """更新脚本状态显示"""
+        self.module_statuses[module_index] = status
         if module_index < len(self.selected_modules):
             for i in range(self.module_list.count()):
                 item = self.module_list.item(i)
@@ -1091,13 +1190,21 @@ SSH用户: {self.test_config.ssh_user}"""
                         }.get(status, "⏳")
                         
                         item_text = f"{status_emoji} {module_info['name']}\n📁 {selected_module['file_name']} | 📝 {module_info.get('description', '无描述')}"
+                        if module_index in self.module_step_counts:
+                            success_steps, fail_steps = self.module_step_counts[module_index]
+                            item_text += f" | ✅ {success_steps} ❌ {fail_steps}"
                         item.setText(item_text)
                         break
     
+    def update_module_step_counts(self, module_index: int, success_steps: int, fail_steps: int):
+        """运行中实时更新脚本的成功/失败步骤数"""
+        self.module_step_counts[module_index] = (success_steps, fail_steps)
+        self.update_module_status(module_index, self.module_statuses.get(module_index, "running"))
+    
     def stop_test(self):
         """停止测试"""
         if self.test_thread and self.test_thread.isRunning():
-            self.output_text.append("⚠️ 用户请求停止测试...")
+            self.append_output("⚠️ 用户请求停止测试...")
             self.test_thread.cancel()
             self.test_thread.wait(5000)
             if self.test_thread.isRunning():
@@ -1120,14 +1227,14 @@ SSH用户: {self.test_config.ssh_user}"""
             fail_count = len([r for r in test_results if r.status in ["失败", "部分失败"]])
             total_count = len(test_results)
             
-            self.output_text.append("=" * 60)
-            self.output_text.append(f"🎉 多脚本测试执行完成！")
-            self.output_text.append(f"📊 测试统计:")
-            self.output_text.append(f"   总脚本数: {total_count}")
-            self.output_text.append(f"   成功: {success_count}")
-            self.output_text.append(f"   失败: {fail_count}")
-            self.output_text.append(f"   成功率: {(success_count/total_count*100):.1f}%")
-            self.output_text.append(f"⏰ 结束时间: {end_time}")
+            self.append_output("=" * 60)
+            self.append_output(f"🎉 多脚本测试执行完成！")
+            self.append_output(f"📊 测试统计:")
+            self.append_output(f"   总脚本数: {total_count}")
+            self.append_output(f"   成功: {success_count}")
+            self.append_output(f"   失败: {fail_count}")
+            self.append_output(f"   成功率: {(success_count/total_count*100):.1f}%")
+            self.append_output(f"⏰ 结束时间: {end_time}")
             
             if success_count > 0:
                 self.progress_label.setText(f"✅ 测试完成 ({success_count}/{total_count} 成功)")
@@ -1135,10 +1242,11 @@ SSH用户: {self.test_config.ssh_user}"""
                 self.progress_label.setText("❌ 测试失败")
         else:
             self.progress_label.setText("❌ 测试失败或被取消")
-            self.output_text.append("=" * 60)
-            self.output_text.append(f"💥 测试失败或被取消")
-            self.output_text.append(f"⏰ 结束时间: {end_time}")
+            self.append_output("=" * 60)
+            self.append_output(f"💥 测试失败或被取消")
+            self.append_output(f"⏰ 结束时间: {end_time}")
         
+        self._close_run_log()
         QTimer.singleShot(1000, self.refresh_reports)
     
     def update_progress(self, value: int, description: str):
@@ -1147,13 +1255,78 @@ SSH用户: {self.test_config.ssh_user}"""
         self.progress_bar.setValue(value)
     
     def append_output(self, text: str):
-        """添加输出"""
-        self.output_text.append(text)
-        
+        """添加输出（先进入缓冲，由定时器批量显示）"""
+        self.log_buffer.add_text(text)
+    
+    def _log_filter_accepts(self, module: str) -> bool:
+        """当前模块筛选是否显示该行"""
+        selected = self.log_filter_combo.currentData()
+        return selected is None or module == selected
+    
+    def _scroll_output_to_end(self):
         if self.auto_scroll_checkbox.isChecked():
-            cursor = self.output_text.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.output_text.setTextCursor(cursor)
+            scroll_bar = self.output_text.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum())
+    
+    def flush_output(self):
+        """定时器回调：把缓冲中的输出一次写入完整日志和输出视图"""
+        lines = self.log_buffer.drain()
+        if not lines:
+            return
+        
+        if self.log_file:
+            try:
+                self.log_file.write("\n".join(text for _, text in lines) + "\n")
+                self.log_file.flush()
+            except Exception as e:
+                print(f"写入完整日志失败: {e}")
+        
+        self.log_lines.extend(lines)
+        visible = [text for module, text in lines if self._log_filter_accepts(module)]
+        if visible:
+            self.output_text.appendPlainText("\n".join(visible[-MAX_LOG_VIEW_LINES:]))
+            self._scroll_output_to_end()
+    
+    def rebuild_output_view(self):
+        """切换模块筛选后按内存中的输出重建视图"""
+        visible = [text for module, text in self.log_lines if self._log_filter_accepts(module)]
+        self.output_text.setPlainText("\n".join(visible[-MAX_LOG_VIEW_LINES:]))
+        self._scroll_output_to_end()
+    
+    def clear_output(self):
+        """清空输出视图（磁盘上的完整日志不受影响）"""
+        self.log_buffer.drain()
+        self.log_lines.clear()
+        self.output_text.clear()
+    
+    def _set_log_filter_modules(self, module_names: List[str]):
+        """按本次选择的脚本重置模块筛选项"""
+        self.log_filter_combo.blockSignals(True)
+        self.log_filter_combo.clear()
+        self.log_filter_combo.addItem("全部", None)
+        self.log_filter_combo.addItem("系统消息", "")
+        for name in module_names:
+            self.log_filter_combo.addItem(name, name)
+        self.log_filter_combo.blockSignals(False)
+    
+    def _open_run_log(self):
+        """为本次测试打开完整输出日志"""
+        self._close_run_log()
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            path = os.path.join(LOG_DIR, f"test_run_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+            self.log_file = open(path, 'w', encoding='utf-8')
+            self.append_output(f"📝 完整日志: {os.path.abspath(path)}")
+        except Exception as e:
+            self.log_file = None
+            self.append_output(f"⚠️ 无法创建完整日志文件: {e}")
+    
+    def _close_run_log(self):
+        """写入剩余输出并关闭完整日志"""
+        if self.log_file:
+            self.flush_output()
+            self.log_file.close()
+            self.log_file = None
     
     def on_report_ready(self, test_results, tester_name: str, test_info: str):
         """处理测试报告就绪信号"""
@@ -1161,7 +1334,7 @@ SSH用户: {self.test_config.ssh_user}"""
             report_file = self.generate_html_report(test_results, tester_name, test_info)
             
             if report_file:
-                self.output_text.append(f"📄 测试报告已生成: {os.path.basename(report_file)}")
+                self.append_output(f"📄 测试报告已生成: {os.path.basename(report_file)}")
                 
                 self.refresh_reports()
                 
@@ -1178,11 +1351,11 @@ SSH用户: {self.test_config.ssh_user}"""
                     
         except Exception as e:
             error_msg = f"生成测试报告时出错: {str(e)}\n{traceback.format_exc()}"
-            self.output_text.append(error_msg)
+            self.append_output(error_msg)
             QMessageBox.critical(self, "错误", f"生成测试报告时出错: {str(e)}")
     
     def generate_html_report(self, test_results, tester_name: str, test_info: str) -> str:
-        """生成HTML测试报告"""
+        """生成HTML测试报告（流式写入，完整日志展开时才加载）"""
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         report_file = os.path.join(os.getcwd(), f"test_report_{timestamp}.html")
         
@@ -1193,8 +1366,8 @@ SSH用户: {self.test_config.ssh_user}"""
         summary_html = f"""
         <h2>多脚本测试结果汇总</h2>
         <table border='1' cellpadding='10' cellspacing='0' style='border-collapse: collapse; width: 100%; font-size: 16px;'>
-          <tr><td style='background-color: #f2f2f2; font-weight: bold; width: 25%;'>测试人员</td><td>{tester_name}</td></tr>
-          <tr><td style='background-color: #f2f2f2; font-weight: bold;'>测试信息</td><td>{test_info}</td></tr>
+          <tr><td style='background-color: #f2f2f2; font-weight: bold; width: 25%;'>测试人员</td><td>{html.escape(str(tester_name))}</td></tr>
+          <tr><td style='background-color: #f2f2f2; font-weight: bold;'>测试信息</td><td>{html.escape(str(test_info))}</td></tr>
           <tr><td style='background-color: #f2f2f2; font-weight: bold;'>脚本总数</td><td>{total_count}</td></tr>
           <tr style='background-color: #d4edda;'><td style='background-color: #f2f2f2; font-weight: bold;'>成功脚本</td><td style='color: green; font-weight: bold; font-size: 18px;'>{success_count}</td></tr>
           <tr style='background-color: #f8d7da;'><td style='background-color: #f2f2f2; font-weight: bold;'>失败脚本</td><td style='color: red; font-weight: bold; font-size: 18px;'>{fail_count}</td></tr>
@@ -1202,56 +1375,13 @@ SSH用户: {self.test_config.ssh_user}"""
         </table>
         """
         
-        detail_html = """
-        <h3>详细脚本执行信息</h3>
-        <table border='1' cellpadding='10' cellspacing='0' style='border-collapse: collapse; width: 100%; font-size: 15px;'>
-          <tr style='background-color: #f8f9fa;'>
-            <th style='font-size: 16px;'>编号</th>
-            <th style='font-size: 16px;'>测试脚本</th>
-            <th style='font-size: 16px;'>开始时间</th>
-            <th style='font-size: 16px;'>结束时间</th>
-            <th style='font-size: 16px;'>执行时长(s)</th>
-            <th style='font-size: 16px;'>执行结果</th>
-            <th style='font-size: 16px;'>成功步骤</th>
-            <th style='font-size: 16px;'>失败步骤</th>
-            <th style='font-size: 16px;'>完整执行日志</th>
-          </tr>
-        """
-        
-        for i, result in enumerate(test_results):
-            status_color = "#28a745" if result.status == "成功" else "#dc3545"
-            
-            execution_details_html = (
-                f"<details><summary style='cursor: pointer; color: blue; font-size: 14px; font-weight: bold;'>"
-                f"点击查看完整执行日志</summary>"
-                f"<div style='max-height: 600px; overflow-y: auto; background-color: #f8f9fa; padding: 15px; border-radius: 4px; border: 1px solid #ddd; margin: 10px 0;'>"
-                f"<pre style='white-space: pre-wrap; font-size: 13px; font-family: Consolas, monospace; margin: 0; line-height: 1.4;'>"
-                + result.full_output
-                + "</pre></div></details>"
-            )
-            
-            detail_html += f"""
-            <tr style='border-bottom: 1px solid #dee2e6;'>
-              <td style='text-align: center; font-weight: bold;'>{i+1}</td>
-              <td style='font-weight: bold;'>{result.test_name}</td>
-              <td>{result.start_time.strftime("%Y-%m-%d %H:%M:%S") if result.start_time else "未知"}</td>
-              <td>{result.end_time.strftime("%Y-%m-%d %H:%M:%S") if result.end_time else "未知"}</td>
-              <td style='text-align: center; font-weight: bold;'>{result.get_duration_seconds():.1f}</td>
-              <td style='color: {status_color}; font-weight: bold; text-align: center; font-size: 16px;'>{result.status}</td>
-              <td style='text-align: center; color: green; font-weight: bold;'>{result.success_steps}</td>
-              <td style='text-align: center; color: red; font-weight: bold;'>{result.fail_steps}</td>
-              <td>{execution_details_html}</td>
-            </tr>
-            """
-        
-        detail_html += "</table>"
-        
-        html_content = f"""
+        with HtmlReportWriter(report_file) as report:
+            report.write(f"""
         <!DOCTYPE html>
         <html lang="zh-CN">
         <head>
           <meta charset="utf-8"/>
-          <title>多脚本自动化测试报告 - {test_info}</title>
+          <title>多脚本自动化测试报告 - {report.escape(test_info)}</title>
           <style>
             body {{
                 font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', sans-serif;
@@ -1324,6 +1454,9 @@ SSH用户: {self.test_config.ssh_user}"""
                 white-space: pre-wrap;
             }}
           </style>
+        """)
+            report.write_log_loader()
+            report.write(f"""
         </head>
         <body>
           <h1>🔬 多脚本自动化测试报告 (v5.4 最小修改版)</h1>
@@ -1337,18 +1470,60 @@ SSH用户: {self.test_config.ssh_user}"""
           {summary_html}
           
           <hr style="border: none; border-top: 2px solid #ecf0f1; margin: 40px 0;">
-          
-          {detail_html}
+        """)
+            
+            report.write("""
+        <h3>详细脚本执行信息</h3>
+        <table border='1' cellpadding='10' cellspacing='0' style='border-collapse: collapse; width: 100%; font-size: 15px;'>
+          <tr style='background-color: #f8f9fa;'>
+            <th style='font-size: 16px;'>编号</th>
+            <th style='font-size: 16px;'>测试脚本</th>
+            <th style='font-size: 16px;'>开始时间</th>
+            <th style='font-size: 16px;'>结束时间</th>
+            <th style='font-size: 16px;'>执行时长(s)</th>
+            <th style='font-size: 16px;'>执行结果</th>
+            <th style='font-size: 16px;'>成功步骤</th>
+            <th style='font-size: 16px;'>失败步骤</th>
+            <th style='font-size: 16px;'>执行日志</th>
+          </tr>
+        """)
+            
+            # 每个脚本一行，完整日志转成旁路文件，展开时才加载
+            for i, result in enumerate(test_results):
+                status_color = "#28a745" if result.status == "成功" else "#dc3545"
+                
+                report.write(f"""
+            <tr style='border-bottom: 1px solid #dee2e6;'>
+              <td style='text-align: center; font-weight: bold;'>{i+1}</td>
+              <td style='font-weight: bold;'>{report.escape(result.test_name)}</td>
+              <td>{result.start_time.strftime("%Y-%m-%d %H:%M:%S") if result.start_time else "未知"}</td>
+              <td>{result.end_time.strftime("%Y-%m-%d %H:%M:%S") if result.end_time else "未知"}</td>
+              <td style='text-align: center; font-weight: bold;'>{result.get_duration_seconds():.1f}</td>
+              <td style='color: {status_color}; font-weight: bold; text-align: center; font-size: 16px;'>{report.escape(result.status)}</td>
+              <td style='text-align: center; color: green; font-weight: bold;'>{result.success_steps}</td>
+              <td style='text-align: center; color: red; font-weight: bold;'>{result.fail_steps}</td>
+              <td>""")
+                
+                # 失败摘录很短，直接内嵌
+                if result.failure_logs:
+                    report.write(
+                        f"<details><summary style='cursor: pointer; color: #dc3545; font-size: 14px; font-weight: bold;'>"
+                        f"失败摘录 ({len(result.failure_logs)} 行)</summary>"
+                        f"<pre style='white-space: pre-wrap; font-size: 13px; font-family: Consolas, monospace; margin: 0; line-height: 1.4;'>"
+                        f"{report.escape(chr(10).join(result.failure_logs))}</pre></details>"
+                    )
+                report.write_log(f"{i+1:03d}", result.log_path, result.log_lines)
+                report.write("</td>\n            </tr>")
+            
+            report.write("""
+        </table>
           
           <footer style="margin-top: 50px; text-align: center; color: #6c757d; font-size: 15px;">
             <p>🚀 平台版本: v5.4 最小修改版 | 📦 支持多脚本批量测试</p>
           </footer>
         </body>
         </html>
-        """
-        
-        with open(report_file, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        """)
         
         return report_file
     
@@ -1407,7 +1582,7 @@ SSH用户: {self.test_config.ssh_user}"""
                 else:
                     subprocess.run(["xdg-open", report_path])
                 
-                self.output_text.append(f"📖 已打开测试报告: {os.path.basename(report_path)}")
+                self.append_output(f"📖 已打开测试报告: {os.path.basename(report_path)}")
             except Exception as e:
                 QMessageBox.warning(self, "错误", f"打开报告失败: {str(e)}")
         else:
@@ -1424,7 +1599,7 @@ SSH用户: {self.test_config.ssh_user}"""
             else:
                 subprocess.run(["xdg-open", folder_path])
             
-            self.output_text.append(f"📁 已打开报告文件夹: {folder_path}")
+            self.append_output(f"📁 已打开报告文件夹: {folder_path}")
         except Exception as e:
             QMessageBox.warning(self, "错误", f"打开文件夹失败: {str(e)}")
 
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""流式日志分类器
+
+脚本输出逐行送入LogClassifier.feed，边运行边累计成功/失败步骤数。
+所有关键词和忽略规则合并成一个预编译的正则（按类别命名分组的交替式），
+每行只扫描一次，几MB的日志也是线性时间，不再在脚本结束后整体重扫。
+"""
+import re
+from typing import Iterable, List, Optional, Tuple
+
+# 真正的失败关键词（排除误判）
+FAILURE_KEYWORDS = (
+    '测试失败', '执行失败', '连接失败', '登录失败', '创建失败', '删除失败',
+    'FAIL', 'failed', 'Exception', 'Traceback', 'Error:', '异常',
+    '无法连接', '超时', 'timeout', '找不到元素', '元素不存在',
+)
+
+# 成功关键词
+SUCCESS_KEYWORDS = (
+    '成功', '完成', '✅', 'SUCCESS', '已启用', '已停用',
+    '创建成功', 'passed', '测试通过', '验证成功', '连接成功',
+    '删除成功', '配置成功', '保存成功',
+)
+
+# 需要忽略的"错误"（这些不是真正的失败），命中后整行不计入成功或失败
+IGNORE_PATTERNS = (
+    r'服务器地址/域名.*字段必填',
+    r'字段必填',
+    r'请输入',
+    r'请选择',
+    r'格式不正确',
+    r'用户.*请求',
+)
+
+# 最多保留的失败行数，避免异常刷屏时占满内存
+MAX_FAILURE_LOGS = 500
+
+
+def _alternation(patterns: Iterable[str]) -> str:
+    # 长的在前，避免"成功"抢先匹配掉"创建成功"这类更具体的关键词
+    return "|".join(sorted(patterns, key=len, reverse=True))
+
+
+class LogClassifier:
+    """逐行分类脚本输出，实时累计成功/失败步骤数"""
+
+    def __init__(self, failure_keywords: Iterable[str] = FAILURE_KEYWORDS,
+                 success_keywords: Iterable[str] = SUCCESS_KEYWORDS,
+                 ignore_patterns: Iterable[str] = IGNORE_PATTERNS,
+                 max_failure_logs: int = MAX_FAILURE_LOGS):
+        self.matcher = re.compile(
+            f"(?P<ignore>{_alternation(ignore_patterns)})"
+            f"|(?P<fail>{_alternation(re.escape(k) for k in failure_keywords)})"
+            f"|(?P<ok>{_alternation(re.escape(k) for k in success_keywords)})",
+            re.IGNORECASE)
+        self.max_failure_logs = max_failure_logs
+        self.reset()
+
+    def reset(self):
+        self.success_steps = 0
+        self.fail_steps = 0
+        self.failure_logs: List[str] = []
+
+    def classify(self, line: str) -> Tuple[bool, bool]:
+        """返回(是否失败, 是否成功)，命中忽略规则时两者都为False"""
+        is_failure = is_success = False
+        for match in self.matcher.finditer(line):
+            kind = match.lastgroup
+            if kind == "ignore":
+                return False, False
+            if kind == "fail":
+                is_failure = True
+            else:
+                is_success = True
+        return is_failure, is_success
+
+    def feed(self, line: str) -> Optional[str]:
+        """处理一行输出并累计计数，返回"fail"/"success"或None"""
+        line = line.strip()
+        if not line:
+            return None
+        is_failure, is_success = self.classify(line)
+        if is_failure:
+            self.fail_steps += 1
+            if len(self.failure_logs) < self.max_failure_logs:
+                self.failure_logs.append(line)
+        if is_success:
+            self.success_steps += 1
+        if is_failure:
+            return "fail"
+        return "success" if is_success else None
+
+    @property
+    def status(self) -> Optional[str]:
+        """按步骤数判断的状态，没有任何可判断的输出时返回None"""
+        if self.fail_steps > 0:
+            return "部分失败" if self.success_steps > self.fail_steps else "失败"
+        if self.success_steps > 0:
+            return "成功"
+        return None
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""模块输出日志存储
+
+脚本运行时每行输出直接追加到该模块自己的gzip文件，内存里只保留文件位置、
+行数和字节数；报告或界面需要完整日志时再用iter_log_lines从磁盘读取。
+"""
+import gzip
+import os
+import re
+from typing import Iterator, Optional
+
+# gzip压缩级别：日志文本压缩率很高，6级在速度和体积之间比较均衡
+LOG_COMPRESS_LEVEL = 6
+
+# 文件名中需要替换的字符
+_UNSAFE_NAME = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+class ModuleLog:
+    """单个模块的压缩输出日志，边运行边写入"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lines = 0
+        self.bytes = 0  # 未压缩的字节数
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=LOG_COMPRESS_LEVEL)
+
+    def write(self, line: str):
+        if self._file is None:
+            return
+        data = line + "\n"
+        self._file.write(data)
+        self.lines += 1
+        self.bytes += len(data.encode("utf-8"))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def compressed_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+
+class ModuleLogStore:
+    """一次测试的模块日志目录，每个模块一个.log.gz文件"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def open(self, test_id: int, test_name: str) -> ModuleLog:
+        os.makedirs(self.directory, exist_ok=True)
+        safe_name = _UNSAFE_NAME.sub("_", test_name).strip("_") or "module"
+        return ModuleLog(os.path.join(self.directory, f"{test_id:02d}_{safe_name}.log.gz"))
+
+
+def iter_log_lines(path: str, limit: Optional[int] = None) -> Iterator[str]:
+    """逐行读取模块日志（不含换行符），limit限制最多读取的行数"""
+    with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+        for count, line in enumerate(f):
+            if limit is not None and count >= limit:
+                break
+            yield line.rstrip("\n")
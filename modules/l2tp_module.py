@@ -5,17 +5,38 @@ import argparse
 from typing import Optional
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from test_framework import RouterTestModule, RouterTestConfig
+from test_framework import (
+    RouterTestModule, RouterTestConfig, FormField, FormSchema, NAMESPACE_ENV_VAR, vpn_client_api_entry
+)
+from profile_allocator import ProfileAllocator
 from playwright.sync_api import expect
-import time
+
+# L2TP表单字段声明（标签、选择器、profile中的键、类型），不同固件的字段名不同，按顺序尝试
+L2TP_FORM_SCHEMA = FormSchema("L2TP表单", [
+    FormField("隧道名称", ['input[data-vv-as="隧道名称"]', 'input[placeholder*="隧道名称"]'], "name"),
+    FormField("服务端口", ['input[data-vv-as="服务端口"]', 'input[name="port"]', 'input[name="server_port"]'], "port"),
+    FormField("服务器地址/域名", ['input[data-vv-as="服务器地址/域名"]', 'input[name="server"]', 'input[name="host"]'],
+              "server"),
+    FormField("用户名", ['input[data-vv-as="用户名"]', 'input[name="username"]', 'input[name="user"]'], "user"),
+    FormField("密码", ['input[data-vv-as="密码"]', 'input[name="password"]', 'input[name="passwd"]',
+                     'input[type="password"]'], "pass"),
+    FormField("MTU", ['input[name="mtu"]'], "mtu"),
+    FormField("MRU", ['input[name="mru"][aria-required="true"]', 'input[name="mru"]'], "mru"),
+    FormField("线路", ['select.focuseText.selects[name="interface"]', 'select[name="interface"]'], "line",
+              kind="select", required=False),
+    FormField("间隔时长重拨", ['input[name="cycle_rst_time"]'], "reconnect_interval", required=False),
+    FormField("备注", ['input[name="comment"]'], "comment", required=False),
+])
 
 class L2TPTestModule(RouterTestModule):
     """L2TP测试模块 - 完整12个步骤，支持自定义IP地址（优化版）"""
     
+    api_kind = "l2tp"
+    
     def __init__(self, config: RouterTestConfig):
         super().__init__(config)
         self.test_profile = {
-            "name": "l2tp_test_01",
+            "name": self.namespaced("l2tp_test_01"),
             "port": "1701", 
             "server": "10.66.0.4",
             "user": "testuser",
@@ -29,9 +50,25 @@ class L2TPTestModule(RouterTestModule):
                 "days": ["周一", "周三", "周五"],
                 "times": ["03:30", "04:30", "05:30"]
             },
-            "comment": "PlaywrightE2ETest"
+            "comment": self.namespaced("PlaywrightE2ETest")
         }
         self.batch_create_count = 5
+        # 批量配置名称分配器，跳过已有的名称
+        self.allocator = ProfileAllocator()
+        self.allocator.reserve(names=[self.test_profile["name"]])
+    
+    def _profile_to_api_entry(self, profile: dict) -> dict:
+        """L2TP配置转换为接口参数"""
+        return vpn_client_api_entry(profile)
+    
+    def _build_batch_profiles(self, count: int) -> list:
+        """生成批量创建用的配置列表"""
+        profiles = []
+        for name in self.allocator.names(self.namespaced("l2tp_test_"), count):  # l2tp_test_02, l2tp_test_03, ...
+            profile = self.test_profile.copy()
+            profile["name"] = name
+            profiles.append(profile)
+        return profiles
     
     def get_module_info(self) -> dict:
         """获取模块信息"""
@@ -55,18 +92,14 @@ class L2TPTestModule(RouterTestModule):
         self._wait_for_page_ready()
         print("已进入 L2TP 页面")
     
-    def _wait_for_page_ready(self):
-        """等待页面恢复到可操作状态（借鉴VLAN）"""
+    def _wait_for_page_ready(self, legacy_sleep: float = 0.0):
+        """等待页面恢复到可操作状态（借鉴VLAN），legacy_sleep为被替代的固定等待秒数"""
         print("⏳ 等待页面恢复...")
-        for attempt in range(15):  # 增加等待时间适应MIPS路由
-            try:
-                add_button = self.page.locator('a.btn_green:has-text("添加")').first
-                if add_button.is_visible() and add_button.is_enabled():
-                    print("✅ 页面已恢复")
-                    return True
-                time.sleep(1)
-            except:
-                time.sleep(1)
+        add_button = self.page.locator('a.btn_green:has-text("添加")').first
+        if self.waits.until(lambda: add_button.is_visible() and add_button.is_enabled(),
+                            timeout=15, legacy_sleep=legacy_sleep, description="添加按钮恢复"):  # 超时时间适应MIPS路由
+            print("✅ 页面已恢复")
+            return True
         
         print("⚠️ 页面恢复超时")
         return False
@@ -74,23 +107,11 @@ class L2TPTestModule(RouterTestModule):
     def _wait_for_form(self):
         """等待表单出现（借鉴VLAN）"""
         print("🔍 等待L2TP表单出现...")
-        # 等待真正的输入字段出现
-        for attempt in range(10):
-            try:
-                # 查找text类型的输入字段，排除button和search类型
-                text_inputs = self.page.locator('input[type="text"]:not(.search_inpt):not([name="searchText"]):visible')
-                if text_inputs.count() > 0:
-                    # 检查是否有name属性，确保是表单字段
-                    for i in range(text_inputs.count()):
-                        field = text_inputs.nth(i)
-                        name = field.get_attribute('name') or ""
-                        if name and name != "searchText":
-                            print("✅ 检测到L2TP表单输入字段")
-                            return True
-                
-                time.sleep(0.5)
-            except:
-                time.sleep(0.5)
+        # 等待真正的输入字段出现（带name属性的text输入框，排除搜索框）
+        form_selector = 'input[type="text"][name]:not(.search_inpt):not([name="searchText"])'
+        if self.waits.until(lambda: self.waits.is_visible(form_selector), timeout=5, description="表单出现"):
+            print("✅ 检测到L2TP表单输入字段")
+            return True
         
         print("❌ L2TP表单加载超时")
         return False
@@ -138,7 +159,7 @@ class L2TPTestModule(RouterTestModule):
                     if button.is_visible():
                         button.click()
                         print("✅ 已取消L2TP表单")
-                        time.sleep(1)
+                        self.waits.for_dom_quiet(timeout=3, legacy_sleep=1, description="取消表单")
                         return True
             
             # 如果没有找到取消按钮，按ESC键
@@ -166,7 +187,7 @@ class L2TPTestModule(RouterTestModule):
                     if button.is_visible():
                         button.click()
                         print("✅ 关闭L2TP模态弹窗")
-                        time.sleep(1)
+                        self.waits.for_modal_gone(timeout=3, legacy_sleep=1, description="关闭模态弹窗")
                         break
         except:
             pass
@@ -175,7 +196,7 @@ class L2TPTestModule(RouterTestModule):
         """验证保存是否成功（借鉴VLAN）"""
         try:
             # 等待保存完成的指示
-            time.sleep(3)
+            self.waits.for_dom_quiet(timeout=5, legacy_sleep=3, description="保存完成")
             
             # 检查是否有成功提示或表单关闭
             success_indicators = [
@@ -214,19 +235,15 @@ class L2TPTestModule(RouterTestModule):
     def _verify_config_created(self, config_name: str):
         """验证配置是否创建成功（借鉴VLAN）"""
         try:
-            # 等待页面更新
-            time.sleep(3)
-            
-            # 多次尝试验证
-            for attempt in range(5):
-                # 检查表格中是否存在配置
-                config_row = self.page.locator(f'tr:has-text("{config_name}")')
-                if config_row.count() > 0 and config_row.first.is_visible():
-                    print(f"✅ L2TP配置 {config_name} 创建成功")
-                    return True
-                
-                if attempt < 4:
-                    time.sleep(2)
+            # 等待表格中出现该配置
+            config_row = self.page.locator(f'tr:has-text("{config_name}")')
+            row_visible = lambda: config_row.count() > 0 and config_row.first.is_visible()
+            self.waits.until(lambda: row_visible() or self.table_pager().get("hasNext"),
+                             timeout=11, legacy_sleep=3, description="配置出现在表格")
+            # 表格分页时新配置可能不在当前页，逐页查找（找到后停留在该页）
+            if row_visible() or self.find_table_row(lambda row: config_name in row.text):
+                print(f"✅ L2TP配置 {config_name} 创建成功")
+                return True
             
             print(f"⚠️ L2TP配置 {config_name} 未在表格中找到")
             return False
@@ -234,54 +251,6 @@ class L2TPTestModule(RouterTestModule):
             print(f"⚠️ L2TP配置 {config_name} 验证失败: {e}")
             return False
     
-    def _find_field_by_selectors(self, selectors, field_name):
-        """通过多个选择器查找字段"""
-        for selector in selectors:
-            try:
-                field = self.page.locator(selector).first
-                if field.is_visible(timeout=2000):
-                    print(f"找到{field_name}字段，使用选择器: {selector}")
-                    return field
-            except:
-                continue
-        
-        # 如果都找不到，抛出异常
-        raise Exception(f"无法找到{field_name}字段，尝试了{len(selectors)}个选择器")
-    
-    def _fill_form_field_flexible(self, field_label, value):
-        """灵活填写表单字段"""
-        selectors = [
-            f'input[data-vv-as="{field_label}"]',
-            f'input[placeholder*="{field_label}"]',
-            f'div:has-text("{field_label}") input',
-            f'div.line_edit:has(div.input_tit:has-text("{field_label}")) input',
-            f'input[name="{field_label.lower()}"]',
-            f'input[name*="{field_label.lower()}"]'
-        ]
-        
-        # 特殊处理一些字段
-        if "MTU" in field_label:
-            selectors.append('input[name="mtu"]')
-        elif "MRU" in field_label:
-            selectors.append('input[name="mru"]')
-            selectors.append('input[name="mru"][aria-required="true"]')
-        elif "端口" in field_label:
-            selectors.append('input[name="port"]')
-        elif "服务器" in field_label:
-            selectors.append('input[name="server"]')
-            selectors.append('input[name="host"]')
-        elif "用户名" in field_label:
-            selectors.append('input[name="username"]')
-            selectors.append('input[name="user"]')
-        elif "密码" in field_label:
-            selectors.append('input[name="password"]')
-            selectors.append('input[name="pass"]')
-            selectors.append('input[type="password"]')
-        
-        field = self._find_field_by_selectors(selectors, field_label)
-        field.fill(value)
-        print(f"{field_label}填写: {value}")
-    
     def step3_create_profile(self, profile: dict = None, show_step_info: bool = True):
         """步骤3: 创建L2TP配置（优化版）"""
         if profile is None:
@@ -293,7 +262,7 @@ class L2TPTestModule(RouterTestModule):
             print(f"📝 创建L2TP配置 '{profile['name']}'")
         
         # 等待页面稳定
-        time.sleep(1)
+        self.waits.for_dom_quiet(timeout=2, legacy_sleep=1, description="页面稳定")
         
         # 点击添加按钮 - 增加重试机制（借鉴VLAN）
         add_button = self.page.locator('a.btn_green:has-text("添加")').first
@@ -308,15 +277,15 @@ class L2TPTestModule(RouterTestModule):
             except Exception as e:
                 print(f"❌ 第{attempt+1}次点击L2TP添加按钮失败: {e}")
                 if attempt < 2:
-                    time.sleep(3)  # 增加等待时间
+                    self.waits.pause(1, description="添加按钮重试间隔", legacy_sleep=3)
                     # 刷新页面重试
                     self.page.reload()
-                    time.sleep(3)
+                    self.waits.for_dom_quiet(timeout=8, legacy_sleep=3, description="刷新后页面稳定")
                     self.navigate_to_module()
                 else:
                     raise e
         
-        time.sleep(3)  # 增加等待时间
+        self.waits.for_dom_quiet(timeout=5, legacy_sleep=3, description="添加表单渲染")
         
         # 等待表单出现（使用VLAN的方法）
         print("🔍 等待L2TP表单出现...")
@@ -340,7 +309,7 @@ class L2TPTestModule(RouterTestModule):
             save_success = self._save_l2tp_form()
             if save_success:
                 # 等待保存完成
-                time.sleep(5)
+                self._wait_for_page_ready(legacy_sleep=5)
                 
                 # 关闭可能的弹窗
                 self._close_modals()
@@ -364,95 +333,20 @@ class L2TPTestModule(RouterTestModule):
             return False
     
     def _fill_l2tp_form(self, profile):
-        """填写L2TP表单（优化版）"""
+        """填写L2TP表单（按L2TP_FORM_SCHEMA一次填写并回读）"""
         print("📝 开始填写L2TP表单...")
-        
-        # 多种方式查找隧道名称字段
-        tunnel_name_selectors = [
-            'input[data-vv-as="隧道名称"]',
-            'input[placeholder*="隧道名称"]', 
-            'input[placeholder*="名称"]',
-            'div:has-text("隧道名称") input',
-            'div.line_edit:has(div.input_tit:has-text("隧道名称")) input',
-            'input[name*="name"]',
-            'input.inputText'
-        ]
-        
-        try:
-            tunnel_name_field = self._find_field_by_selectors(tunnel_name_selectors, "隧道名称")
-            tunnel_name_field.fill(profile["name"])
-            print(f"隧道名称填写: {profile['name']}")
-        except Exception as e:
-            print(f"❌ 隧道名称填写失败: {e}")
-            return False
-        
-        # 基础字段 - 使用更灵活的选择器
-        try:
-            self._fill_form_field_flexible("服务端口", profile["port"])
-            self._fill_form_field_flexible("服务器地址/域名", profile["server"]) 
-            self._fill_form_field_flexible("用户名", profile["user"])
-            self._fill_form_field_flexible("密码", profile["pass"])
-            self._fill_form_field_flexible("MTU", profile["mtu"])
-            self._fill_form_field_flexible("MRU", profile["mru"])
-            print("L2TP基础信息填写完成")
-        except Exception as e:
-            print(f"❌ L2TP基础字段填写失败: {e}")
+    
+        if not self.fill_form(L2TP_FORM_SCHEMA, profile):
+            print("❌ L2TP基础字段填写失败")
             return False
-        
-        # 选择线路（增加等待和错误处理）
-        try:
-            print("正在选择线路...")
-            sel = self.page.locator(
-                'div.line_edit:has(div.input_tit:has-text("线路：")) select.focuseText.selects'
-            ).first
-            expect(sel).to_be_visible(timeout=8000)  # 增加超时时间
-            sel.scroll_into_view_if_needed()
-            time.sleep(1)  # 等待选择器加载完成
-            
-            values = sel.locator('option').evaluate_all("els => els.map(e => e.value)")
-            texts = sel.locator('option').evaluate_all("els => els.map(e => e.textContent.trim())")
-            print("可选线路:", list(zip(values, texts)))
-            
-            if len(values) > 1 and values[1] != profile["line"]:
-                sel.select_option(values[1])
-                time.sleep(1)  # 增加等待时间
-                print("临时切换线路:", values[1])
-            sel.select_option(profile["line"])
-            print("最终选择线路:", profile["line"])
-        except Exception as e:
-            print(f"⚠️ 线路选择失败: {e}")
-        
-        # 填写间隔时长重拨（增加错误处理）
-        try:
-            print("填写间隔时长重拨...")
-            iv = self.page.locator(
-                'div.line_edit:has(div.input_tit:has-text("间隔时长重拨：")) input[name="cycle_rst_time"]'
-            ).first
-            expect(iv).to_be_visible(timeout=8000)  # 增加超时时间
-            iv.fill(profile["reconnect_interval"])
-            print("间隔时长重拨填写:", profile["reconnect_interval"])
-        except Exception as e:
-            print(f"⚠️ 间隔时长重拨填写失败: {e}")
-        
+    
         # 配置定时重拨
         if profile["scheduled_reconnect"]["enabled"]:
             try:
                 self._configure_scheduled_reconnect(profile["scheduled_reconnect"])
             except Exception as e:
                 print(f"⚠️ 定时重拨配置失败: {e}")
-        
-        # 填写备注（增加错误处理）
-        try:
-            print("填写备注...")
-            remark = self.page.locator(
-                'div.line_edit:has(div.input_tit:has-text("备注：")) input'
-            ).first
-            expect(remark).to_be_visible(timeout=8000)  # 增加超时时间
-            remark.fill(profile["comment"])
-            print("备注填写:", profile["comment"])
-        except Exception as e:
-            print(f"⚠️ 备注填写失败: {e}")
-        
+    
         return True
     
     def _save_l2tp_form(self):
@@ -485,12 +379,13 @@ class L2TPTestModule(RouterTestModule):
                         
                         # 滚动到按钮位置
                         button.scroll_into_view_if_needed()
-                        time.sleep(1)  # 增加等待时间
+                        self.waits.for_dom_quiet(timeout=2, legacy_sleep=1, description="滚动到保存按钮")
                         
                         # 点击保存按钮
+                        marker = self.waits.mark()
                         button.click()
                         print("✅ 点击L2TP保存按钮")
-                        time.sleep(3)  # 增加等待时间
+                        self.waits.for_action_call(marker, timeout=8, legacy_sleep=3, description="保存响应")
                         
                         # 检查是否有保存成功的指示
                         return self._verify_save_success()
@@ -515,7 +410,7 @@ class L2TPTestModule(RouterTestModule):
             # 开启定时重拨
             sc_label.locator('label.checkbox:has-text("开启")').click()
             print("定时重拨已开启")
-            time.sleep(1)  # 等待界面更新
+            self.waits.for_dom_quiet(timeout=3, legacy_sleep=1, description="定时重拨展开")
             
             # 选择日期
             for day in schedule_config["days"]:
@@ -524,7 +419,7 @@ class L2TPTestModule(RouterTestModule):
                     if lbl.count():
                         lbl.click()
                         print("  已选中", day)
-                        time.sleep(0.5)  # 增加等待时间
+                        self.waits.for_dom_quiet(timeout=2, legacy_sleep=0.5, description="选中星期")
                 except Exception as e:
                     print(f"  选择日期 {day} 失败: {e}")
             
@@ -538,11 +433,11 @@ class L2TPTestModule(RouterTestModule):
                     expect(inp).to_be_visible(timeout=5000)
                     inp.fill(t)
                     print(f'  填写 {name} = {t}')
-                    time.sleep(0.5)
+                    self.waits.for_dom_quiet(timeout=2, legacy_sleep=0.5, description="填写时间")
                 except Exception as e:
                     print(f'  填写时间 {name} 失败: {e}')
             
-            time.sleep(1)  # 增加等待时间
+            self.waits.for_dom_quiet(timeout=3, legacy_sleep=1, description="定时重拨填写完成")
             # 打印可能的校验错误
             errs = sc_label.locator('p.error_tip')
             for i in range(errs.count()):
@@ -556,15 +451,16 @@ class L2TPTestModule(RouterTestModule):
         print("步骤4: 停用L2TP配置", profile_name)
         
         # 增加等待确保页面加载完成
-        time.sleep(2)
+        self.waits.for_dom_quiet(timeout=5, legacy_sleep=2, description="页面加载")
         
         row = self.page.locator(f'tr:has-text("{profile_name}")')
         if row.count() > 0:
             self.page.on("dialog", lambda d: d.accept())
             stop_button = row.locator('a:text("停用")')
             if stop_button.count() > 0:
+                marker = self.waits.mark()
                 stop_button.click()
-                time.sleep(3)  # 增加等待时间
+                self.waits.for_action_call(marker, timeout=8, legacy_sleep=3, description="停用响应")
                 expect(row.get_by_text("已停用")).to_be_visible(timeout=8000)
                 print("L2TP配置已停用")
             else:
@@ -577,15 +473,16 @@ class L2TPTestModule(RouterTestModule):
         print("步骤5: 启用L2TP配置", profile_name)
         
         # 增加等待确保页面加载完成
-        time.sleep(2)
+        self.waits.for_dom_quiet(timeout=5, legacy_sleep=2, description="页面加载")
         
         row = self.page.locator(f'tr:has-text("{profile_name}")')
         if row.count() > 0:
             self.page.on("dialog", lambda d: d.accept())
             enable_button = row.locator('a:text("启用")')
             if enable_button.count() > 0:
+                marker = self.waits.mark()
                 enable_button.click()
-                time.sleep(3)  # 增加等待时间
+                self.waits.for_action_call(marker, timeout=8, legacy_sleep=3, description="启用响应")
                 expect(row.get_by_text("已启用")).to_be_visible(timeout=8000)
                 print("L2TP配置已启用")
             else:
@@ -598,7 +495,7 @@ class L2TPTestModule(RouterTestModule):
         print("步骤6: L2TP表单必填项验证", profile_name)
         
         # 增加等待确保页面稳定
-        time.sleep(2)
+        self.waits.for_dom_quiet(timeout=5, legacy_sleep=2, description="页面稳定")
         
         row = self.page.locator(f'tr:has-text("{profile_name}")')
         if row.count() > 0:
@@ -607,90 +504,14 @@ class L2TPTestModule(RouterTestModule):
                 edit_button.click()
                 
                 # 等待编辑页面加载（使用VLAN的方法）
-                time.sleep(3)
                 if not self._wait_for_form():
                     print("❌ 编辑表单未加载，跳过验证")
                     return
                 
-                field_configs = [
-                    {"label": "隧道名称", "value": self.test_profile["name"]},
-                    {"label": "服务端口", "value": self.test_profile["port"]},
-                    {"label": "服务器地址/域名", "value": self.test_profile["server"]},
-                    {"label": "用户名", "value": self.test_profile["user"]},
-                    {"label": "密码", "value": self.test_profile["pass"]},
-                    {"label": "MTU", "value": self.test_profile["mtu"]},
-                    {"label": "MRU", "value": self.test_profile["mru"]},
-                    {"label": "间隔时长重拨", "value": self.test_profile["reconnect_interval"]}
-                ]
-                
-                for field_config in field_configs:
-                    label = field_config["label"]
-                    orig_value = field_config["value"]
-                    
-                    print(f"验证L2TP字段: {label}")
-                    try:
-                        # 查找字段并清空
-                        if label == "隧道名称":
-                            tunnel_name_selectors = [
-                                'input[data-vv-as="隧道名称"]',
-                                'input[placeholder*="隧道名称"]', 
-                                'div:has-text("隧道名称") input',
-                                'div.line_edit:has(div.input_tit:has-text("隧道名称")) input',
-                                'input.inputText'
-                            ]
-                            field = self._find_field_by_selectors(tunnel_name_selectors, label)
-                        elif label == "间隔时长重拨":
-                            field = self.page.locator('input[name="cycle_rst_time"]').first
-                            expect(field).to_be_visible(timeout=5000)
-                        else:
-                            # 使用灵活查找
-                            selectors = [
-                                f'input[data-vv-as="{label}"]',
-                                f'div:has-text("{label}") input',
-                                f'div.line_edit:has(div.input_tit:has-text("{label}")) input'
-                            ]
-                            if "MTU" in label:
-                                selectors.append('input[name="mtu"]')
-                            elif "MRU" in label:
-                                selectors.append('input[name="mru"]')
-                            
-                            field = self._find_field_by_selectors(selectors, label)
-                        
-                        field.clear()
-                        
-                        # 尝试保存以触发验证
-                        save_button = self.page.locator('button:has-text("保存"):visible:enabled').first
-                        if save_button.is_visible(timeout=3000):
-                            save_button.click()
-                            time.sleep(2)  # 增加等待时间
-                        
-                        # 查找错误提示
-                        error_found = False
-                        error_selectors = [
-                            'p.error_tip:visible',
-                            '.error-tip:visible',
-                            '.error:visible',
-                            '[class*="error"]:visible'
-                        ]
-                        
-                        for error_selector in error_selectors:
-                            errors = self.page.locator(error_selector)
-                            if errors.count() > 0:
-                                error_text = errors.first.text_content().strip()
-                                if error_text:
-                                    print(f"  错误提示: {error_text}")
-                                    error_found = True
-                                    break
-                        
-                        if not error_found:
-                            print(f"  未找到{label}的错误提示")
-                        
-                        # 恢复原值
-                        field.fill(orig_value)
-                        time.sleep(0.5)  # 增加等待时间
-                        
-                    except Exception as e:
-                        print(f"  验证{label}时出错: {e}")
+                # 必填项校验矩阵：同时清空所有字段、保存一次、一次读取全部错误提示
+                self.validate_required_fields(L2TP_FORM_SCHEMA, self.test_profile, [
+                    "隧道名称", "服务端口", "服务器地址/域名", "用户名", "密码", "MTU", "MRU", "间隔时长重拨"
+                ])
                 
                 # 验证定时重拨时间字段（增加错误处理）
                 print("验证字段 定时重拨时间")
@@ -701,7 +522,7 @@ class L2TPTestModule(RouterTestModule):
                         if enable_checkbox.locator('input[type="checkbox"]').is_checked() == False:
                             enable_checkbox.click()
                             print("  开启定时重拨功能")
-                            time.sleep(1)  # 等待界面更新
+                            self.waits.for_dom_quiet(timeout=3, legacy_sleep=1, description="定时重拨展开")
                         
                         time_inputs = ["time0", "time1", "time2"]
                         for time_name in time_inputs:
@@ -712,7 +533,7 @@ class L2TPTestModule(RouterTestModule):
                         save_button = self.page.locator('button:has-text("保存"):visible:enabled').first
                         if save_button.is_visible(timeout=3000):
                             save_button.click()
-                            time.sleep(2)
+                            self.waits.for_visible("p.error_tip", timeout=3, legacy_sleep=2, description="校验提示")
                         
                         # 查找定时重拨相关的错误提示
                         all_errors = self.page.locator('p.error_tip:visible')
@@ -734,7 +555,7 @@ class L2TPTestModule(RouterTestModule):
                                 time_inp = self.page.locator(f'input[name="{time_name}"]').first
                                 if time_inp.is_visible():
                                     time_inp.fill(times_list[idx])
-                                    time.sleep(0.5)
+                                    self.waits.for_dom_quiet(timeout=2, legacy_sleep=0.5, description="恢复时间值")
                 except Exception as e:
                     print(f"  验证定时重拨时间时出错: {e}")
                 
@@ -752,7 +573,7 @@ class L2TPTestModule(RouterTestModule):
         print("步骤7: 删除L2TP配置 取消流程")
         
         # 增加等待确保页面稳定
-        time.sleep(2)
+        self.waits.for_dom_quiet(timeout=5, legacy_sleep=2, description="页面稳定")
         
         row = self.page.locator(f'tr:has-text("{profile_name}")')
         if row.count() > 0:
@@ -762,7 +583,7 @@ class L2TPTestModule(RouterTestModule):
                 modal = self.page.locator('div.el-message-box')
                 expect(modal).to_be_visible(timeout=8000)  # 增加超时时间
                 modal.locator('button.el-button:has-text("取消")').click()
-                time.sleep(1)
+                self.waits.for_modal_gone(timeout=3, legacy_sleep=1, description="取消删除弹窗")
                 expect(row).to_be_visible(timeout=5000)
                 print("取消删除，L2TP配置依然存在")
                 
@@ -784,23 +605,33 @@ class L2TPTestModule(RouterTestModule):
             
         print(f"步骤8: 批量创建L2TP配置，共{count}条")
         
-        for i in range(1, count + 1):
-            profile = self.test_profile.copy()
-            profile["name"] = f"l2tp_test_{i+1:02d}"  # l2tp_test_02, l2tp_test_03, ...
-            
-            print(f"创建第 {i}/{count} 个L2TP配置: {profile['name']}")
+        try:
+            self.reserve_existing_values(self.allocator)
+        except Exception as e:
+            print(f"⚠️ 读取现有配置失败，名称可能与已有配置重复: {e}")
+        profiles = self._build_batch_profiles(count)
+        
+        # 优先通过接口创建前置数据，其次通过一个导入文件批量创建
+        created = self.api_create_profiles(profiles) if self.api_fixtures_enabled() else None
+        if created is not None:
+            self.refresh_after_api()
+        elif self.bulk_create_enabled():
+            created = self.bulk_import_profiles(profiles)
+        if created is None:
+            for i, profile in enumerate(profiles, 1):
+                print(f"创建第 {i}/{count} 个L2TP配置: {profile['name']}")
             
-            # 使用优化的创建流程
-            try:
-                success = self.step3_create_profile(profile, show_step_info=False)
-                if success:
-                    print(f"✅ L2TP配置 {profile['name']} 创建成功")
-                else:
-                    print(f"⚠️ L2TP配置 {profile['name']} 创建失败")
-            except Exception as e:
-                print(f"❌ 创建L2TP配置 {profile['name']} 失败: {e}")
+                # 使用优化的创建流程
+                try:
+                    success = self.step3_create_profile(profile, show_step_info=False)
+                    if success:
+                        print(f"✅ L2TP配置 {profile['name']} 创建成功")
+                    else:
+                        print(f"⚠️ L2TP配置 {profile['name']} 创建失败")
+                except Exception as e:
+                    print(f"❌ 创建L2TP配置 {profile['name']} 失败: {e}")
                 
-            time.sleep(3)  # 增加批量创建之间的等待时间
+                self.waits.for_dom_quiet(timeout=5, legacy_sleep=3, description="批量创建间隔")
         
         print(f"批量创建完成，共创建了{count}个L2TP配置")
     
@@ -811,7 +642,7 @@ class L2TPTestModule(RouterTestModule):
         # 刷新页面以获取最新的IP状态
         print("🔄 刷新页面以获取最新的IP状态...")
         self.page.reload()
-        time.sleep(3)  # 增加等待时间
+        self.waits.for_dom_quiet(timeout=8, legacy_sleep=3, description="刷新后页面稳定")
         
         # 重新导航到L2TP页面
         print("🧭 重新导航到L2TP页面...")
@@ -819,7 +650,7 @@ class L2TPTestModule(RouterTestModule):
         
         print("🔍 开始查找表格元素...")
         
-        # 使用VLAN类似的表格查找逻辑
+        # 使用VLAN类似的表格查找逻辑，一次读取整张表
         table_selectors = [
             'table',
             'div.table-box table',
@@ -827,56 +658,28 @@ class L2TPTestModule(RouterTestModule):
             '.el-table table',
             '[role="table"]'
         ]
+        table = self.snapshot_table(', '.join(table_selectors))
         
-        table_found = False
-        table_element = None
-        
-        for selector in table_selectors:
-            tables = self.page.locator(selector)
-            if tables.count() > 0:
-                print(f"✅ 找到表格，使用选择器: {selector}, 数量: {tables.count()}")
-                table_element = tables.first
-                table_found = True
-                break
-        
-        if table_found and table_element:
+        if table.found:
+            print(f"✅ 找到表格，数据行: {len(table)}")
             print("📊 分析表格结构...")
             
-            # 查找表头
-            headers = table_element.locator('thead tr th, thead tr td, tr:first-child th, tr:first-child td')
-            header_count = headers.count()
-            
-            if header_count > 0:
-                print(f"✅ 找到表头，列数: {header_count}")
-                for i in range(header_count):
-                    header_text = headers.nth(i).text_content().strip()
+            if table.headers:
+                print(f"✅ 找到表头，列数: {len(table.headers)}")
+                for i, header_text in enumerate(table.headers):
                     print(f"  第{i+1}列表头: '{header_text}'")
                 
-                local_ip_column_index = -1
-                for i in range(header_count):
-                    header_text = headers.nth(i).text_content().strip()
-                    if "本地IP" in header_text:
-                        local_ip_column_index = i
-                        print(f"🎯 确定本地IP列位置: 第{i+1}列")
-                        break
-                
+                local_ip_column_index = table.column_index("本地IP")
                 if local_ip_column_index == -1:
                     print("⚠️ 未找到本地IP列，使用默认第6列")
                     local_ip_column_index = 5
+                else:
+                    print(f"🎯 确定本地IP列位置: 第{local_ip_column_index+1}列")
             else:
                 print("⚠️ 未找到表头，使用默认第6列作为本地IP列")
                 local_ip_column_index = 5
             
-            # 查找数据行
-            rows = table_element.locator('tbody tr')
-            if rows.count() == 0:
-                all_rows = table_element.locator('tr')
-                if all_rows.count() > 1:
-                    rows = table_element.locator('tr:not(:first-child)')
-                else:
-                    rows = all_rows
-            
-            row_count = rows.count()
+            row_count = len(table.rows)
             print(f"✅ 找到数据行: {row_count}")
             
             if row_count > 0:
@@ -884,29 +687,26 @@ class L2TPTestModule(RouterTestModule):
                 ip_info_list = []
                 valid_data_rows = 0
                 
-                for i in range(row_count):
-                    row = rows.nth(i)
-                    cells = row.locator('td')
-                    cell_count = cells.count()
+                # 当前页直接用上面的快照，再逐页读取后面几页，不会重复读取第1页
+                for row in self.iter_table_rows(', '.join(table_selectors), current=table):
+                    if len(row.cells) < 3:
+                        continue
+                    
+                    config_name = row.key
+                    valid_data_rows += 1
                     
-                    if cell_count >= 3:
-                        config_name = cells.nth(0).text_content().strip()
+                    if len(row.cells) > local_ip_column_index:
+                        local_ip = row.get(local_ip_column_index)
                         
-                        if config_name and config_name not in ["隧道名称", "配置名称", ""]:
-                            valid_data_rows += 1
-                            
-                            if cell_count > local_ip_column_index:
-                                local_ip = cells.nth(local_ip_column_index).text_content().strip()
-                                
-                                if local_ip and local_ip != "-" and local_ip != "" and "." in local_ip:
-                                    ip_info_list.append({"name": config_name, "local_ip": local_ip})
-                                    print(f"{valid_data_rows}. {config_name} -> 本地IP: {local_ip}")
-                                else:
-                                    ip_info_list.append({"name": config_name, "local_ip": "未获取到IP"})
-                                    print(f"{valid_data_rows}. {config_name} -> 未获取到IP")
-                            else:
-                                ip_info_list.append({"name": config_name, "local_ip": "列数据不足"})
-                                print(f"{valid_data_rows}. {config_name} -> 列数据不足 (总列数: {cell_count})")
+                        if local_ip and local_ip != "-" and "." in local_ip:
+                            ip_info_list.append({"name": config_name, "local_ip": local_ip})
+                            print(f"{valid_data_rows}. {config_name} -> 本地IP: {local_ip}")
+                        else:
+                            ip_info_list.append({"name": config_name, "local_ip": "未获取到IP"})
+                            print(f"{valid_data_rows}. {config_name} -> 未获取到IP")
+                    else:
+                        ip_info_list.append({"name": config_name, "local_ip": "列数据不足"})
+                        print(f"{valid_data_rows}. {config_name} -> 列数据不足 (总列数: {len(row.cells)})")
                 
                 valid_ip_count = len([info for info in ip_info_list if info["local_ip"] not in ["未获取到IP", "列数据不足"]])
                 print(f"\n统计信息:")
@@ -931,7 +731,7 @@ class L2TPTestModule(RouterTestModule):
         print("步骤10: L2TP批量停用和启用操作")
         
         # 增加等待确保页面稳定
-        time.sleep(2)
+        self.waits.for_dom_quiet(timeout=5, legacy_sleep=2, description="页面稳定")
         
         # 步骤10.1: 全选所有配置
         if not self.select_all_configs("L2TP批量操作"):
@@ -954,8 +754,8 @@ class L2TPTestModule(RouterTestModule):
         print("✅ L2TP批量停用操作执行完成")
         
         # 步骤10.3: 等待后批量启用
-        print("\n⏳ 等待3秒...")  # 增加等待时间
-        time.sleep(3)
+        print("\n⏳ 等待批量停用生效...")
+        self.waits.for_dom_quiet(timeout=5, legacy_sleep=3, description="批量停用生效")
         
         print("✅ 执行L2TP批量启用操作...")
         
@@ -994,7 +794,7 @@ class L2TPTestModule(RouterTestModule):
             file_path = self.export_data_l2tp(format_type, download_path)
             if file_path:
                 exported_files.append(file_path)
-                time.sleep(3)  # 增加等待时间
+                self.waits.for_dom_quiet(timeout=5, legacy_sleep=3, description="导出间隔")
         
         print(f"\n📊 L2TP导出结果统计:")
         print(f"  成功导出文件数: {len(exported_files)}")
@@ -1029,7 +829,7 @@ class L2TPTestModule(RouterTestModule):
         else:
             print("❌ 未找到L2TP CSV文件")
         
-        time.sleep(3)  # 增加等待时间
+        self.waits.for_dom_quiet(timeout=5, legacy_sleep=3, description="导入完成")
         
         # 步骤11.4: 再次批量删除所有配置
         print("\n🗑️ 步骤11.4: 再次批量删除所有L2TP配置")
@@ -1075,148 +875,9 @@ class L2TPTestModule(RouterTestModule):
         print("\n✅ L2TP导出导入功能测试全部完成")
     
     def export_data_l2tp(self, format_type: str, download_path: str) -> Optional[str]:
-        """L2TP专用导出数据方法，确保文件名正确（增加等待）"""
+        """L2TP专用导出数据方法，确保文件名正确"""
         print(f"🔹 导出L2TP {format_type.upper()}格式...")
-        
-        try:
-            import requests
-            
-            # 记录导出请求
-            export_requests = []
-            download_requests = []
-            
-            def handle_request(request):
-                try:
-                    if "/Action/call" in request.url and request.post_data:
-                        post_data = request.post_data
-                        if "EXPORT" in post_data:
-                            export_requests.append({
-                                "url": request.url,
-                                "data": post_data
-                            })
-                            print(f"🔍 捕获到L2TP导出API请求: {request.url}")
-                    elif "/Action/download" in request.url:
-                        download_requests.append({
-                            "url": request.url
-                        })
-                        print(f"🔍 捕获到L2TP下载请求: {request.url}")
-                except Exception as e:
-                    print(f"⚠️ 处理请求时出错: {e}")
-                    
-            # 添加请求监听器
-            self.page.on("request", handle_request)
-            
-            # 查找并点击导出按钮
-            export_button_strategies = [
-                'a:has-text("导出")',
-                'button:has-text("导出")',
-                '.btn:has-text("导出")',
-                'input[value="导出"]'
-            ]
-            
-            export_button_found = False
-            for strategy in export_button_strategies:
-                export_buttons = self.page.locator(strategy)
-                if export_buttons.count() > 0:
-                    export_button = export_buttons.first
-                    if export_button.is_visible(timeout=5000):  # 增加超时时间
-                        print(f"✅ 找到L2TP导出按钮，策略: {strategy}")
-                        export_button.scroll_into_view_if_needed()
-                        export_button.click()
-                        export_button_found = True
-                        break
-            
-            if not export_button_found:
-                print(f"❌ 未找到L2TP导出按钮")
-                self.page.remove_listener("request", handle_request)
-                return None
-            
-            # 等待下拉菜单
-            time.sleep(2)  # 增加等待时间
-            
-            # 选择格式
-            format_option_strategies = [
-                f'a:has-text("{format_type.upper()}")',
-                f'li:has-text("{format_type.upper()}")',
-                f'[data-format="{format_type}"]'
-            ]
-            
-            format_option_found = False
-            for strategy in format_option_strategies:
-                format_options = self.page.locator(strategy)
-                if format_options.count() > 0:
-                    format_option = format_options.first
-                    if format_option.is_visible(timeout=5000):  # 增加超时时间
-                        print(f"✅ 找到L2TP {format_type.upper()}选项，策略: {strategy}")
-                        format_option.click()
-                        format_option_found = True
-                        break
-            
-            if not format_option_found:
-                print(f"❌ 未找到L2TP {format_type.upper()}选项")
-                self.page.remove_listener("request", handle_request)
-                return None
-            
-            # 等待API请求
-            time.sleep(5)  # 增加等待时间
-            
-            # 移除监听器
-            self.page.remove_listener("request", handle_request)
-            
-            # 使用requests下载文件
-            if export_requests or download_requests:
-                cookies = self.get_cookies_from_page()
-                
-                # 构造下载URL - 确保是L2TP的文件名
-                base_url = self.config.router_url.replace('/login#/login', '')
-                download_url = f"{base_url}/Action/download?filename=l2tp_client.{format_type}"
-                
-                headers = {
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'zh-CN,zh;q=0.9',
-                    'Cache-Control': 'no-cache',
-                    'Connection': 'keep-alive',
-                    'Pragma': 'no-cache',
-                    'Referer': base_url + '/',
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                
-                response = requests.get(download_url, headers=headers, cookies=cookies, verify=False, timeout=15)  # 增加超时时间
-                
-                if response.status_code == 200:
-                    # 强制使用正确的L2TP文件名
-                    file_path = os.path.join(download_path, f"l2tp_client.{format_type}")
-                    
-                    with open(file_path, 'wb') as f:
-                        f.write(response.content)
-                    
-                    if os.path.exists(file_path):
-                        file_size = os.path.getsize(file_path)
-                        print(f"✅ L2TP {format_type.upper()}格式导出成功: {file_path}")
-                        print(f"   文件大小: {file_size} 字节")
-                        return file_path
-                    else:
-                        print(f"❌ L2TP文件保存失败: {file_path}")
-                        return None
-                else:
-                    print(f"❌ L2TP下载失败，状态码: {response.status_code}")
-                    return None
-            else:
-                print(f"❌ 未检测到L2TP导出相关请求")
-                return None
-                
-        except Exception as e:
-            print(f"❌ 导出L2TP {format_type.upper()}格式时出错: {e}")
-            try:
-                self.page.remove_listener("request", handle_request)
-            except:
-                pass
-            return None
-
-    def get_cookies_from_page(self):
-        """从页面获取cookies"""
-        cookies = self.page.context.cookies()
-        return {cookie['name']: cookie['value'] for cookie in cookies}
+        return self.export_data(format_type, download_path, filename=f"l2tp_client.{format_type}")
     
     def step12_cleanup_all_configs(self):
         """步骤12: 清理所有L2TP配置（增加等待）"""
@@ -1224,17 +885,8 @@ class L2TPTestModule(RouterTestModule):
         
         # 首先检查是否有配置需要删除
         try:
-            time.sleep(2)  # 增加等待时间
-            rows = self.page.locator('table tr:not(:first-child)')
-            config_count = 0
-            
-            for i in range(rows.count()):
-                row = rows.nth(i)
-                cells = row.locator('td')
-                if cells.count() > 0:
-                    config_name = cells.nth(0).text_content().strip()
-                    if config_name and config_name not in ["隧道名称", "配置名称", ""]:
-                        config_count += 1
+            self.waits.for_dom_quiet(timeout=5, legacy_sleep=2, description="页面稳定")
+            config_count = self.count_configs()
             
             print(f"🔍 当前L2TP配置数量: {config_count}")
             
@@ -1245,6 +897,15 @@ class L2TPTestModule(RouterTestModule):
         except Exception as e:
             print(f"检查L2TP配置数量时出错: {e}")
         
+        # 优先通过接口清理
+        if self.api_fixtures_enabled() and self.api_cleanup_all():
+            self.refresh_after_api()
+            remaining = self.count_configs()
+            if remaining == 0:
+                print("✅ 所有L2TP配置已成功清理")
+                return True
+            print(f"⚠️  接口清理后仍有 {remaining} 个配置，改用UI批量删除")
+        
         # 使用批量删除功能清理所有配置
         print("🗑️ 开始清理所有L2TP配置...")
         delete_success = self.batch_delete_all_configs(need_select_all=True)
@@ -1269,11 +930,11 @@ class L2TPTestModule(RouterTestModule):
             
             # 步骤4: 停用配置
             self.step4_disable_profile(self.test_profile["name"])
-            time.sleep(2)  # 增加等待时间
+            self.waits.for_dom_quiet(timeout=5, legacy_sleep=2, description="停用后页面稳定")
             
             # 步骤5: 启用配置
             self.step5_enable_profile(self.test_profile["name"])
-            time.sleep(2)  # 增加等待时间
+            self.waits.for_dom_quiet(timeout=5, legacy_sleep=2, description="启用后页面稳定")
             
             # 步骤6: 表单验证错误
             self.step6_form_validation_errors(self.test_profile["name"])
@@ -1297,7 +958,7 @@ class L2TPTestModule(RouterTestModule):
             self.step12_cleanup_all_configs()
             
             print("✅ 所有L2TP 12个测试步骤已成功完成（优化版）")
-            time.sleep(2)
+            self.waits.pause(2, description="测试结束")
             
         except Exception as e:
             print(f"❌ L2TP测试过程中出现错误: {e}")
@@ -1320,6 +981,18 @@ def parse_arguments():
                         help='无头模式运行 (不显示浏览器界面)')
     parser.add_argument('--method', '-m', 
                         help='指定要运行的测试方法名称')
+    parser.add_argument('--firmware',
+                        help='路由器固件版本，用于区分选择器缓存 (默认: unknown)')
+    parser.add_argument('--api-fixtures', action='store_true',
+                        help='通过/Action/call接口准备批量数据和清理配置 (步骤8、12)')
+    parser.add_argument('--no-session-reuse', action='store_true',
+                        help='不复用已保存的登录态，每次都重新登录')
+    parser.add_argument('--no-resource-blocking', action='store_true',
+                        help='不拦截图片/字体等非必要资源，不使用静态资源缓存')
+    parser.add_argument('--bulk-create', nargs='?', const='csv', choices=['csv', 'txt'],
+                        help='步骤8通过一个导入文件批量创建配置，而不是逐个填写表单 (默认格式: csv)')
+    parser.add_argument('--namespace',
+                        help='配置名称/备注前缀，清理和校验只作用于该前缀的配置 (并行测试同一台路由器时使用)')
     
     return parser.parse_args()
 
@@ -1355,6 +1028,26 @@ def create_config_from_args(args):
         ssh_pass = args.ssh_pass
         print(f"✅ 使用自定义SSH密码: {'*' * len(ssh_pass)}")
     
+    firmware = args.firmware or ""
+    if firmware:
+        print(f"✅ 使用固件版本: {firmware}")
+    
+    if args.api_fixtures:
+        print("⚡ 启用接口前置/清理")
+    
+    if args.bulk_create:
+        print(f"📦 步骤8通过{args.bulk_create.upper()}导入文件批量创建")
+    
+    if args.no_session_reuse:
+        print("🔑 不复用登录态，将重新登录")
+    
+    if args.no_resource_blocking:
+        print("🚦 已关闭资源拦截和静态资源缓存")
+    
+    namespace = args.namespace if args.namespace is not None else os.environ.get(NAMESPACE_ENV_VAR, "")
+    if namespace:
+        print(f"🏷️ 使用命名空间: {namespace}")
+    
     # 构造完整的URL
     if not router_ip.startswith('http'):
         router_url = f"http://{router_ip}/login#/login"
@@ -1366,7 +1059,14 @@ def create_config_from_args(args):
         username=username,
         password=password,
         ssh_user=ssh_user,
-        ssh_pass=ssh_pass
+        ssh_pass=ssh_pass,
+        firmware=firmware,
+        use_api_fixtures=args.api_fixtures,
+        reuse_session=not args.no_session_reuse,
+        block_resources=not args.no_resource_blocking,
+        cache_static=not args.no_resource_blocking,
+        namespace=namespace,
+        bulk_create=args.bulk_create or ""
     )
 
 # 单独运行测试的入口
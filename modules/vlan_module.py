@@ -2,28 +2,57 @@
 import sys
 import os
 import argparse
+import csv
+import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from test_framework import RouterTestModule, RouterTestConfig
+from test_framework import RouterTestModule, RouterTestConfig, FormField, FormSchema, NAMESPACE_ENV_VAR, make_namespace
+from profile_allocator import ProfileAllocator, AllocationError, VLAN_ID_MAX
 from playwright.sync_api import expect
 import time
 
+# 规模测试默认的VLAN数量梯度
+DEFAULT_SCALE_LEVELS = [10, 100, 500, 1000, VLAN_ID_MAX]
+
+# 规模测试结果文件（不含扩展名，分别写.csv和.json）
+DEFAULT_SCALE_OUTPUT = "vlan_scale_results"
+
+# 规模测试每个梯度记录的指标
+SCALE_FIELDS = ["level", "vlan_count", "create_method", "create_ms", "list_load_ms", "search_ms",
+                "disable_ms", "enable_ms", "export_ms", "export_bytes", "delete_ms"]
+
+# VLAN表单字段声明（标签、选择器、profile中的键、类型），下拉框由_handle_form_selects单独处理
+VLAN_FORM_SCHEMA = FormSchema("VLAN表单", [
+    FormField("VLAN ID", ['input[name="vlan_id"]'], "vlan_id"),
+    FormField("VLAN名称", ['input[name="vlan_name"]'], "vlan_name"),
+    FormField("MAC", ['input[name="mac"]'], "mac", required=False),
+    FormField("IP地址", ['input[name="ip_addr"]'], "ip", required=False),
+    FormField("备注", ['input[name="comment"]', 'textarea[name="comment"]'], "comment", required=False),
+])
+
 class VLANTestModule(RouterTestModule):
     """VLAN设置测试模块 - 完整12个步骤，支持自定义IP地址"""
     
+    api_kind = "vlan"
+    profile_name_field = "vlan_name"
+    
     def __init__(self, config: RouterTestConfig):
         super().__init__(config)
         self.test_profile = {
             "vlan_id": "43",  # 修改为1-4090范围内的值
-            "vlan_name": "vlan01",
+            "vlan_name": self.namespaced("vlan01"),
             "mac": "00:1a:4a:1b:f6:35",
             "ip": "192.168.1.100",
             "subnet_mask": "255.255.255.0",
             "line": "lan1",
-            "comment": "PlaywrightE2ETest"
+            "comment": self.namespaced("PlaywrightE2ETest")
         }
         self.batch_create_count = 5
         self.created_profiles = []  # 记录创建的配置，用于搜索测试
+        # 批量配置的VLAN ID/MAC/网段/名称分配器，跳过单条测试配置已用的值
+        self.allocator = ProfileAllocator(vlan_start=int(self.test_profile["vlan_id"]) + 1)
+        self.allocator.reserve(vlan_ids=[self.test_profile["vlan_id"]], macs=[self.test_profile["mac"]],
+                               subnets=[self.test_profile["ip"]], names=[self.test_profile["vlan_name"]])
     
     def get_module_info(self) -> dict:
         """获取模块信息"""
@@ -44,19 +73,41 @@ class VLANTestModule(RouterTestModule):
         expect(self.page.locator('a.btn_green:has-text("添加")').first).to_be_visible(timeout=10000)
         print("已进入 VLAN设置 页面")
     
-    def _generate_unique_mac(self, index: int) -> str:
-        """生成唯一的MAC地址"""
-        # 基础MAC地址：00:1a:4a:1b:f6:35
-        # 为每个VLAN生成不同的MAC地址
-        base_mac = "00:1a:4a:1b"
-        # 修改最后两位来确保唯一性
-        last_byte = (0x35 + index) % 0xFF
-        second_last_byte = 0xf6 + (index // 0xFF)
-        return f"{base_mac}:{second_last_byte:02x}:{last_byte:02x}"
-    
     def _generate_unique_comment(self, index: int) -> str:
         """生成唯一的备注"""
-        return f"PlaywrightE2ETest-VLAN{index:02d}"
+        return self.namespaced(f"PlaywrightE2ETest-VLAN{index:02d}")
+    
+    def _profile_to_api_entry(self, profile: dict) -> dict:
+        """VLAN配置转换为接口参数"""
+        return {
+            "vlan_id": profile["vlan_id"],
+            "vlan_name": profile["vlan_name"],
+            "mac": profile["mac"],
+            "interface": profile["line"],
+            "ip_mask": f"{profile['ip']}/{profile['subnet_mask']}",
+            "comment": profile["comment"],
+            "enabled": "yes"
+        }
+    
+    def _build_batch_profiles(self, count: int) -> list:
+        """生成批量创建用的配置列表（VLAN ID、名称、MAC、网段由分配器统一分配，互不冲突）"""
+        profiles = []
+        allocated = self.allocator.vlan_profiles(count, name_prefix=self.namespaced("vlan"))
+        for i, values in enumerate(allocated, 1):
+            profile = self.test_profile.copy()
+            profile.update(values)
+            # 生成不同的备注
+            profile["comment"] = self._generate_unique_comment(i)
+            profiles.append(profile)
+        return profiles
+    
+    def _reserve_existing_profiles(self):
+        """登记路由器上已有的VLAN，批量配置避开这些ID、MAC和网段"""
+        try:
+            table = self.reserve_existing_values(self.allocator)
+            self.allocator.reserve(vlan_ids=[row.get_int(0) for row in table])
+        except Exception as e:
+            print(f"⚠️  读取现有VLAN配置失败，按默认范围分配: {e}")
     
     def step3_create_profile(self, profile: dict = None, show_step_info: bool = True):
         """步骤3: 创建VLAN配置（包含扩展IP和子网掩码测试）
@@ -74,7 +125,7 @@ class VLANTestModule(RouterTestModule):
             print(f"📝 创建VLAN配置 '{profile['vlan_name']}'")
         
         # 等待页面稳定
-        time.sleep(1)
+        self.waits.for_dom_quiet(300, legacy_sleep=1, description="页面稳定")
         
         # 点击添加按钮 - 等待其可见
         add_button = self.page.locator('a.btn_green:has-text("添加")').first
@@ -89,15 +140,15 @@ class VLANTestModule(RouterTestModule):
             except Exception as e:
                 print(f"❌ 第{attempt+1}次点击添加按钮失败: {e}")
                 if attempt < 2:
-                    time.sleep(2)
+                    self.waits.pause(2, "重试前等待")
                     # 刷新页面重试
                     self.page.reload()
-                    time.sleep(2)
+                    self.waits.for_dom_quiet(300, legacy_sleep=2, description="刷新后DOM静默")
                     self.navigate_to_module()
                 else:
                     raise e
         
-        time.sleep(2)
+        self.waits.for_dom_quiet(300, legacy_sleep=2, description="表单弹出")
         
         # 等待表单出现
         print("🔍 等待表单出现...")
@@ -125,7 +176,7 @@ class VLANTestModule(RouterTestModule):
             save_success = self._save_vlan_form()
             if save_success:
                 # 等待保存完成
-                time.sleep(5)
+                self.waits.for_dom_quiet(300, legacy_sleep=5, description="保存后DOM静默")
                 
                 # 关闭可能的弹窗
                 self._close_modals()
@@ -221,7 +272,7 @@ class VLANTestModule(RouterTestModule):
                                     button.click()
                                     print(f"    ✅ 点击扩展IP添加按钮")
                                     add_button_found = True
-                                    time.sleep(2)  # 等待输入框出现
+                                    self.waits.for_dom_quiet(200, legacy_sleep=2, description="扩展IP输入框出现")
                                     break
                     if add_button_found:
                         break
@@ -242,7 +293,7 @@ class VLANTestModule(RouterTestModule):
                                 button.click()
                                 print(f"    ✅ 点击找到的添加按钮")
                                 add_button_found = True
-                                time.sleep(2)
+                                self.waits.for_dom_quiet(200, legacy_sleep=2, description="扩展IP输入框出现")
                                 break
                             except:
                                 continue
@@ -256,7 +307,7 @@ class VLANTestModule(RouterTestModule):
             ip_input_found = False
             
             # 等待输入框出现
-            time.sleep(1)
+            self.waits.for_dom_quiet(200, legacy_sleep=1, description="扩展IP输入框出现")
             
             # 查找扩展IP表格中的输入框
             ip_input_selectors = [
@@ -294,7 +345,7 @@ class VLANTestModule(RouterTestModule):
             comment_input_found = False
             
             # 查找包含刚填写IP的表格行
-            time.sleep(0.5)  # 等待输入生效
+            self.waits.for_dom_quiet(100, legacy_sleep=0.5, description="扩展IP输入生效")
             
             table_rows = self.page.locator('table tr:visible, tbody tr:visible')
             for i in range(table_rows.count()):
@@ -325,7 +376,7 @@ class VLANTestModule(RouterTestModule):
             confirm_button_found = False
             
             # 查找包含刚填写IP的表格行中的确定按钮
-            time.sleep(0.5)  # 等待页面更新
+            self.waits.for_dom_quiet(100, legacy_sleep=0.5, description="扩展IP输入生效")
             
             table_rows = self.page.locator('table tr:visible, tbody tr:visible')
             for i in range(table_rows.count()):
@@ -352,7 +403,7 @@ class VLANTestModule(RouterTestModule):
                                     confirm_button.click()
                                     print(f"    ✅ 点击确定按钮确认扩展IP")
                                     confirm_button_found = True
-                                    time.sleep(1)  # 等待确认生效
+                                    self.waits.for_dom_quiet(200, legacy_sleep=1, description="扩展IP确认")
                                     break
                         if confirm_button_found:
                             break
@@ -377,7 +428,7 @@ class VLANTestModule(RouterTestModule):
                             confirm_button.click()
                             print(f"    ✅ 点击页面确定按钮确认扩展IP")
                             confirm_button_found = True
-                            time.sleep(1)
+                            self.waits.for_dom_quiet(200, legacy_sleep=1, description="扩展IP确认")
                             break
             
             if not confirm_button_found:
@@ -391,23 +442,11 @@ class VLANTestModule(RouterTestModule):
     
     def _wait_for_form(self):
         """等待表单出现"""
-        # 等待真正的输入字段出现
-        for attempt in range(10):
-            try:
-                # 查找text类型的输入字段，排除button和search类型
-                text_inputs = self.page.locator('input[type="text"]:not(.search_inpt):not([name="searchText"]):visible')
-                if text_inputs.count() > 0:
-                    # 检查是否有name属性，确保是表单字段
-                    for i in range(text_inputs.count()):
-                        field = text_inputs.nth(i)
-                        name = field.get_attribute('name') or ""
-                        if name and name != "searchText":
-                            print("✅ 检测到表单输入字段")
-                            return True
-                
-                time.sleep(0.5)
-            except:
-                time.sleep(0.5)
+        # 等待真正的输入字段出现（带name属性的text输入框，排除搜索框）
+        form_selector = 'input[type="text"][name]:not(.search_inpt):not([name="searchText"])'
+        if self.waits.until(lambda: self.waits.is_visible(form_selector), timeout=5, description="表单出现"):
+            print("✅ 检测到表单输入字段")
+            return True
         
         return False
     
@@ -454,7 +493,7 @@ class VLANTestModule(RouterTestModule):
                     if button.is_visible():
                         button.click()
                         print("✅ 已取消表单")
-                        time.sleep(1)
+                        self.waits.for_dom_quiet(300, legacy_sleep=1, description="取消表单")
                         return True
             
             # 如果没有找到取消按钮，按ESC键
@@ -482,7 +521,7 @@ class VLANTestModule(RouterTestModule):
                     if button.is_visible():
                         button.click()
                         print("✅ 关闭模态弹窗")
-                        time.sleep(1)
+                        self.waits.for_dom_quiet(300, legacy_sleep=1, description="关闭弹窗")
                         break
         except:
             pass
@@ -490,23 +529,29 @@ class VLANTestModule(RouterTestModule):
     def _wait_for_page_ready(self):
         """等待页面恢复到可操作状态"""
         print("⏳ 等待页面恢复...")
-        for attempt in range(15):  # 增加等待时间
-            try:
-                add_button = self.page.locator('a.btn_green:has-text("添加")').first
-                if add_button.is_visible() and add_button.is_enabled():
-                    print("✅ 页面已恢复")
-                    return True
-                time.sleep(1)
-            except:
-                time.sleep(1)
+        add_button = self.page.locator('a.btn_green:has-text("添加")').first
+        if self.waits.until(lambda: add_button.is_visible() and add_button.is_enabled(),
+                            timeout=15, description="添加按钮恢复"):
+            print("✅ 页面已恢复")
+            return True
         
         print("⚠️  页面恢复超时")
         return False
     
     def _fill_vlan_form(self, profile):
-        """填写VLAN表单"""
+        """填写VLAN表单（按VLAN_FORM_SCHEMA一次填写并回读，失败时按name/位置逐个填写）"""
         print("📝 开始填写VLAN表单...")
         
+        if self.fill_form(VLAN_FORM_SCHEMA, profile):
+            # 处理下拉选择框
+            self._handle_form_selects(self.page, profile)
+            return True
+        
+        print("⚠️  按表单声明填写失败，改为按name/位置逐个填写")
+        return self._fill_vlan_form_by_position(profile)
+    
+    def _fill_vlan_form_by_position(self, profile):
+        """按name属性或位置逐个填写VLAN表单"""
         # 查找所有文本输入字段和文本域，排除搜索和按钮类型
         input_selectors = [
             'input[type="text"]:not(.search_inpt):not([name="searchText"]):visible, textarea:visible',
@@ -555,7 +600,7 @@ class VLANTestModule(RouterTestModule):
             success = self._fill_field_by_name_or_position(input_fields, field_name, field_value, field_label)
             if success:
                 fields_filled += 1
-            time.sleep(0.5)
+            self.waits.for_dom_quiet(100, legacy_sleep=0.5, description="字段填写")
         
         # 如果通过常规方式没找到备注字段，尝试其他方式
         if fields_filled < 5:  # 应该填写5个字段
@@ -698,7 +743,7 @@ class VLANTestModule(RouterTestModule):
                 else:
                     self._select_first_valid_option(select, f"选择框{i+1}")
                 
-                time.sleep(0.5)
+                self.waits.for_dom_quiet(100, legacy_sleep=0.5, description="下拉框选择")
                 
             except Exception as e:
                 print(f"⚠️  处理选择框 {i+1} 时出错: {e}")
@@ -754,7 +799,7 @@ class VLANTestModule(RouterTestModule):
             
             if selected_mask:
                 # 测试验证：等待一下，看看是否有验证错误
-                time.sleep(1)
+                self.waits.for_dom_quiet(200, legacy_sleep=1, description="子网掩码校验")
                 print(f"🧪 子网掩码 {selected_mask} 验证通过")
                 return True
             else:
@@ -833,12 +878,13 @@ class VLANTestModule(RouterTestModule):
                         
                         # 滚动到按钮位置
                         button.scroll_into_view_if_needed()
-                        time.sleep(0.5)
+                        self.waits.for_dom_quiet(100, legacy_sleep=0.5, description="滚动到保存按钮")
                         
                         # 点击保存按钮
+                        marker = self.waits.mark()
                         button.click()
                         print("✅ 点击保存按钮")
-                        time.sleep(2)
+                        self.waits.for_action_call(marker, timeout=5, legacy_sleep=2, description="保存响应")
                         
                         # 检查是否有保存成功的指示
                         return self._verify_save_success()
@@ -856,7 +902,7 @@ class VLANTestModule(RouterTestModule):
         """验证保存是否成功"""
         try:
             # 等待保存完成的指示
-            time.sleep(2)
+            self.waits.for_dom_quiet(300, legacy_sleep=2, description="保存结果提示")
             
             # 检查是否有成功提示或表单关闭
             success_indicators = [
@@ -895,19 +941,15 @@ class VLANTestModule(RouterTestModule):
     def _verify_config_created(self, config_name: str):
         """验证配置是否创建成功"""
         try:
-            # 等待页面更新
-            time.sleep(3)
-            
-            # 多次尝试验证
-            for attempt in range(5):
-                # 检查表格中是否存在配置
-                config_row = self.page.locator(f'tr:has-text("{config_name}")')
-                if config_row.count() > 0 and config_row.first.is_visible():
-                    print(f"✅ 配置 {config_name} 创建成功")
-                    return True
-                
-                if attempt < 4:
-                    time.sleep(2)
+            # 等待表格中出现该配置
+            config_row = self.page.locator(f'tr:has-text("{config_name}")')
+            row_visible = lambda: config_row.count() > 0 and config_row.first.is_visible()
+            self.waits.until(lambda: row_visible() or self.table_pager().get("hasNext"),
+                             timeout=11, legacy_sleep=3, description="配置出现在表格")
+            # 表格分页时新配置可能不在当前页，逐页查找（找到后停留在该页）
+            if row_visible() or self.find_table_row(lambda row: config_name in row.text):
+                print(f"✅ 配置 {config_name} 创建成功")
+                return True
             
             print(f"⚠️  配置 {config_name} 未在表格中找到")
             return False
@@ -924,8 +966,9 @@ class VLANTestModule(RouterTestModule):
             disable_actions = row.locator('a:text("停用"), a:text("禁用"), button:text("停用"), button:text("禁用")')
             if disable_actions.count() > 0:
                 self.page.on("dialog", lambda d: d.accept())
+                marker = self.waits.mark()
                 disable_actions.first.click()
-                time.sleep(2)
+                self.waits.for_action_call(marker, timeout=5, legacy_sleep=2, description="停用响应")
                 print("配置已停用")
             else:
                 print("⚠️  未找到停用操作按钮")
@@ -941,8 +984,9 @@ class VLANTestModule(RouterTestModule):
             enable_actions = row.locator('a:text("启用"), button:text("启用")')
             if enable_actions.count() > 0:
                 self.page.on("dialog", lambda d: d.accept())
+                marker = self.waits.mark()
                 enable_actions.first.click()
-                time.sleep(2)
+                self.waits.for_action_call(marker, timeout=5, legacy_sleep=2, description="启用响应")
                 print("配置已启用")
             else:
                 print("⚠️  未找到启用操作按钮")
@@ -957,7 +1001,7 @@ class VLANTestModule(RouterTestModule):
         add_button = self.page.locator('a.btn_green:has-text("添加")').first
         if add_button.is_visible():
             add_button.click()
-            time.sleep(2)
+            self.waits.for_dom_quiet(300, legacy_sleep=2, description="表单弹出")
         else:
             print("❌ 添加按钮不可见，跳过验证")
             return
@@ -986,7 +1030,7 @@ class VLANTestModule(RouterTestModule):
                     save_button = self.page.locator('button:has-text("保存"), button:has-text("确定")').first
                     if save_button.is_visible(timeout=2000):
                         save_button.click()
-                        time.sleep(1)
+                        self.waits.for_dom_quiet(200, legacy_sleep=1, description="校验提示")
                     
                     # 查找错误提示
                     error_tip = self.page.locator('p.error_tip, .error-message, .field-error').first
@@ -1006,7 +1050,7 @@ class VLANTestModule(RouterTestModule):
         
         # 取消表单
         self._cancel_form()
-        time.sleep(1)
+        self.waits.for_dom_quiet(300, legacy_sleep=1, description="取消表单")
         print("表单验证完成")
     
     def step7_delete_profile(self, profile_name: str):
@@ -1018,7 +1062,7 @@ class VLANTestModule(RouterTestModule):
             delete_action = row.locator('a:text("删除"), button:text("删除")')
             if delete_action.count() > 0:
                 delete_action.first.click()
-                time.sleep(1)
+                self.waits.for_modal(timeout=5, legacy_sleep=1)
                 
                 # 处理确认对话框 - 先取消
                 modal = self.page.locator('div.el-message-box, .confirm-dialog, .modal')
@@ -1027,19 +1071,19 @@ class VLANTestModule(RouterTestModule):
                     if cancel_btn.count() > 0:
                         cancel_btn.first.click()
                         print("取消删除，配置依然存在")
-                        time.sleep(1)
+                        self.waits.for_modal_gone(timeout=5, legacy_sleep=1)
                 
                 # 再次删除并确认
                 print("步骤7: 删除配置 确认流程")
                 delete_action.first.click()
-                time.sleep(1)
+                self.waits.for_modal(timeout=5, legacy_sleep=1)
                 
                 if modal.count() > 0 and modal.first.is_visible(timeout=3000):
                     confirm_btn = modal.first.locator('button:has-text("确定"), button:has-text("确认"), button.el-button--primary')
                     if confirm_btn.count() > 0:
                         confirm_btn.first.click()
                         print("确认删除，配置已移除")
-                        time.sleep(2)
+                        self.waits.for_modal_gone(timeout=5, legacy_sleep=2)
             else:
                 print("⚠️  未找到删除操作按钮")
         else:
@@ -1053,28 +1097,29 @@ class VLANTestModule(RouterTestModule):
         print(f"步骤8: 批量创建VLAN配置，共{count}条")
         
         self.created_profiles = []  # 重置创建的配置列表
-        
-        for i in range(1, count + 1):
-            profile = self.test_profile.copy()
-            profile["vlan_id"] = str(int(self.test_profile["vlan_id"]) + i)  # 44, 45, ...
-            profile["vlan_name"] = f"vlan{i+1:02d}"  # vlan02, vlan03, ...
-            # 使用不同网段避免地址池冲突：192.168.2.100, 192.168.3.100, 192.168.4.100...
-            profile["ip"] = f"192.168.{i+1}.100"  # 192.168.2.100, 192.168.3.100, ...
-            # 生成不同的MAC地址
-            profile["mac"] = self._generate_unique_mac(i)
-            # 生成不同的备注
-            profile["comment"] = self._generate_unique_comment(i)
-            
-            print(f"\n创建第 {i}/{count} 个配置: {profile['vlan_name']} (IP: {profile['ip']}, MAC: {profile['mac']})")
-            
-            # 使用step3的逻辑，但不显示步骤信息
-            success = self.step3_create_profile(profile, show_step_info=False)
-            if success:
-                self.created_profiles.append(profile)
-                print(f"✅ 配置 {profile['vlan_name']} 创建成功")
-            else:
-                print(f"⚠️  配置 {profile['vlan_name']} 创建失败")
-            time.sleep(3)  # 增加等待时间
+        self._reserve_existing_profiles()
+        profiles = self._build_batch_profiles(count)
+        
+        # 优先通过接口创建前置数据，其次通过一个导入文件批量创建
+        created = self.api_create_profiles(profiles) if self.api_fixtures_enabled() else None
+        if created is not None:
+            self.refresh_after_api()
+        elif self.bulk_create_enabled():
+            created = self.bulk_import_profiles(profiles)
+        if created is not None:
+            self.created_profiles = created
+        else:
+            for i, profile in enumerate(profiles, 1):
+                print(f"\n创建第 {i}/{count} 个配置: {profile['vlan_name']} (IP: {profile['ip']}, MAC: {profile['mac']})")
+                
+                # 使用step3的逻辑，但不显示步骤信息
+                success = self.step3_create_profile(profile, show_step_info=False)
+                if success:
+                    self.created_profiles.append(profile)
+                    print(f"✅ 配置 {profile['vlan_name']} 创建成功")
+                else:
+                    print(f"⚠️  配置 {profile['vlan_name']} 创建失败")
+                self.waits.for_dom_quiet(300, legacy_sleep=3, description="批量创建间隔")
         
         print(f"\n📊 批量创建完成，共创建了{len(self.created_profiles)}/{count}个VLAN配置")
         
@@ -1154,7 +1199,7 @@ class VLANTestModule(RouterTestModule):
         # 刷新页面以获取最新状态
         print("🔄 刷新页面以获取最新状态...")
         self.page.reload()
-        time.sleep(3)
+        self.waits.for_dom_quiet(300, legacy_sleep=3, description="刷新后DOM静默")
         
         # 重新导航到VLAN页面
         print("🧭 重新导航到VLAN设置页面...")
@@ -1162,23 +1207,16 @@ class VLANTestModule(RouterTestModule):
         
         print("🔍 开始查找VLAN配置表格...")
         
-        # 查找表格
-        tables = self.page.locator('table')
-        if tables.count() > 0:
-            table = tables.first
+        # 一次读取整张表格
+        table = self.snapshot_table()
+        if table.found:
             print(f"✅ 找到表格")
             
-            # 获取表头信息
-            headers = table.locator('th')
-            header_texts = []
-            for i in range(headers.count()):
-                header_text = headers.nth(i).text_content().strip()
-                header_texts.append(header_text)
+            # 表头信息
+            for i, header_text in enumerate(table.headers):
                 print(f"  第{i+1}列表头: '{header_text}'")
             
-            # 查找数据行
-            rows = table.locator('tbody tr, tr:not(:first-child)')
-            row_count = rows.count()
+            row_count = len(table.rows)
             print(f"✅ 找到数据行: {row_count}")
             
             if row_count > 0:
@@ -1186,24 +1224,21 @@ class VLANTestModule(RouterTestModule):
                 vlan_info_list = []
                 valid_data_rows = 0
                 
-                for i in range(row_count):
-                    row = rows.nth(i)
-                    cells = row.locator('td')
-                    cell_count = cells.count()
+                # 当前页直接用上面的快照，再逐页读取后面几页，不会重复读取第1页
+                for row in self.iter_table_rows('table', current=table):
+                    if len(row.cells) < 3:
+                        continue
                     
-                    if cell_count >= 3:
-                        vlan_id = cells.nth(0).text_content().strip() if cell_count > 0 else ""
-                        vlan_name = cells.nth(1).text_content().strip() if cell_count > 1 else ""
-                        ip_info = cells.nth(3).text_content().strip() if cell_count > 3 else ""
-                        
-                        if vlan_id and vlan_id not in ["vlanID", "VLAN ID", ""]:
-                            valid_data_rows += 1
-                            vlan_info_list.append({
-                                "vlan_id": vlan_id,
-                                "vlan_name": vlan_name,
-                                "ip_info": ip_info
-                            })
-                            print(f"{valid_data_rows}. VLAN ID: {vlan_id}, 名称: {vlan_name}, IP: {ip_info}")
+                    vlan_id = row.key
+                    vlan_name = row.get(1)
+                    ip_info = row.get(3)
+                    valid_data_rows += 1
+                    vlan_info_list.append({
+                        "vlan_id": vlan_id,
+                        "vlan_name": vlan_name,
+                        "ip_info": ip_info
+                    })
+                    print(f"{valid_data_rows}. VLAN ID: {vlan_id}, 名称: {vlan_name}, IP: {ip_info}")
                 
                 print(f"\n统计信息:")
                 print(f"  有效VLAN配置: {valid_data_rows}")
@@ -1245,7 +1280,7 @@ class VLANTestModule(RouterTestModule):
         
         # 步骤10.3: 等待1秒后批量启用
         print("\n⏳ 等待1秒...")
-        time.sleep(1)
+        self.waits.for_dom_quiet(300, legacy_sleep=1, description="批量操作间隔")
         
         print("✅ 执行批量启用操作...")
         enable_selectors = [
@@ -1282,7 +1317,7 @@ class VLANTestModule(RouterTestModule):
             file_path = self.export_data(format_type, download_path)
             if file_path:
                 exported_files.append(file_path)
-                time.sleep(2)
+                self.waits.for_dom_quiet(300, legacy_sleep=2, description="导出间隔")
         
         print(f"\n📊 导出结果统计:")
         print(f"  成功导出文件数: {len(exported_files)}")
@@ -1310,7 +1345,7 @@ class VLANTestModule(RouterTestModule):
             else:
                 print("❌ CSV文件导入失败")
         
-        time.sleep(2)
+        self.waits.for_dom_quiet(300, legacy_sleep=2, description="导入后DOM静默")
         
         # 步骤11.4: 再次批量删除所有配置
         print("\n🗑️ 步骤11.4: 再次批量删除所有VLAN配置")
@@ -1344,16 +1379,7 @@ class VLANTestModule(RouterTestModule):
         
         # 检查是否有配置需要删除
         try:
-            rows = self.page.locator('table tr:not(:first-child)')
-            config_count = 0
-            
-            for i in range(rows.count()):
-                row = rows.nth(i)
-                cells = row.locator('td')
-                if cells.count() > 0:
-                    vlan_id = cells.nth(0).text_content().strip()
-                    if vlan_id and vlan_id not in ["vlanID", "VLAN ID", ""]:
-                        config_count += 1
+            config_count = self.count_configs()
             
             print(f"🔍 当前VLAN配置数量: {config_count}")
             
@@ -1364,6 +1390,15 @@ class VLANTestModule(RouterTestModule):
         except Exception as e:
             print(f"检查配置数量时出错: {e}")
         
+        # 优先通过接口清理
+        if self.api_fixtures_enabled() and self.api_cleanup_all():
+            self.refresh_after_api()
+            remaining = self.count_configs()
+            if remaining == 0:
+                print("✅ 所有VLAN配置已成功清理")
+                return True
+            print(f"⚠️  接口清理后仍有 {remaining} 个配置，改用UI批量删除")
+        
         # 使用批量删除功能清理所有配置
         print("🗑️ 开始清理所有VLAN配置...")
         delete_success = self.batch_delete_all_configs(need_select_all=True)
@@ -1375,6 +1410,150 @@ class VLANTestModule(RouterTestModule):
             print("❌ VLAN配置清理失败")
             return False
     
+    def _timed(self, name: str, func):
+        """计时执行func（同时记录步骤事件），返回(结果, 毫秒)"""
+        start = time.perf_counter()
+        with self.step_span(name):
+            result = func()
+        return result, round((time.perf_counter() - start) * 1000, 1)
+    
+    def _scale_create(self, profiles: list) -> str:
+        """用最快的可用方式创建一批VLAN：接口 > 导入文件 > 逐个填写表单，返回使用的方式"""
+        if self.api_fixtures_enabled():
+            created = self.api_create_profiles(profiles)
+            if created is not None:
+                self.refresh_after_api()
+                return "api"
+        if self.bulk_import_profiles(profiles, getattr(self.config, "bulk_create", "") or "csv") is not None:
+            return "import"
+        print(f"⚠️  接口和导入都不可用，逐个创建{len(profiles)}条VLAN，会很慢")
+        for profile in profiles:
+            self.step3_create_profile(profile, show_step_info=False)
+        return "ui"
+    
+    def _scale_measure(self, name: str) -> dict:
+        """在当前规模下测量列表加载、搜索、停用/启用、导出和删除的耗时"""
+        metrics = {}
+        
+        # 列表页加载：刷新到表格出现数据行
+        def load_list():
+            self.page.reload()
+            self.navigate_to_module()
+            return self.waits.until(lambda: self.waits.row_count() > 0, timeout=120, description="列表加载")
+        _, metrics["list_load_ms"] = self._timed("scale_list_load", load_list)
+        
+        # 搜索：输入名称回车，到表格只剩这一行
+        search_input = self._find_search_input()
+        target = self.page.locator(f'tr:has-text("{name}")')
+        
+        def search():
+            search_input.fill(name)
+            search_input.press('Enter')
+            return self.waits.until(lambda: self.waits.row_count() == 1 and target.count() > 0,
+                                    timeout=60, description="搜索结果")
+        if search_input:
+            _, metrics["search_ms"] = self._timed("scale_search", search)
+        
+        # 单条停用/启用
+        _, metrics["disable_ms"] = self._timed("scale_disable", lambda: self.step4_disable_profile(name))
+        _, metrics["enable_ms"] = self._timed("scale_enable", lambda: self.step5_enable_profile(name))
+        
+        # 导出CSV（整张表）
+        download_path = os.path.abspath("./downloads")
+        os.makedirs(download_path, exist_ok=True)
+        file_path, metrics["export_ms"] = self._timed("scale_export", lambda: self.export_data("csv", download_path))
+        if file_path and os.path.exists(file_path):
+            metrics["export_bytes"] = os.path.getsize(file_path)
+            os.remove(file_path)
+        
+        # 单条删除（含取消和确认两次弹窗）到该行消失
+        def delete():
+            self.step7_delete_profile(name)
+            return self.waits.until(lambda: target.count() == 0, timeout=60, description="删除后行消失")
+        _, metrics["delete_ms"] = self._timed("scale_delete", delete)
+        
+        if search_input:
+            self._clear_search(search_input)
+            self.waits.until(lambda: self.waits.row_count() > 0, timeout=60, description="清空搜索")
+        return metrics
+    
+    def _write_scale_results(self, results: list, output: str):
+        """把规模曲线写成CSV和JSON"""
+        with open(f"{output}.csv", 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SCALE_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+        with open(f"{output}.json", 'w', encoding='utf-8') as f:
+            json.dump({"router": self.config.router_url, "firmware": getattr(self.config, "firmware", ""),
+                       "levels": results}, f, ensure_ascii=False, indent=2)
+    
+    def scale_test(self, levels: list = None, output: str = None, cleanup: bool = True):
+        """VLAN规模测试：按梯度把VLAN数量加到levels中的每个值，测量各操作耗时随数量的变化
+        
+        Args:
+            levels: VLAN数量梯度，默认 10, 100, 500, 1000, 4090
+            output: 结果文件前缀，写出 .csv 和 .json
+            cleanup: 结束后是否删除本次创建的VLAN
+        """
+        levels = sorted(levels or getattr(self.config, "scale_levels", None) or DEFAULT_SCALE_LEVELS)
+        output = output or getattr(self.config, "scale_output", None) or DEFAULT_SCALE_OUTPUT
+        print(f"📈 VLAN规模测试，梯度: {', '.join(map(str, levels))}")
+        if not self.namespace:
+            # 没有命名空间时自动生成一个，清理只删除本次创建的VLAN
+            self.namespace = make_namespace()
+            print(f"🏷️ 使用命名空间: {self.namespace}")
+        
+        # 规模测试使用整个VLAN ID范围，避开路由器上已有的配置
+        allocator = ProfileAllocator()
+        table = self.reserve_existing_values(allocator)
+        allocator.reserve(vlan_ids=[row.get_int(0) for row in table])
+        existing = len(table)
+        
+        results = []
+        created = 0
+        index = 0
+        try:
+            for level in levels:
+                need = level - existing - created
+                if need <= 0:
+                    print(f"⚠️  当前已有 {existing + created} 条VLAN，跳过梯度 {level}")
+                    continue
+                try:
+                    values = allocator.vlan_profiles(need, name_prefix=self.namespaced("scale"), width=4)
+                except AllocationError as e:
+                    print(f"⚠️  无法达到 {level} 条VLAN: {e}")
+                    break
+                profiles = []
+                for item in values:
+                    index += 1
+                    profile = self.test_profile.copy()
+                    profile.update(item)
+                    profile["comment"] = self.namespaced(f"ScaleTest{index:04d}")
+                    profiles.append(profile)
+                
+                print(f"\n📦 梯度 {level}: 新建 {need} 条VLAN...")
+                method, create_ms = self._timed("scale_create", lambda: self._scale_create(profiles))
+                created += need
+                
+                metrics = self._scale_measure(profiles[-1]["vlan_name"])
+                # 测量时删除了一条，归还它的VLAN ID
+                created -= 1
+                allocator.release_vlan_ids([profiles[-1]["vlan_id"]])
+                row = {"level": level, "vlan_count": existing + created + 1, "create_method": method,
+                       "create_ms": create_ms}
+                row.update(metrics)
+                results.append(row)
+                print(f"📊 梯度 {level}: " + ", ".join(f"{key}={row.get(key, '')}" for key in SCALE_FIELDS[3:]))
+                self._write_scale_results(results, output)
+        finally:
+            if cleanup and created > 0:
+                print("\n🧹 清理规模测试创建的VLAN...")
+                if not (self.api_fixtures_enabled() and self.api_cleanup_all()):
+                    self.batch_delete_all_configs(need_select_all=True)
+        
+        print(f"\n💾 规模曲线已保存: {output}.csv, {output}.json")
+        return results
+    
     def run_full_test(self):
         """运行完整的12个步骤测试"""
         print("开始VLAN模块完整测试 - 12个步骤")
@@ -1389,11 +1568,11 @@ class VLANTestModule(RouterTestModule):
             
             # 步骤4: 停用配置
             self.step4_disable_profile(self.test_profile["vlan_name"])
-            time.sleep(1)
+            self.waits.for_dom_quiet(300, legacy_sleep=1, description="步骤间隔")
             
             # 步骤5: 启用配置
             self.step5_enable_profile(self.test_profile["vlan_name"])
-            time.sleep(1)
+            self.waits.for_dom_quiet(300, legacy_sleep=1, description="步骤间隔")
             
             # 步骤6: 表单验证错误
             self.step6_form_validation_errors(self.test_profile["vlan_name"])
@@ -1417,7 +1596,7 @@ class VLANTestModule(RouterTestModule):
             self.step12_cleanup_all_configs()
             
             print("✅ 所有12个测试步骤已成功完成")
-            time.sleep(2)
+            self.waits.for_dom_quiet(300, legacy_sleep=2, description="步骤间隔")
             
         except Exception as e:
             print(f"❌ 测试过程中出现错误: {e}")
@@ -1440,6 +1619,22 @@ def parse_arguments():
                         help='无头模式运行 (不显示浏览器界面)')
     parser.add_argument('--method', '-m', 
                         help='指定要运行的测试方法名称')
+    parser.add_argument('--firmware',
+                        help='路由器固件版本，用于区分选择器缓存 (默认: unknown)')
+    parser.add_argument('--api-fixtures', action='store_true',
+                        help='通过/Action/call接口准备批量数据和清理配置 (步骤8、12)')
+    parser.add_argument('--no-session-reuse', action='store_true',
+                        help='不复用已保存的登录态，每次都重新登录')
+    parser.add_argument('--no-resource-blocking', action='store_true',
+                        help='不拦截图片/字体等非必要资源，不使用静态资源缓存')
+    parser.add_argument('--bulk-create', nargs='?', const='csv', choices=['csv', 'txt'],
+                        help='步骤8通过一个导入文件批量创建配置，而不是逐个填写表单 (默认格式: csv)')
+    parser.add_argument('--scale-levels',
+                        help='运行VLAN规模测试，逗号分隔的数量梯度 (例如: 10,100,500,1000,4090)')
+    parser.add_argument('--scale-output', default=DEFAULT_SCALE_OUTPUT,
+                        help=f'规模测试结果文件前缀，写出.csv和.json (默认: {DEFAULT_SCALE_OUTPUT})')
+    parser.add_argument('--namespace',
+                        help='配置名称/备注前缀，清理和校验只作用于该前缀的配置 (并行测试同一台路由器时使用)')
     
     return parser.parse_args()
 
@@ -1475,6 +1670,26 @@ def create_config_from_args(args):
         ssh_pass = args.ssh_pass
         print(f"✅ 使用自定义SSH密码: {'*' * len(ssh_pass)}")
     
+    firmware = args.firmware or ""
+    if firmware:
+        print(f"✅ 使用固件版本: {firmware}")
+    
+    if args.api_fixtures:
+        print("⚡ 启用接口前置/清理")
+    
+    if args.bulk_create:
+        print(f"📦 步骤8通过{args.bulk_create.upper()}导入文件批量创建")
+    
+    if args.no_session_reuse:
+        print("🔑 不复用登录态，将重新登录")
+    
+    if args.no_resource_blocking:
+        print("🚦 已关闭资源拦截和静态资源缓存")
+    
+    namespace = args.namespace if args.namespace is not None else os.environ.get(NAMESPACE_ENV_VAR, "")
+    if namespace:
+        print(f"🏷️ 使用命名空间: {namespace}")
+    
     # 构造完整的URL
     if not router_ip.startswith('http'):
         router_url = f"http://{router_ip}/login#/login"
@@ -1486,7 +1701,14 @@ def create_config_from_args(args):
         username=username,
         password=password,
         ssh_user=ssh_user,
-        ssh_pass=ssh_pass
+        ssh_pass=ssh_pass,
+        firmware=firmware,
+        use_api_fixtures=args.api_fixtures,
+        reuse_session=not args.no_session_reuse,
+        block_resources=not args.no_resource_blocking,
+        cache_static=not args.no_resource_blocking,
+        namespace=namespace,
+        bulk_create=args.bulk_create or ""
     )
 
 # 单独运行测试的入口
@@ -1503,7 +1725,13 @@ if __name__ == "__main__":
     runner = TestRunner(config, headless=args.headless)
     
     try:
-        if args.method:
+        if args.scale_levels:
+            # 运行规模测试
+            config.scale_levels = [int(level) for level in args.scale_levels.split(',') if level.strip()]
+            config.scale_output = args.scale_output
+            print(f"📈 运行VLAN规模测试: {args.scale_levels}")
+            runner.run_test_module(VLANTestModule, ["scale_test"])
+        elif args.method:
             # 运行指定的测试方法
             print(f"🎯 运行指定测试方法: {args.method}")
             runner.run_test_module(VLANTestModule, [args.method])
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""批量测试配置的地址分配器
+
+为批量生成的配置分配不冲突的VLAN ID（1-4090）、MAC地址、/24网段和名称。
+路由器上已有的值先通过reserve/reserve_values登记，分配时自动跳过；
+每类资源用游标按批取号，几万条配置也只需一次线性扫描。
+"""
+import ipaddress
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+# VLAN ID的有效范围
+VLAN_ID_MIN = 1
+VLAN_ID_MAX = 4090
+
+# 默认的MAC前缀（后三字节由分配器递增，共约1600万个）
+DEFAULT_MAC_PREFIX = "00:1a:4a"
+
+# 默认的网段池，按顺序切成/24分配
+DEFAULT_SUBNET_POOLS = ("192.168.0.0/16", "172.16.0.0/12", "10.0.0.0/8")
+
+MAC_PATTERN = re.compile(r'\b[0-9a-fA-F]{2}(?::[0-9a-fA-F]{2}){5}\b')
+IP_PATTERN = re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}\b')
+
+class AllocationError(Exception):
+    """可分配的资源不足"""
+
+class ProfileAllocator:
+    """为批量测试配置分配不重复的VLAN ID、MAC、网段和名称"""
+
+    def __init__(self, vlan_start: int = VLAN_ID_MIN, mac_prefix: str = DEFAULT_MAC_PREFIX,
+                 subnet_pools: Iterable[str] = DEFAULT_SUBNET_POOLS, host: int = 100):
+        if not VLAN_ID_MIN <= vlan_start <= VLAN_ID_MAX:
+            raise ValueError(f"VLAN ID起始值必须在{VLAN_ID_MIN}-{VLAN_ID_MAX}之间: {vlan_start}")
+        self.mac_prefix = mac_prefix.lower()
+        self.host = host
+        self.pools = [ipaddress.IPv4Network(pool) for pool in subnet_pools]
+        self.pool_sizes = [pool.num_addresses >> 8 for pool in self.pools]
+
+        self.used_vlan_ids: Set[int] = set()
+        self.used_macs: Set[int] = set()
+        self.used_subnets: Set[int] = set()  # /24网段的网络地址 >> 8
+        self.used_names: Set[str] = set()
+
+        self._vlan_cursor = vlan_start
+        self._mac_cursor = 0
+        self._subnet_cursor = 0
+
+    # ------------------------------------------------------------------
+    # 登记已有的值
+    # ------------------------------------------------------------------
+
+    def _mac_suffix(self, mac: str) -> Optional[int]:
+        """MAC属于本分配器前缀时返回后三字节的整数值"""
+        mac = mac.lower()
+        if not mac.startswith(self.mac_prefix + ":"):
+            return None
+        return int(mac[len(self.mac_prefix) + 1:].replace(":", ""), 16)
+
+    def reserve(self, vlan_ids: Iterable = (), macs: Iterable[str] = (), subnets: Iterable[str] = (),
+                names: Iterable[str] = ()):
+        """登记路由器上已有的VLAN ID、MAC、网段（IP、IP/掩码或CIDR）和名称"""
+        for vlan_id in vlan_ids:
+            try:
+                self.used_vlan_ids.add(int(vlan_id))
+            except (TypeError, ValueError):
+                continue
+        for mac in macs:
+            suffix = self._mac_suffix(mac)
+            if suffix is not None:
+                self.used_macs.add(suffix)
+        for subnet in subnets:
+            try:
+                network = ipaddress.IPv4Network(str(subnet).strip(), strict=False)
+            except ValueError:
+                continue
+            if network.prefixlen >= 24:
+                self.used_subnets.add(int(network.network_address) >> 8)
+            else:
+                first = int(network.network_address) >> 8
+                self.used_subnets.update(range(first, first + (network.num_addresses >> 8)))
+        self.used_names.update(name for name in names if name)
+
+    def release_vlan_ids(self, vlan_ids: Iterable):
+        """归还已删除配置的VLAN ID，之后可以重新分配"""
+        for vlan_id in vlan_ids:
+            vlan_id = int(vlan_id)
+            self.used_vlan_ids.discard(vlan_id)
+            self._vlan_cursor = min(self._vlan_cursor, vlan_id)
+
+    def reserve_values(self, values: Iterable[str]):
+        """从任意文本（表格单元格、导出文件字段）中识别MAC和IP并登记"""
+        for value in values:
+            value = str(value)
+            self.reserve(macs=MAC_PATTERN.findall(value), subnets=IP_PATTERN.findall(value))
+
+    # ------------------------------------------------------------------
+    # 分配
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _take(start: int, limit: int, used: Set[int], count: int, what: str):
+        """从start开始取count个不在used中的整数，返回(结果, 新游标)"""
+        taken = []
+        cursor = start
+        while len(taken) < count:
+            if cursor >= limit:
+                raise AllocationError(f"{what}不足: 需要{count}个，只剩{len(taken)}个可用")
+            # 每批取还差的数量，只过滤已占用的值
+            end = min(cursor + count - len(taken), limit)
+            taken.extend(value for value in range(cursor, end) if value not in used)
+            cursor = end
+        used.update(taken)
+        return taken, cursor
+
+    def vlan_ids(self, count: int) -> List[int]:
+        """分配count个VLAN ID"""
+        taken, self._vlan_cursor = self._take(self._vlan_cursor, VLAN_ID_MAX + 1, self.used_vlan_ids,
+                                              count, "VLAN ID")
+        return taken
+
+    def macs(self, count: int) -> List[str]:
+        """分配count个MAC地址"""
+        taken, self._mac_cursor = self._take(self._mac_cursor, 1 << 24, self.used_macs, count, "MAC地址")
+        return [f"{self.mac_prefix}:{value >> 16:02x}:{(value >> 8) & 0xff:02x}:{value & 0xff:02x}"
+                for value in taken]
+
+    def _subnet_at(self, index: int) -> int:
+        """网段池中第index个/24网段（网络地址 >> 8）"""
+        for pool, size in zip(self.pools, self.pool_sizes):
+            if index < size:
+                return (int(pool.network_address) >> 8) + index
+            index -= size
+        raise IndexError(index)
+
+    def subnets(self, count: int) -> List[ipaddress.IPv4Network]:
+        """分配count个/24网段"""
+        taken = []
+        cursor = self._subnet_cursor
+        total = sum(self.pool_sizes)
+        while len(taken) < count:
+            if cursor >= total:
+                raise AllocationError(f"网段不足: 需要{count}个，只剩{len(taken)}个可用")
+            value = self._subnet_at(cursor)
+            cursor += 1
+            if value not in self.used_subnets:
+                taken.append(value)
+        self.used_subnets.update(taken)
+        self._subnet_cursor = cursor
+        return [ipaddress.IPv4Network((value << 8, 24)) for value in taken]
+
+    def names(self, prefix: str, count: int, width: int = 2) -> List[str]:
+        """分配count个"前缀+序号"的名称，跳过已有名称"""
+        names = []
+        index = 1
+        while len(names) < count:
+            name = f"{prefix}{index:0{width}d}"
+            index += 1
+            if name not in self.used_names:
+                names.append(name)
+        self.used_names.update(names)
+        return names
+
+    def vlan_profiles(self, count: int, name_prefix: str = "vlan", width: int = 2) -> List[Dict[str, str]]:
+        """一次分配count组VLAN配置需要的ID、名称、MAC和IP"""
+        vlan_ids = self.vlan_ids(count)
+        names = self.names(name_prefix, count, width)
+        mac_cursor = self._mac_cursor
+        try:
+            macs = self.macs(count)
+            try:
+                subnets = self.subnets(count)
+            except AllocationError:
+                self.used_macs.difference_update(self._mac_suffix(mac) for mac in macs)
+                self._mac_cursor = mac_cursor
+                raise
+        except AllocationError:
+            # 任何一类资源不足都归还已取的号，分配器状态保持不变
+            self.release_vlan_ids(vlan_ids)
+            self.used_names.difference_update(names)
+            raise
+        return [{
+            "vlan_id": str(vlan_id),
+            "vlan_name": name,
+            "mac": mac,
+            "ip": str(subnet.network_address + self.host),
+            "subnet_mask": str(subnet.netmask),
+        } for vlan_id, name, mac, subnet in zip(vlan_ids, names, macs, subnets)]
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""流式HTML报告写入器
+
+报告边生成边写入文件，不在内存中拼接整份HTML；动态内容一律转义。
+模块的完整日志不内嵌在报告里，而是从压缩日志转成分块的JS旁路文件
+（<报告名>_logs/<编号>_<块号>.js），页面中<details>展开时才用<script>加载第一块，
+"加载更多"再加载后续块。用<script>而不是fetch，是为了直接双击打开
+（file://）的报告也能加载日志。几百个模块的报告打开时只有汇总表格。
+"""
+import html
+import json
+import os
+from typing import Optional
+
+from log_store import iter_log_lines
+
+# 每个日志分块的行数
+LOG_CHUNK_LINES = 2000
+
+# 日志按需加载脚本：旁路文件调用reportLogChunk(编号, 块号, 行数组)追加内容
+LOG_LOADER_JS = """
+<script>
+var reportLogState = {};
+function reportLogChunk(key, index, lines) {
+  var state = reportLogState[key];
+  var details = document.querySelector('details[data-log="' + key + '"]');
+  details.querySelector('pre').appendChild(document.createTextNode(lines.join('\\n') + '\\n'));
+  state.loaded = index + 1;
+  state.loading = false;
+  var more = details.querySelector('button');
+  more.style.display = state.loaded < Number(details.dataset.chunks) ? '' : 'none';
+}
+function loadReportLog(details) {
+  var key = details.dataset.log;
+  var state = reportLogState[key] || (reportLogState[key] = {loaded: 0, loading: false});
+  if (state.loading || state.loaded >= Number(details.dataset.chunks)) return;
+  state.loading = true;
+  var script = document.createElement('script');
+  script.src = details.dataset.src + '/' + key + '_' + state.loaded + '.js';
+  script.onerror = function () {
+    state.loading = false;
+    details.querySelector('pre').appendChild(document.createTextNode('⚠️ 日志文件加载失败: ' + script.src + '\\n'));
+  };
+  document.body.appendChild(script);
+}
+document.addEventListener('toggle', function (event) {
+  var details = event.target;
+  if (details.open && details.dataset && details.dataset.log && !reportLogState[details.dataset.log]) {
+    loadReportLog(details);
+  }
+}, true);
+</script>
+"""
+
+
+class HtmlReportWriter:
+    """流式写入HTML报告，完整日志另存为按需加载的分块旁路文件"""
+
+    def __init__(self, report_file: str, chunk_lines: int = LOG_CHUNK_LINES):
+        self.report_file = report_file
+        self.chunk_lines = chunk_lines
+        self.log_dir_name = os.path.splitext(os.path.basename(report_file))[0] + "_logs"
+        self.log_dir = os.path.join(os.path.dirname(report_file), self.log_dir_name)
+        self._file = open(report_file, "w", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def escape(value) -> str:
+        return html.escape(str(value))
+
+    def write(self, markup: str):
+        """写入一段已拼好的HTML（调用方负责转义其中的动态内容）"""
+        self._file.write(markup)
+
+    def write_log_loader(self):
+        """写入日志按需加载脚本，放在<head>中即可"""
+        self._file.write(LOG_LOADER_JS)
+
+    def _write_log_chunks(self, key: str, log_path: str) -> int:
+        """把压缩日志转成分块的JS旁路文件，返回块数"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        chunks = 0
+        lines = []
+
+        def flush():
+            nonlocal chunks
+            chunk_file = os.path.join(self.log_dir, f"{key}_{chunks}.js")
+            with open(chunk_file, "w", encoding="utf-8") as f:
+                f.write(f"reportLogChunk({json.dumps(key)}, {chunks}, ")
+                json.dump(lines, f, ensure_ascii=False)
+                f.write(");\n")
+            chunks += 1
+            lines.clear()
+
+        for line in iter_log_lines(log_path):
+            lines.append(line)
+            if len(lines) >= self.chunk_lines:
+                flush()
+        if lines:
+            flush()
+        return chunks
+
+    def write_log(self, key: str, log_path: Optional[str], line_count: int = 0, label: str = "点击查看完整执行日志"):
+        """写入一个按需加载的日志块；日志缺失或为空时只写提示文字"""
+        chunks = 0
+        if log_path and os.path.exists(log_path):
+            try:
+                chunks = self._write_log_chunks(key, log_path)
+            except Exception as e:
+                self.write(f"<span style='color: #dc3545;'>⚠️ 日志读取失败: {self.escape(e)}</span>")
+                return
+        if not chunks:
+            self.write("<span style='color: #6c757d;'>无日志输出</span>")
+            return
+        self.write(
+            f"<details data-log='{self.escape(key)}' data-chunks='{chunks}' data-src='{self.escape(self.log_dir_name)}'>"
+            f"<summary style='cursor: pointer; color: blue; font-size: 14px; font-weight: bold;'>"
+            f"{self.escape(label)} ({line_count} 行)</summary>"
+            f"<div style='max-height: 600px; overflow-y: auto; background-color: #f8f9fa; padding: 15px; border-radius: 4px; border: 1px solid #ddd; margin: 10px 0;'>"
+            f"<pre style='white-space: pre-wrap; font-size: 13px; font-family: Consolas, monospace; margin: 0; line-height: 1.4;'></pre>"
+            f"<button type='button' style='display: none;' onclick='loadReportLog(this.closest(\"details\"))'>加载更多</button>"
+            f"</div></details>"
+        )
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""路由器 /Action/call 接口客户端
+
+用于测试前置数据的创建和测试后的清理：登录一次，复用连接池，
+直接增删改查VLAN、PPTP、L2TP配置，UI只用于驱动被测行为本身。
+"""
+import base64
+import hashlib
+import os
+import warnings
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InsecureRequestWarning
+
+# 模块类型 -> 接口func_name
+FUNC_NAMES = {
+    "vlan": "vlan",
+    "pptp": "pptp_client",
+    "l2tp": "l2tp_client",
+}
+
+# 接口返回码
+RESULT_LOGIN_OK = 10000
+RESULT_CALL_OK = 30000
+RESULT_NOT_LOGIN = 10014
+
+def base_url_from_router_url(router_url: str) -> str:
+    """从登录页URL得到路由器根地址"""
+    base_url = router_url.split('#')[0]
+    if base_url.endswith('/login'):
+        base_url = base_url[:-len('/login')]
+    return base_url.rstrip('/')
+
+class RouterApiError(Exception):
+    """接口调用失败"""
+
+    def __init__(self, message: str, result: Any = None):
+        super().__init__(message)
+        self.result = result
+
+class _UnverifiedSession(requests.Session):
+    """不校验证书的会话（路由器多为自签名证书），只在本会话的请求中屏蔽证书警告"""
+
+    def request(self, *args, **kwargs):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", InsecureRequestWarning)
+            return super().request(*args, **kwargs)
+
+class RouterApiClient:
+    """路由器接口客户端 - 一次登录，复用requests.Session连接池"""
+
+    def __init__(self, base_url: str, username: str, password: str,
+                 timeout: float = 10, pool_size: int = 10, verify: Union[bool, str] = False):
+        """verify与requests相同：True校验证书，也可以是CA证书路径；False（默认，路由器多为自签名证书）不校验"""
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.logged_in = False
+        self.call_count = 0
+
+        # 只有关闭证书校验时才使用屏蔽证书警告的会话
+        self.session = requests.Session() if verify else _UnverifiedSession()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.verify = verify
+        self.session.headers.update({
+            'Accept': 'application/json, text/plain, */*',
+            'Content-Type': 'application/json;charset=UTF-8',
+            'Referer': self.base_url + '/',
+        })
+
+    @classmethod
+    def from_config(cls, config, **kwargs) -> "RouterApiClient":
+        """根据RouterTestConfig创建客户端"""
+        kwargs.setdefault("verify", getattr(config, "api_verify_tls", False))
+        return cls(base_url_from_router_url(config.router_url), config.username, config.password, **kwargs)
+
+    # ------------------------------------------------------------------
+    # 登录与调用
+    # ------------------------------------------------------------------
+
+    def login(self) -> bool:
+        """登录并保存会话cookie"""
+        payload = {
+            "username": self.username,
+            "passwd": hashlib.md5(self.password.encode('utf-8')).hexdigest(),
+            "pass": base64.b64encode(f"salt_11{self.password}".encode('utf-8')).decode('ascii'),
+            "remember_password": "",
+        }
+        response = self.session.post(f"{self.base_url}/Action/login", json=payload, timeout=self.timeout)
+        result = self._parse(response)
+        if result.get("Result") != RESULT_LOGIN_OK:
+            raise RouterApiError(f"登录失败: {result.get('ErrMsg', result)}", result)
+        self.logged_in = True
+        return True
+
+    def cookies(self) -> Dict[str, str]:
+        """当前会话cookie（可注入浏览器上下文）"""
+        return self.session.cookies.get_dict()
+
+    def call(self, func_name: str, action: str, param: Dict = None) -> Any:
+        """调用/Action/call，返回Data字段；会话失效时自动重新登录一次"""
+        if not self.logged_in:
+            self.login()
+
+        payload = {"func_name": func_name, "action": action, "param": param or {}}
+        for attempt in range(2):
+            response = self.session.post(f"{self.base_url}/Action/call", json=payload, timeout=self.timeout)
+            self.call_count += 1
+            result = self._parse(response)
+            code = result.get("Result")
+            if code == RESULT_CALL_OK:
+                return result.get("Data")
+            if code == RESULT_NOT_LOGIN and attempt == 0:
+                self.login()
+                continue
+            raise RouterApiError(f"{func_name}.{action} 调用失败: {result.get('ErrMsg', result)}", result)
+
+    @staticmethod
+    def _parse(response: requests.Response) -> Dict:
+        """解析接口返回的JSON"""
+        if response.status_code != 200:
+            raise RouterApiError(f"HTTP {response.status_code}: {response.url}")
+        try:
+            return response.json()
+        except ValueError:
+            raise RouterApiError(f"返回内容不是JSON: {response.text[:200]}")
+
+    # ------------------------------------------------------------------
+    # 配置增删改查
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def func_name(kind: str) -> str:
+        """模块类型转换为func_name"""
+        if kind not in FUNC_NAMES:
+            raise RouterApiError(f"不支持的模块类型: {kind}")
+        return FUNC_NAMES[kind]
+
+    def list(self, kind: str, limit: int = 10000, finder: str = "") -> List[Dict]:
+        """列出配置"""
+        param = {"TYPE": "total,data", "limit": f"0,{limit}", "ORDER_BY": "", "ORDER": ""}
+        if finder:
+            param["FINDS"] = finder
+        data = self.call(self.func_name(kind), "show", param) or {}
+        return data.get("data", []) if isinstance(data, dict) else []
+
+    def add(self, kind: str, entry: Dict) -> Optional[int]:
+        """新增一条配置，返回新配置id"""
+        data = self.call(self.func_name(kind), "add", entry)
+        if isinstance(data, dict):
+            return data.get("id")
+        return data if isinstance(data, int) else None
+
+    def _ids_param(self, ids: Iterable) -> Dict:
+        return {"id": ",".join(str(entry_id) for entry_id in ids)}
+
+    def delete(self, kind: str, ids: Iterable) -> bool:
+        """按id删除配置"""
+        ids = list(ids)
+        if ids:
+            self.call(self.func_name(kind), "del", self._ids_param(ids))
+        return True
+
+    def enable(self, kind: str, ids: Iterable) -> bool:
+        """按id启用配置"""
+        self.call(self.func_name(kind), "up", self._ids_param(ids))
+        return True
+
+    def disable(self, kind: str, ids: Iterable) -> bool:
+        """按id停用配置"""
+        self.call(self.func_name(kind), "down", self._ids_param(ids))
+        return True
+
+    def find_ids(self, kind: str, predicate: Callable[[Dict], bool] = None) -> List:
+        """查找满足条件的配置id"""
+        return [entry.get("id") for entry in self.list(kind) if predicate is None or predicate(entry)]
+
+    def delete_all(self, kind: str, predicate: Callable[[Dict], bool] = None) -> int:
+        """删除所有（或满足条件的）配置，返回删除数量"""
+        ids = self.find_ids(kind, predicate)
+        self.delete(kind, ids)
+        return len(ids)
+
+    # ------------------------------------------------------------------
+    # 导入导出
+    # ------------------------------------------------------------------
+
+    def export(self, kind: str, format_type: str, download_path: str) -> str:
+        """导出配置文件到download_path，返回文件路径"""
+        data = self.call(self.func_name(kind), "EXPORT", {"TYPE": "data", "format": format_type})
+        filename = data.get("filename") if isinstance(data, dict) else data
+        if not filename:
+            filename = f"{self.func_name(kind)}.{format_type}"
+
+        response = self.session.get(f"{self.base_url}/Action/download", params={"filename": filename},
+                                    timeout=self.timeout, stream=True)
+        if response.status_code != 200:
+            raise RouterApiError(f"下载导出文件失败，状态码: {response.status_code}")
+
+        os.makedirs(download_path, exist_ok=True)
+        file_path = os.path.join(download_path, os.path.basename(filename))
+        with open(file_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if chunk:
+                    f.write(chunk)
+        return file_path
+
+    def import_file(self, kind: str, file_path: str, append: bool = True) -> bool:
+        """上传并导入配置文件，append为True时合并到当前数据"""
+        with open(file_path, 'rb') as f:
+            response = self.session.post(
+                f"{self.base_url}/Action/upload",
+                files={"file": (os.path.basename(file_path), f)},
+                headers={"Content-Type": None},
+                timeout=self.timeout,
+            )
+        result = self._parse(response)
+        filename = result.get("Data", {}).get("filename") if isinstance(result.get("Data"), dict) else None
+        self.call(self.func_name(kind), "IMPORT", {
+            "filename": filename or os.path.basename(file_path),
+            "append": 1 if append else 0,
+        })
+        return True
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
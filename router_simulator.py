@@ -0,0 +1,1348 @@
+# -*- coding: utf-8 -*-
+"""iKuai路由器本地模拟器
+
+只依赖标准库：内存中保存VLAN、PPTP、L2TP配置，提供登录页、列表页和表单，
+以及/Action/login、/Action/call、/Action/download、/Action/upload接口，
+页面结构和各测试模块使用的选择器保持一致，用于脱离真机调试和压测框架。
+
+用法：
+    python router_simulator.py --port 8080 --latency 50 --entries 100
+    python modules/vlan_module.py --router-ip 127.0.0.1:8080
+"""
+import argparse
+import base64
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import secrets
+import shlex
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlparse
+
+# 接口返回码（与router_api保持一致）
+RESULT_LOGIN_OK = 10000
+RESULT_LOGIN_FAILED = 10001
+RESULT_NOT_LOGIN = 10014
+RESULT_CALL_OK = 30000
+RESULT_CALL_FAILED = 30001
+
+# 各配置表的字段（导出/导入的列顺序）
+TABLE_FIELDS = {
+    "vlan": ["vlan_id", "vlan_name", "mac", "interface", "ip_mask", "extend_ip", "comment", "enabled"],
+    "pptp_client": ["name", "server", "server_port", "username", "passwd", "mtu", "mru", "interface",
+                    "cycle_rst_time", "timing_rst_switch", "timing_rst_week", "timing_rst_time",
+                    "comment", "enabled"],
+    "l2tp_client": ["name", "server", "server_port", "username", "passwd", "mtu", "mru", "interface",
+                    "cycle_rst_time", "timing_rst_switch", "timing_rst_week", "timing_rst_time",
+                    "comment", "enabled"],
+}
+
+# 唯一键字段
+KEY_FIELDS = {"vlan": "vlan_id", "pptp_client": "name", "l2tp_client": "name"}
+
+# VPN客户端连接后分配的本地IP网段
+LOCAL_IP_PREFIX = {"pptp_client": "10.8.0", "l2tp_client": "10.9.0"}
+
+# 搜索时不参与匹配的字段
+UNSEARCHABLE_FIELDS = {"passwd"}
+
+SESSION_COOKIE = "sess_key"
+
+# 列表页每页条数（0表示不分页）
+DEFAULT_PAGE_SIZE = 50
+
+class SimulatorError(Exception):
+    """模拟器接口调用失败"""
+
+    def __init__(self, message: str, code: int = RESULT_CALL_FAILED):
+        super().__init__(message)
+        self.code = code
+
+class RouterState:
+    """路由器内存状态 - 配置表、会话、导出/上传的文件"""
+
+    def __init__(self, entries: int = 0):
+        self.lock = threading.Lock()
+        self.tables: Dict[str, List[Dict]] = {func: [] for func in TABLE_FIELDS}
+        self.files: Dict[str, bytes] = {}
+        self.sessions = set()
+        self.next_id = 1
+        self.call_count = 0
+        if entries:
+            self.seed(entries)
+
+    # ------------------------------------------------------------------
+    # 预置数据
+    # ------------------------------------------------------------------
+
+    def seed(self, count: int):
+        """每个配置表预置count条数据（VLAN ID从4090向下分配，避开测试用的ID）"""
+        with self.lock:
+            for i in range(min(count, 4000)):
+                self._insert("vlan", {
+                    "vlan_id": str(4090 - i),
+                    "vlan_name": f"seed_vlan{i + 1:04d}",
+                    "mac": f"02:00:00:00:{(i >> 8) & 0xff:02x}:{i & 0xff:02x}",
+                    "interface": "lan1",
+                    "ip_mask": f"10.{100 + i // 250}.{i % 250}.1/255.255.255.0",
+                    "comment": "seed",
+                    "enabled": "yes",
+                })
+            for func, prefix in (("pptp_client", "pptp"), ("l2tp_client", "l2tp")):
+                for i in range(count):
+                    self._insert(func, {
+                        "name": f"seed_{prefix}{i + 1:04d}",
+                        "server": "10.66.0.4",
+                        "server_port": "1723" if prefix == "pptp" else "1701",
+                        "username": "seed",
+                        "passwd": "seed",
+                        "mtu": "1400",
+                        "mru": "1400",
+                        "interface": "auto",
+                        "cycle_rst_time": "0",
+                        "timing_rst_switch": "0",
+                        "timing_rst_week": "",
+                        "timing_rst_time": "",
+                        "comment": "seed",
+                        "enabled": "yes",
+                    })
+
+    # ------------------------------------------------------------------
+    # 会话
+    # ------------------------------------------------------------------
+
+    def create_session(self) -> str:
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.sessions.add(token)
+        return token
+
+    def has_session(self, token: Optional[str]) -> bool:
+        with self.lock:
+            return bool(token) and token in self.sessions
+
+    # ------------------------------------------------------------------
+    # 配置表操作（调用方持有锁）
+    # ------------------------------------------------------------------
+
+    def _table(self, func: str) -> List[Dict]:
+        if func not in self.tables:
+            raise SimulatorError(f"不支持的功能: {func}")
+        return self.tables[func]
+
+    def _normalize(self, func: str, entry: Dict) -> Dict:
+        """只保留已知字段，统一转为字符串"""
+        normalized = {field: "" for field in TABLE_FIELDS[func]}
+        for field in TABLE_FIELDS[func]:
+            value = entry.get(field)
+            if value is not None:
+                normalized[field] = str(value).strip()
+        if normalized["enabled"] not in ("yes", "no"):
+            normalized["enabled"] = "yes"
+        return normalized
+
+    def _validate(self, func: str, entry: Dict, entry_id: int = None):
+        key_field = KEY_FIELDS[func]
+        key = entry[key_field]
+        if not key:
+            raise SimulatorError(f"{key_field}不能为空")
+        if func == "vlan" and not (key.isdigit() and 1 <= int(key) <= 4090):
+            raise SimulatorError("VLAN ID范围为1-4090")
+        for existing in self.tables[func]:
+            if existing[key_field] == key and existing["id"] != entry_id:
+                raise SimulatorError(f"{key}已存在")
+
+    def _insert(self, func: str, entry: Dict) -> int:
+        normalized = self._normalize(func, entry)
+        self._validate(func, normalized)
+        normalized["id"] = self.next_id
+        self.next_id += 1
+        self.tables[func].append(normalized)
+        return normalized["id"]
+
+    @staticmethod
+    def _parse_ids(param: Dict) -> set:
+        return {int(entry_id) for entry_id in str(param.get("id", "")).split(",") if entry_id.strip().isdigit()}
+
+    @staticmethod
+    def _parse_limit(limit, total: int) -> Tuple[int, int]:
+        """limit格式为"起始,条数"，缺省返回全部"""
+        try:
+            start, count = (int(part) for part in str(limit).split(","))
+            return max(start, 0), max(count, 0)
+        except (TypeError, ValueError):
+            return 0, total
+
+    def _present(self, func: str, entry: Dict) -> Dict:
+        """返回给前端的数据（VPN客户端附带本地IP）"""
+        row = dict(entry)
+        if func in LOCAL_IP_PREFIX:
+            row["local_ip"] = f"{LOCAL_IP_PREFIX[func]}.{entry['id'] % 250 + 2}" if entry["enabled"] == "yes" else "-"
+        return row
+
+    def show(self, func: str, param: Dict) -> Dict:
+        table = self._table(func)
+        finder = str(param.get("FINDS", "")).strip().lower()
+        if finder:
+            table = [entry for entry in table
+                     if any(finder in str(value).lower() for field, value in entry.items()
+                            if field not in UNSEARCHABLE_FIELDS and field != "id")]
+        start, count = self._parse_limit(param.get("limit"), len(table))
+        return {"total": len(table), "data": [self._present(func, entry) for entry in table[start:start + count]]}
+
+    def add(self, func: str, param: Dict) -> Dict:
+        self._table(func)
+        return {"id": self._insert(func, param)}
+
+    def edit(self, func: str, param: Dict) -> Dict:
+        entry_ids = self._parse_ids(param)
+        for entry in self._table(func):
+            if entry["id"] in entry_ids:
+                updated = self._normalize(func, dict(entry, **param))
+                self._validate(func, updated, entry["id"])
+                entry.update(updated)
+                return {"id": entry["id"]}
+        raise SimulatorError("配置不存在")
+
+    def delete(self, func: str, param: Dict) -> None:
+        entry_ids = self._parse_ids(param)
+        self.tables[func] = [entry for entry in self._table(func) if entry["id"] not in entry_ids]
+
+    def set_enabled(self, func: str, param: Dict, enabled: bool) -> None:
+        entry_ids = self._parse_ids(param)
+        for entry in self._table(func):
+            if entry["id"] in entry_ids:
+                entry["enabled"] = "yes" if enabled else "no"
+
+    # ------------------------------------------------------------------
+    # 导入导出
+    # ------------------------------------------------------------------
+
+    def export(self, func: str, param: Dict) -> Dict:
+        format_type = str(param.get("format", "csv")).lower()
+        fields = TABLE_FIELDS[func]
+        rows = self._table(func)
+        if format_type == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(fields)
+            for entry in rows:
+                writer.writerow([entry[field] for field in fields])
+            content = buffer.getvalue()
+        elif format_type == "txt":
+            content = "".join(" ".join(f"{field}={shlex.quote(entry[field])}" for field in fields) + "\n"
+                              for entry in rows)
+        else:
+            raise SimulatorError(f"不支持的导出格式: {format_type}")
+        filename = f"{func}.{format_type}"
+        self.files[filename] = content.encode("utf-8")
+        return {"filename": filename}
+
+    def store_upload(self, filename: str, content: bytes) -> str:
+        filename = os.path.basename(filename or "upload")
+        with self.lock:
+            self.files[filename] = content
+        return filename
+
+    @staticmethod
+    def parse_file(filename: str, content: bytes) -> List[Dict]:
+        """解析导出格式的CSV/TXT文件"""
+        text = content.decode("utf-8-sig")
+        if filename.lower().endswith(".txt"):
+            entries = []
+            for line in text.splitlines():
+                if not line.strip():
+                    continue
+                entry = {}
+                for token in shlex.split(line):
+                    field, sep, value = token.partition("=")
+                    if sep:
+                        entry[field] = value
+                entries.append(entry)
+            return entries
+        return list(csv.DictReader(io.StringIO(text)))
+
+    def import_file(self, func: str, param: Dict) -> Dict:
+        filename = os.path.basename(str(param.get("filename", "")))
+        if filename not in self.files:
+            raise SimulatorError("导入文件不存在，请重新上传")
+        try:
+            entries = self.parse_file(filename, self.files[filename])
+        except (UnicodeDecodeError, ValueError, csv.Error):
+            raise SimulatorError("导入文件格式错误")
+
+        table = self._table(func)
+        if str(param.get("append", "0")) not in ("1", "true", "True"):
+            table.clear()
+        key_field = KEY_FIELDS[func]
+        existing = {entry[key_field] for entry in table}
+        imported = 0
+        for entry in entries:
+            entry.pop("id", None)
+            if entry.get(key_field) in existing:
+                continue
+            try:
+                self._insert(func, entry)
+            except SimulatorError:
+                continue
+            existing.add(entry.get(key_field))
+            imported += 1
+        return {"count": imported}
+
+    # ------------------------------------------------------------------
+    # /Action/call 分发
+    # ------------------------------------------------------------------
+
+    def call(self, func: str, action: str, param: Dict):
+        with self.lock:
+            self.call_count += 1
+            if func not in self.tables:
+                # 首页状态等其他接口只用于校验登录态
+                return {}
+            if action == "show":
+                return self.show(func, param)
+            if action == "add":
+                return self.add(func, param)
+            if action == "edit":
+                return self.edit(func, param)
+            if action == "del":
+                return self.delete(func, param)
+            if action in ("up", "down"):
+                return self.set_enabled(func, param, action == "up")
+            if action == "EXPORT":
+                return self.export(func, param)
+            if action == "IMPORT":
+                return self.import_file(func, param)
+            raise SimulatorError(f"不支持的操作: {action}")
+
+class SimulatorRequestHandler(BaseHTTPRequestHandler):
+    """模拟器HTTP请求处理"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "iKuaiSimulator/1.0"
+
+    @property
+    def state(self) -> RouterState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ------------------------------------------------------------------
+    # 请求/响应工具
+    # ------------------------------------------------------------------
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, payload: Dict, headers: Dict[str, str] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send(200, body, "application/json; charset=utf-8", headers)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _read_json(self) -> Dict:
+        try:
+            payload = json.loads(self._read_body().decode("utf-8") or "{}")
+        except ValueError:
+            return {}
+        return payload if isinstance(payload, dict) else {}
+
+    def _session_token(self) -> Optional[str]:
+        for item in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = item.strip().partition("=")
+            if name == SESSION_COOKIE:
+                return value
+        return None
+
+    def _simulate_latency(self):
+        latency, jitter = self.server.latency, self.server.jitter
+        if latency or jitter:
+            time.sleep(latency + random.uniform(0, jitter))
+
+    # ------------------------------------------------------------------
+    # 路由
+    # ------------------------------------------------------------------
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in ("/", "/login", "/index.html"):
+            html = INDEX_HTML.replace("__PAGE_SIZE__", str(self.server.page_size))
+            self._send(200, html.encode("utf-8"), "text/html; charset=utf-8")
+        elif path == "/static/app.js":
+            self._send(200, APP_JS.encode("utf-8"), "application/javascript; charset=utf-8")
+        elif path == "/static/app.css":
+            self._send(200, APP_CSS.encode("utf-8"), "text/css; charset=utf-8")
+        elif path == "/Action/download":
+            self._simulate_latency()
+            self._handle_download()
+        else:
+            self._send(404, b"Not Found", "text/plain; charset=utf-8")
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if not path.startswith("/Action/"):
+            self._read_body()
+            self._send(404, b"Not Found", "text/plain; charset=utf-8")
+            return
+
+        self._simulate_latency()
+        if path == "/Action/login":
+            self._handle_login()
+        elif path == "/Action/call":
+            self._handle_call()
+        elif path == "/Action/upload":
+            self._handle_upload()
+        else:
+            self._read_body()
+            self._send(404, b"Not Found", "text/plain; charset=utf-8")
+
+    # ------------------------------------------------------------------
+    # 接口
+    # ------------------------------------------------------------------
+
+    def _check_password(self, payload: Dict) -> bool:
+        """兼容两种密码字段：passwd为md5，pass为base64("salt_11"+密码)"""
+        password = self.server.password
+        if payload.get("passwd") == hashlib.md5(password.encode("utf-8")).hexdigest():
+            return True
+        try:
+            return base64.b64decode(payload.get("pass") or "").decode("utf-8") == f"salt_11{password}"
+        except ValueError:
+            return False
+
+    def _handle_login(self):
+        payload = self._read_json()
+        if payload.get("username") != self.server.username or not self._check_password(payload):
+            self._send_json({"Result": RESULT_LOGIN_FAILED, "ErrMsg": "用户名或密码错误"})
+            return
+        token = self.state.create_session()
+        self._send_json({"Result": RESULT_LOGIN_OK, "ErrMsg": "Success"},
+                        {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"})
+
+    def _handle_call(self):
+        payload = self._read_json()
+        if not self.state.has_session(self._session_token()):
+            self._send_json({"Result": RESULT_NOT_LOGIN, "ErrMsg": "no login authentication"})
+            return
+        param = payload.get("param") if isinstance(payload.get("param"), dict) else {}
+        try:
+            data = self.state.call(str(payload.get("func_name", "")), str(payload.get("action", "")), param)
+        except SimulatorError as e:
+            self._send_json({"Result": e.code, "ErrMsg": str(e)})
+            return
+        response = {"Result": RESULT_CALL_OK, "ErrMsg": "Success"}
+        if data is not None:
+            response["Data"] = data
+        self._send_json(response)
+
+    def _handle_upload(self):
+        body = self._read_body()
+        if not self.state.has_session(self._session_token()):
+            self._send_json({"Result": RESULT_NOT_LOGIN, "ErrMsg": "no login authentication"})
+            return
+        content_type = self.headers.get("Content-Type", "")
+        message = BytesParser(policy=email_policy).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+        )
+        if message.is_multipart():
+            for part in message.iter_parts():
+                if part.get_filename():
+                    filename = self.state.store_upload(part.get_filename(), part.get_payload(decode=True) or b"")
+                    self._send_json({"Result": RESULT_CALL_OK, "ErrMsg": "Success", "Data": {"filename": filename}})
+                    return
+        self._send_json({"Result": RESULT_CALL_FAILED, "ErrMsg": "未找到上传文件"})
+
+    def _handle_download(self):
+        if not self.state.has_session(self._session_token()):
+            self._send(403, b"Forbidden", "text/plain; charset=utf-8")
+            return
+        filename = os.path.basename(parse_qs(urlparse(self.path).query).get("filename", [""])[0])
+        with self.state.lock:
+            content = self.state.files.get(filename)
+        if content is None:
+            self._send(404, b"Not Found", "text/plain; charset=utf-8")
+            return
+        self._send(200, content, "application/octet-stream", {
+            "Content-Disposition": f"attachment; filename=\"{filename}\"; filename*=UTF-8''{quote(filename)}",
+        })
+
+class RouterSimulator:
+    """路由器模拟器 - 可在后台线程中启动，供脚本或压测直接使用"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, username: str = "admin",
+                 password: str = "admin123", latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 entries: int = 0, verbose: bool = False, page_size: int = DEFAULT_PAGE_SIZE):
+        self.state = RouterState(entries)
+        self.httpd = ThreadingHTTPServer((host, port), SimulatorRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.httpd.username = username
+        self.httpd.password = password
+        self.httpd.latency = latency_ms / 1000.0
+        self.httpd.jitter = jitter_ms / 1000.0
+        self.httpd.verbose = verbose
+        self.httpd.page_size = page_size
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def router_url(self) -> str:
+        """可直接用作RouterTestConfig.router_url"""
+        return f"{self.base_url}/login#/login"
+
+    def start(self) -> "RouterSimulator":
+        """在后台线程中启动"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="router-simulator", daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>iKuai路由器模拟器</title>
+<link rel="stylesheet" href="/static/app.css">
+</head>
+<body data-page-size="__PAGE_SIZE__">
+<div id="app"></div>
+<script src="/static/app.js"></script>
+</body>
+</html>
+"""
+
+APP_CSS = """
+* { box-sizing: border-box; }
+body { margin: 0; font: 14px/1.6 "Microsoft YaHei", sans-serif; color: #333; background: #f3f5f8; }
+a { color: #2d8cf0; cursor: pointer; text-decoration: none; }
+[hidden] { display: none !important; }
+.login_wrap { display: flex; align-items: center; justify-content: center; height: 100vh; }
+.login_box { width: 320px; padding: 30px; background: #fff; border-radius: 4px; }
+.login_box input { display: block; width: 100%; height: 36px; margin-bottom: 16px; padding: 0 10px; }
+.login_btn { width: 100%; height: 36px; color: #fff; background: #2d8cf0; border: 0; cursor: pointer; }
+.header { height: 50px; padding: 0 20px; line-height: 50px; color: #fff; background: #1f2d3d; }
+.layout { display: flex; min-height: calc(100vh - 50px); }
+.side_nav { width: 180px; padding: 10px 0; background: #2b3a4b; }
+.side_nav a { display: block; padding: 6px 20px; color: #cfd8e3; }
+.side_nav .sub_nav { padding-left: 14px; }
+.main { flex: 1; padding: 20px; }
+.page_tit { margin-bottom: 16px; font-size: 18px; }
+.toolbar { display: flex; align-items: center; gap: 8px; margin-bottom: 12px; }
+.toolbar .btn, .toolbar .btn_green { display: inline-block; padding: 4px 14px; border: 1px solid #dcdfe6; background: #fff; color: #333; }
+.toolbar .btn_green { color: #fff; background: #19be6b; border-color: #19be6b; }
+.dropdown { position: relative; }
+.drop_menu { position: absolute; top: 30px; left: 0; z-index: 10; margin: 0; padding: 4px 0; list-style: none; background: #fff; border: 1px solid #dcdfe6; }
+.drop_menu a { display: block; padding: 2px 20px; }
+.search { margin-left: auto; }
+.search_inpt { height: 30px; padding: 0 8px; }
+table { width: 100%; border-collapse: collapse; background: #fff; }
+th, td { padding: 6px 8px; border: 1px solid #ebeef5; text-align: left; }
+td.ops a { margin-right: 8px; }
+.empty_tip { padding: 20px; text-align: center; color: #999; background: #fff; }
+.table_foot { display: flex; align-items: center; padding: 8px 0; color: #999; }
+.el-pagination { display: flex; align-items: center; margin-left: 16px; }
+.el-pager { display: flex; margin: 0 8px; padding: 0; list-style: none; }
+.el-pager li { min-width: 28px; padding: 0 4px; text-align: center; cursor: pointer; }
+.el-pager li.active { color: #2d8cf0; font-weight: bold; }
+.form_box { padding: 20px; background: #fff; }
+.line_edit, .line_show { display: flex; flex-wrap: wrap; align-items: center; margin-bottom: 14px; }
+.input_tit { width: 140px; text-align: right; padding-right: 10px; }
+.input_box { flex: 1; }
+.inputText, .selects { height: 30px; padding: 0 8px; min-width: 220px; }
+.times .inputText { min-width: 80px; width: 80px; margin-right: 8px; }
+label.checkbox { margin-right: 12px; cursor: pointer; }
+.timing_box { margin-top: 8px; }
+.error_tip { width: 100%; margin: 4px 0 0 140px; color: #ed4014; font-size: 12px; }
+.ext_table { width: auto; margin-top: 8px; }
+.ext_table input { width: 140px; margin-right: 6px; }
+.btn_btm { padding-left: 140px; }
+.el-button { padding: 6px 18px; margin-right: 10px; border: 1px solid #dcdfe6; background: #fff; cursor: pointer; }
+.el-button--primary { color: #fff; background: #2d8cf0; border-color: #2d8cf0; }
+.el-message-box__wrapper, .el-dialog__wrapper { position: fixed; inset: 0; z-index: 100; display: flex; align-items: center; justify-content: center; background: rgba(0, 0, 0, .4); }
+.el-message-box, .el-dialog { width: 420px; padding: 20px; background: #fff; border-radius: 4px; }
+.el-message-box__content, .el-dialog__body { margin: 16px 0; }
+.el-message-box__btns, .el-dialog__footer { text-align: right; }
+.el-message { position: fixed; top: 20px; left: 50%; z-index: 200; transform: translateX(-50%); padding: 8px 20px; background: #f0f9eb; border: 1px solid #e1f3d8; pointer-events: none; }
+.el-message--error, .el-message--warning { background: #fef0f0; border-color: #fde2e2; }
+"""
+
+APP_JS = r"""
+(function () {
+    'use strict';
+
+    var RESULT_LOGIN_OK = 10000;
+    var RESULT_NOT_LOGIN = 10014;
+    var RESULT_CALL_OK = 30000;
+    var MAX_ROWS = 10000;
+    var PAGE_SIZE = Number(document.body.dataset.pageSize) || MAX_ROWS;
+    var WEEK_DAYS = ['周一', '周二', '周三', '周四', '周五', '周六', '周日'];
+    var NETMASKS = ['255.255.255.0', '255.255.254.0', '255.255.252.0', '255.255.248.0', '255.255.240.0', '255.255.0.0'];
+    var LAN_LINES = [['lan1', 'lan1'], ['lan2', 'lan2']];
+    var WAN_LINES = [['auto', '自动'], ['wan1', 'wan1'], ['wan2', 'wan2']];
+    var IP_RE = /^(25[0-5]|2[0-4]\d|1?\d?\d)(\.(25[0-5]|2[0-4]\d|1?\d?\d)){3}$/;
+    var MAC_RE = /^([0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}$/;
+    var TIME_RE = /^([01]\d|2[0-3]):[0-5]\d$/;
+
+    var app = document.getElementById('app');
+    var state = {loggedIn: false, page: null, rows: [], total: 0, pageNo: 1, selected: {}, search: '', form: null};
+
+    function esc(value) {
+        return String(value == null ? '' : value).replace(/[&<>"']/g, function (c) {
+            return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+        });
+    }
+
+    function post(path, body) {
+        return fetch(path, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: {'Content-Type': 'application/json;charset=UTF-8'},
+            body: JSON.stringify(body)
+        }).then(function (response) { return response.json(); });
+    }
+
+    function call(func, action, param) {
+        return post('/Action/call', {func_name: func, action: action, param: param || {}}).then(function (res) {
+            if (res.Result === RESULT_NOT_LOGIN) {
+                state.loggedIn = false;
+                location.hash = '#/login';
+                throw new Error(res.ErrMsg);
+            }
+            return res;
+        });
+    }
+
+    function toast(text, type) {
+        var el = document.createElement('div');
+        el.className = 'el-message el-message--' + (type || 'success');
+        el.textContent = text;
+        document.body.appendChild(el);
+        setTimeout(function () { el.remove(); }, 1500);
+    }
+
+    function currentRoute() {
+        return location.hash.replace(/^#\/?/, '').split('?')[0];
+    }
+
+    // ------------------------------------------------------------------
+    // 表单控件
+    // ------------------------------------------------------------------
+
+    function lineEdit(label, control) {
+        return '<div class="line_edit"><div class="input_tit">' + esc(label) + '</div>' +
+            '<div class="input_box">' + control + '</div></div>';
+    }
+
+    function textInput(name, label, value, extra) {
+        return '<input type="text" class="inputText" name="' + name + '" data-vv-as="' + esc(label) + '" value="' +
+            esc(value) + '"' + (extra || '') + '>';
+    }
+
+    function selectHtml(name, options, value) {
+        return '<select class="focuseText selects" name="' + name + '">' + options.map(function (option) {
+            var pair = Array.isArray(option) ? option : [option, option];
+            return '<option value="' + esc(pair[0]) + '"' + (pair[0] === value ? ' selected' : '') + '>' + esc(pair[1]) + '</option>';
+        }).join('') + '</select>';
+    }
+
+    function required(values, errors, name, label) {
+        if (!values[name]) {
+            errors[name] = label + '为必填项';
+            return false;
+        }
+        return true;
+    }
+
+    function numberRange(values, errors, name, label, min, max) {
+        if (required(values, errors, name, label)) {
+            var number = Number(values[name]);
+            if (!/^\d+$/.test(values[name]) || number < min || number > max) {
+                errors[name] = label + '范围为' + min + '-' + max;
+            }
+        }
+    }
+
+    function status(entry) {
+        return entry.enabled === 'yes' ? '已启用' : '已停用';
+    }
+
+    // ------------------------------------------------------------------
+    // 页面定义
+    // ------------------------------------------------------------------
+
+    function parseExt(value) {
+        return (value || '').split(',').filter(Boolean).map(function (item) {
+            var parts = item.split('#');
+            return {ip: parts[0], comment: parts.slice(1).join('#'), editing: false};
+        });
+    }
+
+    var VLAN_PAGE = {
+        func: 'vlan',
+        title: 'VLAN设置',
+        headers: ['VLAN ID', 'VLAN名称', 'MAC地址', 'IP地址', '线路', '扩展IP', '备注', '状态', '操作'],
+        cells: function (e) {
+            var ext = parseExt(e.extend_ip).map(function (item) { return item.ip; }).join(',');
+            return [e.vlan_id, e.vlan_name, e.mac, e.ip_mask, e.interface, ext || '-', e.comment, status(e)];
+        },
+        formHtml: function (e) {
+            var ipMask = (e.ip_mask || '').split('/');
+            return lineEdit('VLAN ID：', textInput('vlan_id', 'VLAN ID', e.vlan_id)) +
+                lineEdit('VLAN名称：', textInput('vlan_name', 'VLAN名称', e.vlan_name)) +
+                lineEdit('MAC：', textInput('mac', 'MAC', e.mac)) +
+                lineEdit('IP地址：', textInput('ip_addr', 'IP地址', ipMask[0])) +
+                lineEdit('子网掩码：', selectHtml('netmask', NETMASKS, ipMask[1] || '255.255.255.0')) +
+                lineEdit('线路：', selectHtml('interface', LAN_LINES, e.interface || 'lan1')) +
+                lineEdit('扩展IP：', '<button type="button" class="btn btn_small" data-act="ext-add">添加</button>' +
+                    '<table class="ext_table"><tbody id="ext_body"></tbody></table>') +
+                lineEdit('备注：', textInput('comment', '备注', e.comment));
+        },
+        validate: function (values) {
+            var errors = {};
+            numberRange(values, errors, 'vlan_id', 'VLAN ID', 1, 4090);
+            required(values, errors, 'vlan_name', 'VLAN名称');
+            if (values.mac && !MAC_RE.test(values.mac)) errors.mac = 'MAC地址格式错误';
+            if (values.ip_addr && !IP_RE.test(values.ip_addr)) errors.ip_addr = 'IP地址格式错误';
+            return errors;
+        },
+        toEntry: function (values) {
+            return {
+                vlan_id: values.vlan_id,
+                vlan_name: values.vlan_name,
+                mac: values.mac,
+                interface: values.interface,
+                ip_mask: values.ip_addr ? values.ip_addr + '/' + values.netmask : '',
+                extend_ip: state.form.ext.filter(function (item) { return !item.editing; }).map(function (item) {
+                    return item.comment ? item.ip + '#' + item.comment : item.ip;
+                }).join(','),
+                comment: values.comment
+            };
+        }
+    };
+
+    function vpnPage(func, title, nameLabel, defaultPort) {
+        return {
+            func: func,
+            title: title,
+            headers: [nameLabel, '服务器地址', '用户名', '线路', '状态', '本地IP', '备注', '操作'],
+            cells: function (e) {
+                return [e.name, e.server, e.username, e.interface, status(e), e.local_ip || '-', e.comment];
+            },
+            formHtml: function (e) {
+                var on = String(e.timing_rst_switch) === '1';
+                var weeks = e.timing_rst_week || '';
+                var times = (e.timing_rst_time || '').split(',');
+                return lineEdit(nameLabel + '：', textInput('name', nameLabel, e.name)) +
+                    lineEdit('服务器地址/域名：', textInput('server', '服务器地址/域名', e.server)) +
+                    lineEdit('服务端口：', textInput('server_port', '服务端口', e.server_port || defaultPort)) +
+                    lineEdit('用户名：', textInput('username', '用户名', e.username)) +
+                    lineEdit('密码：', '<input type="password" class="inputText" name="passwd" data-vv-as="密码" value="' + esc(e.passwd) + '">') +
+                    lineEdit('MTU：', textInput('mtu', 'MTU', e.mtu || '1400', ' aria-required="true"')) +
+                    lineEdit('MRU：', textInput('mru', 'MRU', e.mru || '1400', ' aria-required="true"')) +
+                    lineEdit('线路：', selectHtml('interface', WAN_LINES, e.interface || 'auto')) +
+                    lineEdit('间隔时长重拨：', textInput('cycle_rst_time', '间隔时长重拨', e.cycle_rst_time || '0') + ' 分钟') +
+                    '<div class="line_show"><div class="input_tit">定时重拨：</div><div class="input_box">' +
+                    '<label class="checkbox"><input type="checkbox" name="timing_rst_switch"' + (on ? ' checked' : '') + '> 开启</label>' +
+                    '<div class="timing_box"' + (on ? '' : ' hidden') + '><div class="week">' +
+                    WEEK_DAYS.map(function (day, index) {
+                        var checked = weeks.indexOf(String(index + 1)) >= 0 ? ' checked' : '';
+                        return '<label class="checkbox"><input type="checkbox" class="week_day" value="' + (index + 1) + '"' + checked + '> ' + day + '</label>';
+                    }).join('') + '</div><div class="times">' +
+                    [0, 1, 2].map(function (index) {
+                        return textInput('time' + index, '重拨时间', times[index] || '', ' placeholder="HH:MM"');
+                    }).join('') + '</div></div></div></div>' +
+                    lineEdit('备注：', textInput('comment', '备注', e.comment));
+            },
+            validate: function (values) {
+                var errors = {};
+                required(values, errors, 'name', nameLabel);
+                required(values, errors, 'server', '服务器地址/域名');
+                numberRange(values, errors, 'server_port', '服务端口', 1, 65535);
+                required(values, errors, 'username', '用户名');
+                required(values, errors, 'passwd', '密码');
+                numberRange(values, errors, 'mtu', 'MTU', 576, 1500);
+                numberRange(values, errors, 'mru', 'MRU', 576, 1500);
+                numberRange(values, errors, 'cycle_rst_time', '间隔时长重拨', 0, 1440);
+                if (values.timing_rst_switch) {
+                    var filled = ['time0', 'time1', 'time2'].filter(function (name) { return values[name]; });
+                    if (!filled.length) errors.time0 = '定时重拨时间为必填项';
+                    filled.forEach(function (name) {
+                        if (!TIME_RE.test(values[name])) errors[name] = '定时重拨时间格式错误';
+                    });
+                }
+                return errors;
+            },
+            toEntry: function (values) {
+                var days = Array.prototype.map.call(document.querySelectorAll('.week_day:checked'), function (el) { return el.value; });
+                return {
+                    name: values.name,
+                    server: values.server,
+                    server_port: values.server_port,
+                    username: values.username,
+                    passwd: values.passwd,
+                    mtu: values.mtu,
+                    mru: values.mru,
+                    interface: values.interface,
+                    cycle_rst_time: values.cycle_rst_time,
+                    timing_rst_switch: values.timing_rst_switch ? 1 : 0,
+                    timing_rst_week: days.join(''),
+                    timing_rst_time: [values.time0, values.time1, values.time2].filter(Boolean).join(','),
+                    comment: values.comment
+                };
+            }
+        };
+    }
+
+    var PAGES = {
+        'network/vlan': VLAN_PAGE,
+        'network/vpn/pptp-client': vpnPage('pptp_client', 'PPTP客户端', '拨号名称', '1723'),
+        'network/vpn/l2tp-client': vpnPage('l2tp_client', 'L2TP客户端', '隧道名称', '1701')
+    };
+
+    var TITLES = {'': '系统概况', 'network': '网络设置', 'network/vpn': 'VPN客户端'};
+
+    // ------------------------------------------------------------------
+    // 登录与框架
+    // ------------------------------------------------------------------
+
+    function renderLogin() {
+        app.innerHTML = '<div class="login_wrap"><div class="login_box">' +
+            '<input type="text" name="username" placeholder="用户名">' +
+            '<input type="password" name="passwd" placeholder="密码">' +
+            '<button type="button" class="login_btn">登录</button></div></div>';
+        var box = app.querySelector('.login_box');
+        var submit = function () {
+            var username = box.querySelector('[name=username]').value;
+            var password = box.querySelector('[name=passwd]').value;
+            post('/Action/login', {
+                username: username,
+                passwd: '',
+                pass: btoa(unescape(encodeURIComponent('salt_11' + password))),
+                remember_password: ''
+            }).then(function (res) {
+                if (res.Result !== RESULT_LOGIN_OK) {
+                    toast(res.ErrMsg || '登录失败', 'error');
+                    return;
+                }
+                state.loggedIn = true;
+                if (currentRoute() === '') {
+                    render();
+                } else {
+                    location.hash = '#/';
+                }
+            });
+        };
+        box.querySelector('.login_btn').addEventListener('click', submit);
+        box.addEventListener('keydown', function (event) {
+            if (event.key === 'Enter') submit();
+        });
+    }
+
+    function renderLayout() {
+        var main = document.getElementById('main');
+        if (main) return main;
+        app.innerHTML = '<div class="header">iKuai 路由器模拟器</div><div class="layout"><div class="side_nav">' +
+            '<a href="#/">系统概况</a>' +
+            '<a href="#/network">网络设置</a>' +
+            '<div class="sub_nav"><a href="#/network/vlan">VLAN设置</a>' +
+            '<a href="#/network/vpn">VPN客户端</a>' +
+            '<div class="sub_nav"><a href="#/network/vpn/pptp-client">PPTP</a>' +
+            '<a href="#/network/vpn/l2tp-client">L2TP</a></div></div></div>' +
+            '<div class="main" id="main"></div></div>';
+        main = document.getElementById('main');
+        main.addEventListener('click', onMainClick);
+        main.addEventListener('change', onMainChange);
+        main.addEventListener('input', onMainInput);
+        main.addEventListener('keydown', onMainKeydown);
+        return main;
+    }
+
+    function render() {
+        var route = currentRoute();
+        closeOverlays();
+        if (!state.loggedIn || route === 'login') {
+            renderLogin();
+            return;
+        }
+        var main = renderLayout();
+        state.form = null;
+        if (PAGES[route]) {
+            renderList(PAGES[route]);
+        } else {
+            state.page = null;
+            main.innerHTML = '<div class="page_tit">' + esc(TITLES[route] || '系统概况') + '</div>' +
+                '<div class="form_box">运行状态：正常</div>';
+        }
+    }
+
+    function closeOverlays() {
+        document.querySelectorAll('.el-message-box__wrapper, .el-dialog__wrapper').forEach(function (el) { el.remove(); });
+    }
+
+    // ------------------------------------------------------------------
+    // 列表
+    // ------------------------------------------------------------------
+
+    function renderList(page) {
+        var main = document.getElementById('main');
+        state.page = page;
+        state.form = null;
+        state.selected = {};
+        state.search = '';
+        state.pageNo = 1;
+        main.innerHTML = '<div class="page_tit">' + esc(page.title) + '</div><div class="toolbar">' +
+            '<a href="javascript:;" class="btn_green" data-act="add">添加</a>' +
+            '<a href="javascript:;" class="btn" data-act="batch" data-action="down">停用</a>' +
+            '<a href="javascript:;" class="btn" data-act="batch" data-action="up">启用</a>' +
+            '<a href="javascript:;" class="btn" data-act="batch" data-action="del">删除</a>' +
+            '<span class="dropdown"><a href="javascript:;" class="btn" data-act="export-menu">导出</a>' +
+            '<ul class="drop_menu" hidden><li><a href="javascript:;" data-act="export" data-format="csv">CSV</a></li>' +
+            '<li><a href="javascript:;" data-act="export" data-format="txt">TXT</a></li></ul></span>' +
+            '<a href="javascript:;" class="btn" data-act="import">导入</a>' +
+            '<div class="search"><input type="text" class="search_inpt" name="searchText" placeholder="搜索"></div>' +
+            '</div><div class="table_box" id="table_box"></div>';
+        return loadRows();
+    }
+
+    function loadRows() {
+        var page = state.page;
+        var param = {TYPE: 'total,data', limit: (state.pageNo - 1) * PAGE_SIZE + ',' + PAGE_SIZE, ORDER_BY: '', ORDER: ''};
+        if (state.search) param.FINDS = state.search;
+        return call(page.func, 'show', param).then(function (res) {
+            if (state.page !== page || state.form) return;
+            var data = res.Data || {};
+            var ids = {};
+            state.rows = data.data || [];
+            state.total = data.total || 0;
+            if (!state.rows.length && state.total > 0 && state.pageNo > 1) {
+                // 删除后当前页已空，回到最后一页
+                state.pageNo = Math.ceil(state.total / PAGE_SIZE);
+                return loadRows();
+            }
+            state.rows.forEach(function (entry) { ids[entry.id] = true; });
+            Object.keys(state.selected).forEach(function (id) {
+                if (!ids[id]) delete state.selected[id];
+            });
+            renderTable();
+        });
+    }
+
+    function renderTable() {
+        var page = state.page;
+        var box = document.getElementById('table_box');
+        if (!box) return;
+        var allChecked = state.rows.length > 0 && state.rows.every(function (entry) { return state.selected[entry.id]; });
+        var html = '<table class="list_table"><tr>' + page.headers.map(function (header) {
+            return '<th>' + esc(header) + '</th>';
+        }).join('') + '<th class="chk_col"><input type="checkbox" class="chk_all"' + (allChecked ? ' checked' : '') + '></th></tr>';
+        state.rows.forEach(function (entry) {
+            var enabled = entry.enabled === 'yes';
+            html += '<tr data-id="' + entry.id + '">' + page.cells(entry).map(function (value) {
+                return '<td>' + esc(value) + '</td>';
+            }).join('') +
+                '<td class="ops"><a href="javascript:;" data-op="edit">编辑</a>' +
+                '<a href="javascript:;" data-op="' + (enabled ? 'down' : 'up') + '">' + (enabled ? '停用' : '启用') + '</a>' +
+                '<a href="javascript:;" data-op="del">删除</a></td>' +
+                '<td class="chk_col"><input type="checkbox" class="chk" data-id="' + entry.id + '"' +
+                (state.selected[entry.id] ? ' checked' : '') + '></td></tr>';
+        });
+        html += '</table>';
+        if (!state.rows.length) html += '<div class="empty_tip">暂无数据</div>';
+        html += '<div class="table_foot"><span class="el-pagination__total">共 ' + state.total + ' 条</span>' +
+            renderPager() + '</div>';
+        box.innerHTML = html;
+    }
+
+    function renderPager() {
+        var pages = Math.max(1, Math.ceil(state.total / PAGE_SIZE));
+        if (pages <= 1) return '';
+        var numbers = [1, state.pageNo - 1, state.pageNo, state.pageNo + 1, pages].filter(function (n, i, all) {
+            return n >= 1 && n <= pages && all.indexOf(n) === i;
+        }).sort(function (a, b) { return a - b; });
+        return '<div class="el-pagination">' +
+            '<button type="button" class="btn-prev" data-act="page" data-page="' + (state.pageNo - 1) + '"' +
+            (state.pageNo <= 1 ? ' disabled' : '') + '>上一页</button><ul class="el-pager">' +
+            numbers.map(function (n) {
+                return '<li class="number' + (n === state.pageNo ? ' active' : '') + '" data-act="page" data-page="' + n + '">' + n + '</li>';
+            }).join('') + '</ul>' +
+            '<button type="button" class="btn-next" data-act="page" data-page="' + (state.pageNo + 1) + '"' +
+            (state.pageNo >= pages ? ' disabled' : '') + '>下一页</button></div>';
+    }
+
+    function runAction(action, ids) {
+        return call(state.page.func, action, {id: ids.join(',')}).then(function (res) {
+            if (res.Result !== RESULT_CALL_OK) {
+                toast(res.ErrMsg || '操作失败', 'error');
+            } else {
+                toast('操作成功');
+            }
+            return loadRows();
+        });
+    }
+
+    function confirmBox(text, onConfirm) {
+        closeOverlays();
+        var wrap = document.createElement('div');
+        wrap.className = 'el-message-box__wrapper';
+        wrap.innerHTML = '<div class="el-message-box"><div class="el-message-box__header">提示</div>' +
+            '<div class="el-message-box__content">' + esc(text) + '</div><div class="el-message-box__btns">' +
+            '<button type="button" class="el-button" data-btn="cancel">取消</button>' +
+            '<button type="button" class="el-button el-button--primary" data-btn="ok">确定</button></div></div>';
+        wrap.addEventListener('click', function (event) {
+            var button = event.target.closest('[data-btn]');
+            if (!button) return;
+            wrap.remove();
+            if (button.dataset.btn === 'ok') onConfirm();
+        });
+        document.body.appendChild(wrap);
+    }
+
+    function selectedIds() {
+        return Object.keys(state.selected);
+    }
+
+    function batch(action) {
+        var ids = selectedIds();
+        if (!ids.length) {
+            toast('请先选择要操作的配置', 'warning');
+            return;
+        }
+        if (action === 'del') {
+            confirmBox('确定要删除选中的' + ids.length + '条配置吗？', function () { runAction('del', ids); });
+        } else {
+            runAction(action, ids);
+        }
+    }
+
+    function exportData(format) {
+        var page = state.page;
+        document.querySelector('.drop_menu').hidden = true;
+        call(page.func, 'EXPORT', {TYPE: 'data', format: format}).then(function (res) {
+            if (res.Result !== RESULT_CALL_OK) {
+                toast(res.ErrMsg || '导出失败', 'error');
+                return;
+            }
+            var link = document.createElement('a');
+            link.href = '/Action/download?filename=' + encodeURIComponent(res.Data.filename);
+            link.download = res.Data.filename;
+            link.style.display = 'none';
+            document.body.appendChild(link);
+            link.click();
+            link.remove();
+        });
+    }
+
+    function openImport() {
+        var page = state.page;
+        closeOverlays();
+        var wrap = document.createElement('div');
+        wrap.className = 'el-dialog__wrapper';
+        wrap.innerHTML = '<div class="el-dialog" role="dialog"><div class="el-dialog__header">' +
+            '<span class="el-dialog__title">导入配置</span></div><div class="el-dialog__body">' +
+            '<div class="type_file"><input type="file" name="file" accept=".csv,.txt"></div>' +
+            '<label class="checkbox"><input type="checkbox" name="append"> 合并到当前数据</label></div>' +
+            '<div class="el-dialog__footer"><button type="button" class="el-button" data-btn="cancel">取消</button>' +
+            '<button type="button" class="el-button el-button--primary" data-btn="ok">确定导入</button></div></div>';
+        wrap.addEventListener('click', function (event) {
+            var button = event.target.closest('[data-btn]');
+            if (!button) return;
+            if (button.dataset.btn === 'cancel') {
+                wrap.remove();
+                return;
+            }
+            var input = wrap.querySelector('input[type=file]');
+            var append = wrap.querySelector('input[name=append]').checked;
+            if (!input.files.length) {
+                toast('请选择导入文件', 'warning');
+                return;
+            }
+            var form = new FormData();
+            form.append('file', input.files[0]);
+            fetch('/Action/upload', {method: 'POST', credentials: 'same-origin', body: form}).then(function (response) {
+                return response.json();
+            }).then(function (res) {
+                if (res.Result !== RESULT_CALL_OK) throw new Error(res.ErrMsg || '上传失败');
+                return call(page.func, 'IMPORT', {filename: res.Data.filename, append: append ? 1 : 0});
+            }).then(function (res) {
+                if (res.Result !== RESULT_CALL_OK) throw new Error(res.ErrMsg || '导入失败');
+                toast('导入成功');
+            }).catch(function (error) {
+                toast(error.message, 'error');
+            }).then(function () {
+                wrap.remove();
+                if (state.page === page && !state.form) return loadRows();
+            });
+        });
+        document.body.appendChild(wrap);
+    }
+
+    // ------------------------------------------------------------------
+    // 添加/编辑表单
+    // ------------------------------------------------------------------
+
+    function openForm(entry) {
+        var page = state.page;
+        var main = document.getElementById('main');
+        state.form = {entry: entry || null, ext: parseExt(entry && entry.extend_ip), submitted: false};
+        main.innerHTML = '<div class="page_tit">' + esc(page.title) + ' / ' + (entry ? '编辑' : '添加') + '</div>' +
+            '<div class="form_box">' + page.formHtml(entry || {}) + '<div class="btn_btm">' +
+            '<button type="button" class="el-button el-button--primary" data-act="save">保存</button>' +
+            '<button type="button" class="el-button" data-act="cancel">取消</button></div></div>';
+        renderExt();
+    }
+
+    function renderExt() {
+        var body = document.getElementById('ext_body');
+        if (!body) return;
+        var html = '<tr><th>IP地址</th><th>备注</th><th>操作</th></tr>';
+        state.form.ext.forEach(function (item, index) {
+            if (item.editing) {
+                html += '<tr data-ext="' + index + '"><td colspan="2">' +
+                    '<input type="text" class="ext_ip" placeholder="扩展IP" value="' + esc(item.ip) + '">' +
+                    '<input type="text" class="ext_comment" placeholder="扩展IP备注" value="' + esc(item.comment) + '">' +
+                    (item.error ? '<p class="error_tip">' + esc(item.error) + '</p>' : '') + '</td>' +
+                    '<td><button type="button" class="btn btn_small" data-act="ext-ok">确定</button></td></tr>';
+            } else {
+                html += '<tr data-ext="' + index + '"><td>' + esc(item.ip) + '</td><td>' + esc(item.comment) + '</td>' +
+                    '<td><a href="javascript:;" data-act="ext-del">删除</a></td></tr>';
+            }
+        });
+        body.innerHTML = html;
+    }
+
+    function collectForm() {
+        var values = {};
+        document.querySelectorAll('.form_box [name]').forEach(function (el) {
+            values[el.name] = el.type === 'checkbox' ? el.checked : el.value.trim();
+        });
+        return values;
+    }
+
+    function showErrors(errors) {
+        document.querySelectorAll('.form_box .line_edit > p.error_tip, .form_box .line_show > p.error_tip').forEach(function (el) {
+            el.remove();
+        });
+        Object.keys(errors).forEach(function (name) {
+            var field = document.querySelector('.form_box [name="' + name + '"]');
+            var holder = field && field.closest('.line_edit, .line_show');
+            if (!holder) return;
+            var tip = document.createElement('p');
+            tip.className = 'error_tip';
+            tip.textContent = errors[name];
+            holder.appendChild(tip);
+        });
+    }
+
+    function saveForm() {
+        var page = state.page;
+        var form = state.form;
+        var values = collectForm();
+        var errors = page.validate(values);
+        form.submitted = true;
+        showErrors(errors);
+        if (Object.keys(errors).length) return;
+
+        var entry = page.toEntry(values);
+        var action = 'add';
+        if (form.entry) {
+            entry.id = form.entry.id;
+            entry.enabled = form.entry.enabled;
+            action = 'edit';
+        } else {
+            entry.enabled = 'yes';
+        }
+        call(page.func, action, entry).then(function (res) {
+            if (res.Result !== RESULT_CALL_OK) {
+                toast(res.ErrMsg || '保存失败', 'error');
+                return;
+            }
+            toast(action === 'add' ? '添加成功' : '保存成功');
+            if (state.form === form) renderList(page);
+        });
+    }
+
+    // ------------------------------------------------------------------
+    // 事件
+    // ------------------------------------------------------------------
+
+    function rowEntry(el) {
+        var tr = el.closest('tr[data-id]');
+        var id = tr && Number(tr.dataset.id);
+        return state.rows.filter(function (entry) { return entry.id === id; })[0];
+    }
+
+    function onMainClick(event) {
+        var target = event.target.closest('[data-act], [data-op]');
+        if (!target) return;
+        var act = target.dataset.act;
+        var op = target.dataset.op;
+
+        if (op) {
+            var entry = rowEntry(target);
+            if (!entry) return;
+            if (op === 'edit') openForm(entry);
+            if (op === 'up' || op === 'down') runAction(op, [entry.id]);
+            if (op === 'del') confirmBox('确定要删除该配置吗？', function () { runAction('del', [entry.id]); });
+            return;
+        }
+
+        if (act === 'add') openForm(null);
+        if (act === 'page') {
+            state.pageNo = Number(target.dataset.page);
+            loadRows();
+        }
+        if (act === 'batch') batch(target.dataset.action);
+        if (act === 'export-menu') {
+            var menu = target.parentNode.querySelector('.drop_menu');
+            menu.hidden = !menu.hidden;
+        }
+        if (act === 'export') exportData(target.dataset.format);
+        if (act === 'import') openImport();
+        if (act === 'save') saveForm();
+        if (act === 'cancel') renderList(state.page);
+        if (act === 'ext-add') {
+            state.form.ext.push({ip: '', comment: '', editing: true});
+            renderExt();
+        }
+        if (act === 'ext-ok' || act === 'ext-del') {
+            var index = Number(target.closest('tr[data-ext]').dataset.ext);
+            var item = state.form.ext[index];
+            if (act === 'ext-del') {
+                state.form.ext.splice(index, 1);
+            } else if (!IP_RE.test(item.ip)) {
+                item.error = '扩展IP格式错误';
+            } else {
+                item.error = '';
+                item.editing = false;
+            }
+            renderExt();
+        }
+    }
+
+    function onMainChange(event) {
+        var el = event.target;
+        if (el.classList.contains('chk_all')) {
+            state.selected = {};
+            if (el.checked) state.rows.forEach(function (entry) { state.selected[entry.id] = true; });
+            document.querySelectorAll('input.chk').forEach(function (chk) { chk.checked = el.checked; });
+        } else if (el.classList.contains('chk')) {
+            if (el.checked) {
+                state.selected[el.dataset.id] = true;
+            } else {
+                delete state.selected[el.dataset.id];
+            }
+            document.querySelector('input.chk_all').checked = state.rows.length > 0 &&
+                state.rows.every(function (entry) { return state.selected[entry.id]; });
+        } else if (el.name === 'timing_rst_switch') {
+            document.querySelector('.timing_box').hidden = !el.checked;
+        }
+    }
+
+    function onMainInput(event) {
+        var el = event.target;
+        var row = el.closest('tr[data-ext]');
+        if (row && state.form) {
+            var item = state.form.ext[Number(row.dataset.ext)];
+            item[el.classList.contains('ext_ip') ? 'ip' : 'comment'] = el.value.trim();
+            return;
+        }
+        if (state.form && state.form.submitted && el.name) {
+            showErrors(state.page.validate(collectForm()));
+        }
+    }
+
+    function onMainKeydown(event) {
+        if (event.key === 'Enter' && event.target.classList.contains('search_inpt')) {
+            state.search = event.target.value.trim();
+            state.pageNo = 1;
+            loadRows();
+        }
+    }
+
+    window.addEventListener('hashchange', render);
+
+    post('/Action/call', {func_name: 'sysstat', action: 'show', param: {}}).then(function (res) {
+        state.loggedIn = res.Result === RESULT_CALL_OK;
+    }).catch(function () {
+        state.loggedIn = false;
+    }).then(render);
+})();
+"""
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='iKuai路由器本地模拟器')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='监听端口 (默认: 8080)')
+    parser.add_argument('--username', default='admin', help='登录用户名 (默认: admin)')
+    parser.add_argument('--password', default='admin123', help='登录密码 (默认: admin123)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='每个/Action/*请求的固定延迟，毫秒 (默认: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='在固定延迟上叠加的随机延迟上限，毫秒 (默认: 0)')
+    parser.add_argument('--entries', type=int, default=0,
+                        help='每个配置表预置的数据条数 (默认: 0)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'列表页每页条数，0表示不分页 (默认: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--verbose', action='store_true', help='打印每个HTTP请求')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    simulator = RouterSimulator(args.host, args.port, args.username, args.password,
+                                latency_ms=args.latency, jitter_ms=args.jitter,
+                                entries=args.entries, verbose=args.verbose, page_size=args.page_size)
+    print(f"🚀 路由器模拟器已启动: {simulator.router_url}")
+    print(f"🔑 登录账号: {args.username} / {'*' * len(args.password)}")
+    if args.latency or args.jitter:
+        print(f"⏱️  接口延迟: {args.latency:.0f}ms + 随机0~{args.jitter:.0f}ms")
+    if args.entries:
+        print(f"📦 每个配置表预置 {args.entries} 条数据")
+    host, port = simulator.httpd.server_address[:2]
+    print(f"💡 运行测试: python modules/vlan_module.py --router-ip {host}:{port}")
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 模拟器已停止")
+    finally:
+        simulator.httpd.server_close()
@@ -1,10 +1,947 @@
 # -*- coding: utf-8 -*-
-from playwright.sync_api import sync_playwright, expect, Page
-import time, os, json, re
+from playwright.sync_api import sync_playwright, expect, Page, Locator
+import time, os, json, re, hashlib, functools, inspect, uuid, csv, shlex, socket, shutil, tempfile
+from contextlib import contextmanager
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Tuple
-import requests
+from typing import Dict, List, Optional, Any, Tuple, Callable, Union
 from urllib.parse import parse_qs, urlparse
+from router_api import RouterApiClient, RouterApiError, base_url_from_router_url
+
+try:
+    import psutil  # 可选：浏览器池按内存阈值回收时使用
+except ImportError:
+    psutil = None
+
+# 表头/占位文本，统计数据行时需要排除
+TABLE_HEADER_WORDS = ["拨号名称", "隧道名称", "配置名称", "vlanID", "VLAN ID", ""]
+
+# 表格无数据时的提示文本
+EMPTY_TABLE_WORDS = ["暂无数据", "没有找到"]
+
+# 选择器学习缓存默认文件
+DEFAULT_SELECTOR_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "selector_cache.json")
+
+# 登录态（storage state）默认保存目录
+DEFAULT_SESSION_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sessions")
+
+# 静态资源（JS/CSS）本地缓存目录
+DEFAULT_STATIC_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".static_cache")
+
+# 步骤事件流（JSON Lines）输出文件的环境变量
+EVENTS_ENV_VAR = "ROUTER_TEST_EVENTS"
+
+# 命名空间（配置名称/备注前缀）的环境变量，多个模块同时测试一台路由器时用来隔离数据
+NAMESPACE_ENV_VAR = "ROUTER_TEST_NAMESPACE"
+
+# 表单保存按钮（触发表单校验）
+FORM_SAVE_SELECTORS = [
+    'button:has-text("保存"):visible:enabled',
+    'input[value="保存"]:visible:enabled',
+    'a:has-text("保存"):visible'
+]
+
+# 弹窗选择器（确认框、导入框等）
+MODAL_SELECTORS = 'div.el-message-box, .confirm-dialog, .modal, [role="dialog"]'
+
+# 统计表格数据行数（一次evaluate完成）
+_DATA_ROW_COUNT_JS = """
+([headerWords, emptyWords]) => {
+    let count = 0;
+    document.querySelectorAll('table tr').forEach(tr => {
+        const cell = tr.querySelector('td');
+        if (!cell) return;
+        const text = (cell.textContent || '').trim();
+        const rowText = tr.textContent || '';
+        if (emptyWords.some(word => rowText.includes(word))) return;
+        if (text && !headerWords.includes(text)) count += 1;
+    });
+    return count;
+}
+"""
+
+# 表格快照：表头文本 + 所有含td的行（一次evaluate完成）
+_TABLE_SNAPSHOT_JS = """
+(selector) => {
+    const table = document.querySelector(selector);
+    if (!table) return null;
+    const clean = el => (el.textContent || '').trim();
+    const allRows = Array.from(table.querySelectorAll('tr'));
+    const headerRow = table.querySelector('thead tr') || allRows.find(tr => tr.querySelector('th'));
+    const headers = headerRow ? Array.from(headerRow.querySelectorAll('th, td')).map(clean) : [];
+    const rows = [];
+    allRows.forEach(tr => {
+        if (tr === headerRow) return;
+        const cells = Array.from(tr.querySelectorAll('td'));
+        if (!cells.length) return;
+        rows.push({cells: cells.map(clean), text: clean(tr)});
+    });
+    return {headers, rows};
+}
+"""
+
+# 分页信息：总条数（"共 N 条"）、当前页码、是否还有下一页；页面没有分页控件时total/page为null
+_TABLE_PAGER_JS = """
+() => {
+    const pager = document.querySelector('.el-pagination, .pagination, .page_box, .pager');
+    const totalEl = document.querySelector('.el-pagination__total, .table_foot, .page_total') || pager;
+    const match = totalEl ? (totalEl.textContent || '').match(/共\\s*(\\d+)\\s*条/) : null;
+    const active = pager ? pager.querySelector('li.active, .active, .current') : null;
+    const next = pager ? pager.querySelector('.btn-next, .next') : null;
+    const hasNext = !!next && !next.disabled && !next.classList.contains('disabled') &&
+        !(next.parentElement && next.parentElement.classList.contains('disabled'));
+    return {
+        total: match ? Number(match[1]) : null,
+        page: active ? (Number((active.textContent || '').trim()) || null) : null,
+        hasNext: hasNext
+    };
+}
+"""
+
+# 分页控件：下一页 / 第一页
+NEXT_PAGE_SELECTORS = [
+    '.el-pagination button.btn-next',
+    '.pagination .next a',
+    'button:has-text("下一页")',
+    'a:has-text("下一页")'
+]
+FIRST_PAGE_SELECTORS = [
+    '.el-pager li.number >> nth=0',
+    '.pagination li:not(.prev) a >> nth=0',
+    'a:has-text("首页")',
+    'button:has-text("首页")'
+]
+
+# 判断选择器对应的元素是否有可见的
+_ANY_VISIBLE_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).some(el => {
+    const style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' && el.getClientRects().length > 0;
+})
+"""
+
+# DOM静默检测：首次调用时安装MutationObserver，记录最后一次变更时间
+_DOM_QUIET_JS = """
+(quietMs) => {
+    if (!window.__ikWaitObserver) {
+        window.__ikLastMutation = performance.now();
+        window.__ikWaitObserver = new MutationObserver(() => { window.__ikLastMutation = performance.now(); });
+        window.__ikWaitObserver.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+    return performance.now() - window.__ikLastMutation >= quietMs;
+}
+"""
+
+# 表单字段定位（_FORM_FILL_JS和_FORM_ERRORS_JS共用）：先按声明的选择器，再按表单行的标签文本
+_FORM_LOCATE_JS = """
+    const visible = el => el.getClientRects().length > 0 && window.getComputedStyle(el).visibility !== 'hidden';
+    const bare = text => (text || '').replace(/[：:\\s]/g, '');
+    const holderOf = el => el.closest('.line_edit, .line_show, .el-form-item');
+    const byLabel = label => {
+        for (const row of document.querySelectorAll('.line_edit, .line_show, .el-form-item')) {
+            const title = row.querySelector('.input_tit, .el-form-item__label, label');
+            if (!title || bare(title.textContent) !== bare(label)) continue;
+            const el = Array.from(row.querySelectorAll('input:not([type=hidden]), select, textarea')).find(visible);
+            if (el) return el;
+        }
+        return null;
+    };
+    const locate = field => {
+        for (const selector of field.selectors) {
+            let matches;
+            try { matches = document.querySelectorAll(selector); } catch (e) { continue; }
+            const el = Array.from(matches).find(visible);
+            if (el) return [el, selector];
+        }
+        return [byLabel(field.label), null];
+    };
+"""
+
+# 表单批量填写：按字段声明定位元素，用原生setter写值并派发input/change/blur（Vue的v-model和校验都能收到），
+# 等一帧后回读每个字段的值和旁边的错误提示，一次evaluate完成
+_FORM_FILL_JS = """
+async (fields) => {""" + _FORM_LOCATE_JS + """
+    const setters = {
+        INPUT: Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set,
+        TEXTAREA: Object.getOwnPropertyDescriptor(HTMLTextAreaElement.prototype, 'value').set,
+        SELECT: Object.getOwnPropertyDescriptor(HTMLSelectElement.prototype, 'value').set
+    };
+    const fire = (el, type) => el.dispatchEvent(new Event(type, {bubbles: true}));
+
+    const located = fields.map(field => {
+        const [el, selector] = locate(field);
+        const result = {label: field.label, found: !!el, selector: selector, ok: false, actual: null, error: null};
+        if (!el) return [el, field, result];
+        if (el.disabled || el.readOnly) {
+            result.error = '字段不可编辑';
+        } else if (field.kind === 'checkbox') {
+            if (el.checked !== !!field.value) el.click();
+        } else if (field.kind === 'select' && !Array.from(el.options).some(o => o.value === String(field.value))) {
+            result.error = '没有该选项';
+        } else if (setters[el.tagName]) {
+            el.focus();
+            setters[el.tagName].call(el, String(field.value));
+            fire(el, 'input');
+            fire(el, 'change');
+            el.blur();
+        } else {
+            result.error = '不支持的元素: ' + el.tagName;
+        }
+        return [el, field, result];
+    });
+
+    // 等Vue完成一次渲染和校验后回读（后台标签页不触发requestAnimationFrame，用定时器兜底）
+    await new Promise(resolve => { requestAnimationFrame(() => setTimeout(resolve, 0)); setTimeout(resolve, 50); });
+
+    return located.map(([el, field, result]) => {
+        if (!el) return result;
+        result.actual = field.kind === 'checkbox' ? el.checked : el.value;
+        result.ok = !result.error && (field.kind === 'checkbox' ? el.checked === !!field.value : el.value === String(field.value));
+        const holder = holderOf(el);
+        const tip = holder && Array.from(holder.querySelectorAll('.error_tip, .el-form-item__error, .is-danger')).find(visible);
+        if (tip) result.message = (tip.textContent || '').trim();
+        return result;
+    });
+}
+"""
+
+# 表单错误提示：一次读取所有可见的错误提示，按所在表单行归属到字段；不在任何字段行内的提示单独返回
+_FORM_ERRORS_JS = """
+(fields) => {""" + _FORM_LOCATE_JS + """
+    const owners = fields.map(field => {
+        const [el] = locate(field);
+        return [field.label, el ? holderOf(el) : null];
+    });
+    const result = {fields: {}, unattributed: []};
+    fields.forEach(field => { result.fields[field.label] = null; });
+    document.querySelectorAll('p.error_tip, .error_tip, .el-form-item__error').forEach(tip => {
+        const text = (tip.textContent || '').trim();
+        if (!text || !visible(tip)) return;
+        const holder = holderOf(tip);
+        const owner = holder && owners.find(([, fieldHolder]) => fieldHolder === holder);
+        if (!owner) {
+            result.unattributed.push(text);
+        } else if (result.fields[owner[0]] === null) {
+            result.fields[owner[0]] = text;
+        }
+    });
+    return result;
+}
+"""
+
+class RoundTripCounter:
+    """浏览器往返次数计数 - 每个测试模块一个实例
+
+    只在框架自己的调用点计数（WaitEngine的轮询/evaluate/wait_for、find_element、
+    表格快照），模块里直接调用的page API不计入。不修改Playwright内部实现，
+    并行模块（浏览器池、工作进程）之间互不影响。
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, n: int = 1):
+        self.count += n
+
+class WaitEngine:
+    """条件等待引擎 - 条件满足立即返回，替代固定的time.sleep
+
+    每次等待都可以传入legacy_sleep（原来固定等待的秒数），
+    用于统计相比旧的固定等待节省了多少时间。
+    """
+
+    def __init__(self, page: Page, default_timeout: float = 10.0, poll_interval: float = 0.1,
+                 round_trips: RoundTripCounter = None):
+        self.page = page
+        self.round_trips = round_trips or RoundTripCounter()
+        self.default_timeout = default_timeout
+        self.poll_interval = poll_interval
+        self.action_call_count = 0
+        self.legacy_total = 0.0
+        self.actual_total = 0.0
+        self.wait_count = 0
+        self.timeout_count = 0
+        self.records: Dict[str, List[float]] = {}
+        page.on("response", self._on_response)
+
+    def close(self):
+        """移除页面上的响应监听（页面在上下文之间复用或模块结束时调用）"""
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+
+    def _on_response(self, response):
+        """记录/Action/call响应次数"""
+        if "/Action/call" in response.url:
+            self.action_call_count += 1
+
+    def _record(self, description: str, legacy_sleep: float, elapsed: float, satisfied: bool):
+        """记录一次等待的耗时"""
+        self.wait_count += 1
+        self.legacy_total += legacy_sleep
+        self.actual_total += elapsed
+        if not satisfied:
+            self.timeout_count += 1
+        stats = self.records.setdefault(description or "等待", [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += legacy_sleep
+        stats[2] += elapsed
+
+    def until(self, condition: Callable[[], bool], timeout: float = None,
+              legacy_sleep: float = 0.0, description: str = "") -> bool:
+        """轮询条件直到满足或超时
+
+        轮询间隔使用page.wait_for_timeout，保证同步API下页面事件能被及时分发。
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        satisfied = False
+        while True:
+            # 条件里没有经过计数的调用（如直接判断locator）时按一次往返计
+            before = self.round_trips.count
+            try:
+                satisfied = bool(condition())
+            except Exception:
+                satisfied = False
+            if self.round_trips.count == before:
+                self.round_trips.add()
+            if satisfied or time.perf_counter() - start >= timeout:
+                break
+            self.round_trips.add()
+            self.page.wait_for_timeout(self.poll_interval * 1000)
+        self._record(description, legacy_sleep, time.perf_counter() - start, satisfied)
+        return satisfied
+
+    def pause(self, seconds: float, description: str = "固定等待", legacy_sleep: float = None):
+        """无法用条件替代的固定等待（同样计入统计），legacy_sleep默认与seconds相同"""
+        self.round_trips.add()
+        self.page.wait_for_timeout(seconds * 1000)
+        self._record(description, seconds if legacy_sleep is None else legacy_sleep, seconds, True)
+
+    def mark(self) -> int:
+        """记录当前/Action/call响应计数，配合for_action_call使用"""
+        return self.action_call_count
+
+    def has_action_call_since(self, marker: int) -> bool:
+        """自marker以来是否收到了新的/Action/call响应"""
+        return self.action_call_count > marker
+
+    def for_action_call(self, marker: int, timeout: float = None, legacy_sleep: float = 0.0,
+                        description: str = "/Action/call响应") -> bool:
+        """等待marker之后的/Action/call响应"""
+        return self.until(lambda: self.has_action_call_since(marker), timeout, legacy_sleep, description)
+
+    def row_count(self) -> int:
+        """当前表格数据行数"""
+        self.round_trips.add()
+        return self.page.evaluate(_DATA_ROW_COUNT_JS, [TABLE_HEADER_WORDS, EMPTY_TABLE_WORDS])
+
+    def for_row_count_change(self, previous: int, timeout: float = None, legacy_sleep: float = 0.0,
+                             description: str = "表格行数变化") -> bool:
+        """等待表格数据行数与previous不同"""
+        return self.until(lambda: self.row_count() != previous, timeout, legacy_sleep, description)
+
+    def for_row_count(self, expected: int, timeout: float = None, legacy_sleep: float = 0.0,
+                      description: str = "表格行数达到预期") -> bool:
+        """等待表格数据行数等于expected"""
+        return self.until(lambda: self.row_count() == expected, timeout, legacy_sleep, description)
+
+    def is_visible(self, selector: str) -> bool:
+        """一次evaluate判断选择器是否有可见元素（仅支持CSS选择器）"""
+        self.round_trips.add()
+        return self.page.evaluate(_ANY_VISIBLE_JS, selector)
+
+    def for_visible(self, selector: str, timeout: float = None, legacy_sleep: float = 0.0,
+                    description: str = "元素出现") -> bool:
+        """等待Playwright选择器匹配到的第一个元素可见"""
+        timeout = self.default_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        self.round_trips.add()
+        try:
+            self.page.locator(selector).first.wait_for(state="visible", timeout=timeout * 1000)
+            satisfied = True
+        except Exception:
+            satisfied = False
+        self._record(description, legacy_sleep, time.perf_counter() - start, satisfied)
+        return satisfied
+
+    def for_modal(self, timeout: float = None, legacy_sleep: float = 0.0,
+                  description: str = "弹窗出现") -> bool:
+        """等待确认弹窗出现"""
+        return self.until(lambda: self.is_visible(MODAL_SELECTORS), timeout, legacy_sleep, description)
+
+    def for_modal_gone(self, timeout: float = None, legacy_sleep: float = 0.0,
+                       description: str = "弹窗消失") -> bool:
+        """等待所有弹窗消失"""
+        return self.until(lambda: not self.is_visible(MODAL_SELECTORS), timeout, legacy_sleep, description)
+
+    def for_dom_quiet(self, quiet_ms: int = 300, timeout: float = None, legacy_sleep: float = 0.0,
+                      description: str = "DOM静默") -> bool:
+        """等待DOM在quiet_ms毫秒内没有任何变更"""
+        timeout = self.default_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        self.round_trips.add()
+        try:
+            self.page.wait_for_function(_DOM_QUIET_JS, arg=quiet_ms, timeout=timeout * 1000, polling=50)
+            satisfied = True
+        except Exception:
+            satisfied = False
+        self._record(description, legacy_sleep, time.perf_counter() - start, satisfied)
+        return satisfied
+
+    def saved_seconds(self) -> float:
+        """相比旧的固定等待节省的秒数"""
+        return self.legacy_total - self.actual_total
+
+    def report(self):
+        """打印等待统计"""
+        print(f"\n⏱️ 等待统计: 共{self.wait_count}次等待，超时{self.timeout_count}次")
+        print(f"   旧固定等待合计: {self.legacy_total:.1f}s")
+        print(f"   实际等待合计: {self.actual_total:.1f}s")
+        print(f"   节省时间: {self.saved_seconds():.1f}s")
+        top = sorted(self.records.items(), key=lambda item: item[1][1] - item[1][2], reverse=True)[:5]
+        for description, (count, legacy, actual) in top:
+            print(f"   - {description}: {count}次, 旧{legacy:.1f}s -> 实际{actual:.1f}s")
+
+class SelectorCache:
+    """选择器学习缓存 - 记录每个逻辑元素命中的选择器，下次优先尝试
+
+    缓存键为 固件版本|页面路由|逻辑名称，持久化到JSON文件，
+    命中的选择器失效时由调用方回退完整列表并重新学习。
+    """
+
+    _instances: Dict[str, "SelectorCache"] = {}
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        self.entries: Dict[str, str] = {}
+        # 本进程学习(选择器)/移除(None)的键，保存时合并到磁盘上的最新内容
+        self.changes: Dict[str, Optional[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.relearned = 0
+        self.entries = self._read_entries()
+
+    def _read_entries(self) -> Dict[str, str]:
+        """读取磁盘上的缓存内容"""
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  读取选择器缓存失败，将重新学习: {e}")
+            return {}
+
+    @classmethod
+    def load(cls, cache_file: str) -> "SelectorCache":
+        """同一缓存文件在进程内共享一个实例"""
+        path = os.path.abspath(cache_file)
+        if path not in cls._instances:
+            cls._instances[path] = cls(path)
+        return cls._instances[path]
+
+    @staticmethod
+    def make_key(firmware: str, route: str, name: str) -> str:
+        """生成缓存键"""
+        return f"{firmware or 'unknown'}|{route or '/'}|{name}"
+
+    def get(self, key: str) -> Optional[str]:
+        """获取上次命中的选择器"""
+        return self.entries.get(key)
+
+    def learn(self, key: str, selector: str):
+        """记录命中的选择器并落盘"""
+        if self.entries.get(key) == selector:
+            return
+        if key in self.entries:
+            self.relearned += 1
+        self.entries[key] = selector
+        self.changes[key] = selector
+        self.save()
+
+    def forget(self, key: str):
+        """命中的选择器失效时移除"""
+        if self.entries.pop(key, None) is not None:
+            self.changes[key] = None
+            self.save()
+
+    def save(self):
+        """原子写入缓存文件
+
+        多个进程（fleet_runner、工作进程池、GUI并行模式）共用一个缓存文件：
+        先读取磁盘上的最新内容，只把本进程的改动合并进去，临时文件按进程区分。
+        """
+        try:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            merged = self._read_entries()
+            for key, selector in self.changes.items():
+                if selector is None:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = selector
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(temp_file, self.cache_file)
+            self.entries = merged
+            self.changes = {}
+        except Exception as e:
+            print(f"⚠️  保存选择器缓存失败: {e}")
+
+    def report(self):
+        """打印缓存命中统计"""
+        total = self.hits + self.misses
+        if total == 0:
+            return
+        print(f"\n🎯 选择器缓存: 命中 {self.hits}/{total}, 回退 {self.misses}, 重新学习 {self.relearned}")
+
+class TableRow:
+    """表格行快照，支持按表头名称或列序号取值"""
+
+    def __init__(self, table: "RouterTable", index: int, cells: List[str], text: str):
+        self.table = table
+        self.index = index
+        self.cells = cells
+        self.text = text
+
+    @property
+    def key(self) -> str:
+        """首列内容（名称/vlanID），用于识别数据行"""
+        return self.cells[0] if self.cells else ""
+
+    def get(self, column, default: str = "") -> str:
+        """按表头名称（精确或包含匹配）或列序号取单元格文本"""
+        index = column if isinstance(column, int) else self.table.column_index(column)
+        if 0 <= index < len(self.cells):
+            return self.cells[index]
+        return default
+
+    def get_int(self, column, default: Optional[int] = None) -> Optional[int]:
+        """取单元格中的整数"""
+        match = re.search(r'-?\d+', self.get(column))
+        return int(match.group()) if match else default
+
+    def get_ip(self, column) -> Optional[str]:
+        """取单元格中的IPv4地址，没有则返回None"""
+        match = re.search(r'\d{1,3}(?:\.\d{1,3}){3}', self.get(column))
+        return match.group() if match else None
+
+    def as_dict(self) -> Dict[str, str]:
+        """以表头为键的记录"""
+        headers = self.table.headers
+        return {(headers[i] if i < len(headers) and headers[i] else f"列{i + 1}"): cell
+                for i, cell in enumerate(self.cells)}
+
+    def __getitem__(self, column) -> str:
+        return self.get(column)
+
+    def __repr__(self):
+        return f"TableRow({self.index}, {self.cells!r})"
+
+class RouterTable:
+    """表格快照 - 一次evaluate读取整张表，替代逐行逐格的text_content调用"""
+
+    def __init__(self, headers: List[str], raw_rows: List[Dict[str, Any]], found: bool = True):
+        self.headers = headers
+        self.found = found
+        self.rows = [TableRow(self, i, raw["cells"], raw["text"]) for i, raw in enumerate(raw_rows)]
+        self.data_rows = [row for row in self.rows if self._is_data_row(row)]
+
+    @staticmethod
+    def _is_data_row(row: TableRow) -> bool:
+        """排除表头行、空行和"暂无数据"等提示行"""
+        if not row.key or row.key in TABLE_HEADER_WORDS:
+            return False
+        return not any(word in row.text for word in EMPTY_TABLE_WORDS)
+
+    @classmethod
+    def snapshot(cls, page: Page, selector: str = 'table') -> "RouterTable":
+        """读取页面上第一个匹配selector的表格"""
+        return cls.from_snapshot(page.evaluate(_TABLE_SNAPSHOT_JS, selector))
+
+    @classmethod
+    def from_snapshot(cls, result: Optional[Dict[str, Any]]) -> "RouterTable":
+        """由_TABLE_SNAPSHOT_JS的返回值构造（同步/异步API共用）"""
+        if not result:
+            return cls([], [], found=False)
+        return cls(result["headers"], result["rows"])
+
+    def column_index(self, name: str) -> int:
+        """按表头名称查找列序号，先精确匹配再包含匹配，找不到返回-1"""
+        if name in self.headers:
+            return self.headers.index(name)
+        for i, header in enumerate(self.headers):
+            if header and name in header:
+                return i
+        return -1
+
+    def column(self, name) -> List[str]:
+        """取某一列所有数据行的值"""
+        return [row.get(name) for row in self.data_rows]
+
+    def find(self, column, value: str) -> Optional[TableRow]:
+        """查找某列等于value的第一条数据行"""
+        for row in self.data_rows:
+            if row.get(column) == value:
+                return row
+        return None
+
+    def containing(self, text: str, case_sensitive: bool = False) -> List[TableRow]:
+        """整行文本包含text的数据行"""
+        if case_sensitive:
+            return [row for row in self.data_rows if text in row.text]
+        text = text.lower()
+        return [row for row in self.data_rows if text in row.text.lower()]
+
+    def records(self) -> List[Dict[str, str]]:
+        """所有数据行的表头键记录"""
+        return [row.as_dict() for row in self.data_rows]
+
+    def __len__(self):
+        return len(self.data_rows)
+
+    def __iter__(self):
+        return iter(self.data_rows)
+
+class FormField:
+    """表单字段声明：标签、候选CSS选择器、取值键和类型（text/select/checkbox）
+
+    选择器都找不到时按标签文本（"备注："等）在表单行中定位。
+    """
+
+    KINDS = ("text", "select", "checkbox")
+
+    def __init__(self, label: str, selectors: List[str], key: str, kind: str = "text", required: bool = True):
+        if kind not in self.KINDS:
+            raise ValueError(f"不支持的字段类型: {kind}")
+        self.label = label
+        self.selectors = list(selectors)
+        self.key = key
+        self.kind = kind
+        self.required = required
+
+    @property
+    def fallback_selectors(self) -> List[str]:
+        """逐个填写时使用的Playwright选择器（声明的选择器 + 按标签定位）"""
+        tag = "select" if self.kind == "select" else "input"
+        return self.selectors + [
+            f'div.line_edit:has(div.input_tit:has-text("{self.label}")) {tag}',
+            f'{tag}[data-vv-as="{self.label}"]',
+            f'{tag}[placeholder*="{self.label}"]',
+        ]
+
+    def __repr__(self):
+        return f"FormField({self.label!r}, key={self.key!r}, kind={self.kind!r})"
+
+class FormSchema:
+    """表单声明 - 按顺序列出字段，由FormOperationsMixin.fill_form一次evaluate填写并回读"""
+
+    def __init__(self, name: str, fields: List[FormField]):
+        self.name = name
+        self.fields = list(fields)
+
+    def bind(self, values: Dict[str, Any]) -> List[Tuple[FormField, Any]]:
+        """取出values中有值的字段（缺少的键跳过）"""
+        return [(field, values[field.key]) for field in self.fields if values.get(field.key) is not None]
+
+    def __iter__(self):
+        return iter(self.fields)
+
+class SessionStore:
+    """登录态存储 - 按 路由器地址+用户名+密码 保存Playwright storage state
+
+    文件名是三者的哈希，不含明文密码；写入先落临时文件再原子替换，
+    多个子进程同时读写也不会读到半个文件。
+    """
+
+    def __init__(self, state_dir: str = DEFAULT_SESSION_STATE_DIR):
+        self.state_dir = state_dir
+
+    def path_for(self, config) -> str:
+        """配置对应的登录态文件路径"""
+        host = urlparse(config.router_url).netloc or config.router_url
+        digest = hashlib.sha256(f"{host}|{config.username}|{config.password}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.state_dir, f"session_{digest}.json")
+
+    def load(self, config) -> Optional[str]:
+        """返回已保存的登录态文件路径，不存在则返回None"""
+        path = self.path_for(config)
+        return path if os.path.exists(path) else None
+
+    def save(self, context, config) -> Optional[str]:
+        """保存浏览器上下文的登录态"""
+        path = self.path_for(config)
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            context.storage_state(path=temp_file)
+            os.replace(temp_file, path)
+            return path
+        except Exception as e:
+            print(f"⚠️  保存登录态失败: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            return None
+
+    def discard(self, config):
+        """删除失效的登录态"""
+        path = self.path_for(config)
+        if os.path.exists(path):
+            os.remove(path)
+
+class RoutingProfile:
+    """请求路由配置 - 拦截图片/字体/统计脚本，静态JS/CSS走本地磁盘缓存
+
+    缓存按 路由器地址+固件版本 分目录，跨运行复用；每次页面加载打印节省的流量和时间。
+    缓存的JS/CSS每次用ETag/Last-Modified向路由器条件请求验证，固件升级后不会用到旧文件。
+    拦截的资源第一次出现时放行一次，记下大小和耗时，之后拦截时按此计算节省量。
+    """
+
+    BLOCK_TYPES = ("image", "font", "media")
+    BLOCK_PATTERNS = ("google-analytics", "googletagmanager", "hm.baidu.com", "cnzz.com", "/analytics", "/stat.js")
+    CACHE_TYPES = ("script", "stylesheet")
+
+    def __init__(self, cache_dir: str, block: bool = True, cache_static: bool = True):
+        self.cache_dir = cache_dir
+        self.block = block
+        self.cache_static = cache_static
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except Exception:
+                self.index = {}
+        self.index_dirty = False
+        self.load_count = 0
+        self.totals = {"blocked": 0, "hits": 0, "bytes": 0, "ms": 0.0}
+        self.current = dict(self.totals)
+
+    @classmethod
+    def from_config(cls, config) -> Optional["RoutingProfile"]:
+        """按配置创建，两项都关闭时返回None"""
+        block = getattr(config, "block_resources", False)
+        cache_static = getattr(config, "cache_static", False)
+        if not block and not cache_static:
+            return None
+        host = urlparse(config.router_url).netloc.replace(':', '_') or "router"
+        firmware = getattr(config, "firmware", "") or "unknown"
+        cache_dir = os.path.join(getattr(config, "static_cache_dir", DEFAULT_STATIC_CACHE_DIR), host, firmware)
+        return cls(cache_dir, block=block, cache_static=cache_static)
+
+    def attach(self, context):
+        """挂到浏览器上下文：拦截所有请求，并统计每次页面加载"""
+        context.route("**/*", self._handle_route)
+        context.on("page", lambda page: page.on("load", lambda _: self._on_load()))
+
+    def _count(self, key: str, value=1):
+        self.totals[key] += value
+        self.current[key] += value
+
+    def _handle_route(self, route, request):
+        """路由处理：拦截、命中缓存或放行"""
+        url = request.url
+        resource_type = request.resource_type
+        try:
+            if self.block and (resource_type in self.BLOCK_TYPES or any(p in url for p in self.BLOCK_PATTERNS)):
+                known = self.index.get(url)
+                if known is None:
+                    # 第一次出现：放行并记录大小，之后拦截时才有节省量可算
+                    self._fetch_and_store(route, request, store_body=False)
+                    return
+                self._count("blocked")
+                self._count("bytes", known.get("size", 0))
+                self._count("ms", known.get("ms", 0.0))
+                route.abort()
+                return
+
+            if self.cache_static and resource_type in self.CACHE_TYPES and request.method == "GET":
+                entry = self.index.get(url)
+                cached_file = os.path.join(self.cache_dir, entry["file"]) if entry and entry.get("file") else None
+                if cached_file and os.path.exists(cached_file) and self._revalidate(route, request, entry):
+                    route.fulfill(path=cached_file, status=200,
+                                  headers={"content-type": entry.get("content_type", "application/octet-stream")})
+                    return
+                self._fetch_and_store(route, request)
+                return
+
+            route.continue_()
+        except Exception:
+            # 页面关闭等情况下路由可能已失效，尽量放行
+            try:
+                route.continue_()
+            except Exception:
+                pass
+
+    def _revalidate(self, route, request, entry: Dict[str, Any]) -> bool:
+        """向路由器条件请求验证缓存，返回304时可以直接用缓存文件
+
+        没有ETag/Last-Modified的条目无法验证，按未命中处理重新下载。
+        """
+        validators = {}
+        if entry.get("etag"):
+            validators["if-none-match"] = entry["etag"]
+        if entry.get("last_modified"):
+            validators["if-modified-since"] = entry["last_modified"]
+        if not validators:
+            return False
+        start = time.perf_counter()
+        response = route.fetch(headers=dict(request.headers, **validators))
+        if response.status != 304:
+            return False
+        self._count("hits")
+        self._count("bytes", entry["size"])
+        self._count("ms", max(entry["ms"] - (time.perf_counter() - start) * 1000, 0.0))
+        return True
+
+    def _fetch_and_store(self, route, request, store_body: bool = True):
+        """实际下载：记录大小和耗时；store_body时把内容和验证头写入缓存"""
+        url = request.url
+        start = time.perf_counter()
+        response = route.fetch()
+        body = response.body()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if response.ok:
+            entry = {"size": len(body), "ms": round(elapsed_ms, 1)}
+            if store_body:
+                file_name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temp_file = os.path.join(self.cache_dir, f"{file_name}.{os.getpid()}.tmp")
+                with open(temp_file, 'wb') as f:
+                    f.write(body)
+                os.replace(temp_file, os.path.join(self.cache_dir, file_name))
+                headers = response.headers
+                entry.update({
+                    "file": file_name,
+                    "content_type": headers.get("content-type", "application/octet-stream"),
+                    "etag": headers.get("etag", ""),
+                    "last_modified": headers.get("last-modified", ""),
+                })
+            self.index[url] = entry
+            self.index_dirty = True
+        route.fulfill(response=response, body=body)
+
+    def _on_load(self):
+        """页面load事件：打印本次加载节省的流量和时间"""
+        self.load_count += 1
+        current = self.current
+        if current["blocked"] or current["hits"]:
+            print(f"🚦 页面加载#{self.load_count}: 拦截{current['blocked']}个, 缓存命中{current['hits']}个, "
+                  f"节省 {current['bytes'] / 1024:.1f}KB / {current['ms']:.0f}ms")
+        self.current = {key: 0 for key in self.totals}
+
+    def save_index(self):
+        """保存缓存索引"""
+        if not self.index_dirty:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_file = f"{self.index_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False)
+            os.replace(temp_file, self.index_file)
+            self.index_dirty = False
+        except Exception as e:
+            print(f"⚠️  保存静态资源缓存索引失败: {e}")
+
+    def report(self):
+        """打印汇总并保存索引"""
+        self.save_index()
+        totals = self.totals
+        print(f"\n🚦 请求路由: {self.load_count}次页面加载, 拦截{totals['blocked']}个请求, "
+              f"缓存命中{totals['hits']}个, 共节省 {totals['bytes'] / 1024:.1f}KB / {totals['ms']:.0f}ms")
+
+class StepEventStream:
+    """步骤事件流 - 以JSON Lines写入旁路文件（环境变量ROUTER_TEST_EVENTS指定路径）
+
+    每行一个事件，追加写入并立即flush，GUI等进程可以边运行边读取。
+    """
+
+    def __init__(self, path: Optional[str] = None, module: str = ""):
+        self.path = path or os.environ.get(EVENTS_ENV_VAR) or None
+        self.module = module
+        self.events: List[Dict[str, Any]] = []
+
+    def emit(self, event: Dict[str, Any]):
+        """记录一个事件"""
+        event = dict(event, ts=round(time.time(), 3), pid=os.getpid(), module=self.module)
+        self.events.append(event)
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                f.flush()
+        except Exception as e:
+            print(f"⚠️  写入步骤事件失败: {e}")
+
+def instrument_step(name: str = None):
+    """步骤计时装饰器：记录耗时、浏览器往返次数、等待时间和结果
+
+    方法返回False时结果记为returned_false，抛出异常记为failed。
+    也可以装饰协程方法（async_framework中的异步模块）。
+    """
+    def decorator(func):
+        step_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(self, *args, **kwargs):
+                if not hasattr(self, "step_span"):
+                    return await func(self, *args, **kwargs)
+                with self.step_span(step_name) as span:
+                    result = await func(self, *args, **kwargs)
+                    if result is False:
+                        span["outcome"] = "returned_false"
+                    return result
+        else:
+            @functools.wraps(func)
+            def wrapper(self, *args, **kwargs):
+                if not hasattr(self, "step_span"):
+                    return func(self, *args, **kwargs)
+                with self.step_span(step_name) as span:
+                    result = func(self, *args, **kwargs)
+                    if result is False:
+                        span["outcome"] = "returned_false"
+                    return result
+
+        wrapper._instrumented = True
+        return wrapper
+    return decorator
+
+def make_namespace(prefix: str = "t") -> str:
+    """生成一个短的随机命名空间，例如t3fa9c"""
+    return f"{prefix}{uuid.uuid4().hex[:5]}"
+
+# 定时重拨的星期 -> 接口参数中的数字
+WEEKDAY_NUMBERS = {"周一": "1", "周二": "2", "周三": "3", "周四": "4", "周五": "5", "周六": "6", "周日": "7"}
+
+def vpn_client_api_entry(profile: Dict) -> Dict:
+    """PPTP/L2TP客户端配置转换为接口参数（两者的接口字段相同）"""
+    scheduled = profile.get("scheduled_reconnect", {})
+    return {
+        "name": profile["name"],
+        "server": profile["server"],
+        "server_port": profile["port"],
+        "username": profile["user"],
+        "passwd": profile["pass"],
+        "mtu": profile["mtu"],
+        "mru": profile["mru"],
+        "interface": profile["line"],
+        "cycle_rst_time": profile["reconnect_interval"],
+        "timing_rst_switch": 1 if scheduled.get("enabled") else 0,
+        "timing_rst_week": "".join(WEEKDAY_NUMBERS[day] for day in scheduled.get("days", []) if day in WEEKDAY_NUMBERS),
+        "timing_rst_time": ",".join(scheduled.get("times", [])),
+        "comment": profile["comment"],
+        "enabled": "yes"
+    }
 
 class RouterTestConfig:
     """路由器测试配置类"""
@@ -13,12 +950,42 @@ class RouterTestConfig:
                  username: str = "admin", 
                  password: str = "admin123",
                  ssh_user: str = "sshd",
-                 ssh_pass: str = "ikuai8.com"):
+                 ssh_pass: str = "ikuai8.com",
+                 firmware: str = "",
+                 selector_cache_file: str = DEFAULT_SELECTOR_CACHE_FILE,
+                 use_api_fixtures: bool = False,
+                 reuse_session: bool = True,
+                 session_state_dir: str = DEFAULT_SESSION_STATE_DIR,
+                 block_resources: bool = True,
+                 cache_static: bool = True,
+                 static_cache_dir: str = DEFAULT_STATIC_CACHE_DIR,
+                 events_file: Optional[str] = None,
+                 namespace: Optional[str] = None,
+                 bulk_create: str = "",
+                 lan_subnets: Optional[List[str]] = None,
+                 api_verify_tls: Union[bool, str] = False):
         self.router_url = router_url
         self.username = username
         self.password = password
         self.ssh_user = ssh_user
         self.ssh_pass = ssh_pass
+        self.firmware = firmware
+        self.selector_cache_file = selector_cache_file
+        self.use_api_fixtures = use_api_fixtures
+        self.reuse_session = reuse_session
+        self.session_state_dir = session_state_dir
+        self.block_resources = block_resources
+        self.cache_static = cache_static
+        self.static_cache_dir = static_cache_dir
+        self.events_file = events_file
+        # 为空时模块操作整张表（单独运行时的原有行为）
+        self.namespace = namespace if namespace is not None else os.environ.get(NAMESPACE_ENV_VAR, "")
+        # 步骤8批量创建使用的导入文件格式（csv/txt），为空时逐个填写表单
+        self.bulk_create = bulk_create
+        # 路由器LAN侧网段（CIDR），批量配置分配IP时避开
+        self.lan_subnets = list(lan_subnets or [])
+        # 接口客户端的证书校验：True/CA证书路径时校验，默认不校验（路由器多为自签名证书）
+        self.api_verify_tls = api_verify_tls
 
 class BaseTestModule(ABC):
     """基础测试模块抽象类"""
@@ -26,11 +993,124 @@ class BaseTestModule(ABC):
     def __init__(self, config: RouterTestConfig):
         self.config = config
         self.page: Optional[Page] = None
-        
+        self.waits: Optional[WaitEngine] = None
+        self.session_restored = False
+        self.selector_cache = SelectorCache.load(getattr(config, "selector_cache_file", DEFAULT_SELECTOR_CACHE_FILE))
+        self.events = StepEventStream(getattr(config, "events_file", None), module=type(self).__name__)
+        self.namespace = getattr(config, "namespace", "") or ""
+        self._step_stack: List[Dict[str, Any]] = []
+        self.round_trips = RoundTripCounter()
+    
+    def namespaced(self, value: str) -> str:
+        """给配置名称/备注加上命名空间前缀（未设置命名空间时原样返回）"""
+        return f"{self.namespace}_{value}" if self.namespace else value
+    
+    def in_namespace(self, text: str) -> bool:
+        """文本（一行表格或一条配置）是否属于当前命名空间"""
+        return not self.namespace or self.namespace in text
+
+    def __init_subclass__(cls, **kwargs):
+        """子类中的step*方法和run_full_test自动加上步骤计时"""
+        super().__init_subclass__(**kwargs)
+        for attr, value in list(vars(cls).items()):
+            if not callable(value) or getattr(value, "_instrumented", False):
+                continue
+            if (attr.startswith("step") and attr != "step_span") or attr == "run_full_test":
+                setattr(cls, attr, instrument_step()(value))
+
     def setup(self, page: Page):
         """设置页面对象"""
+        if self.waits:
+            self.waits.close()
         self.page = page
-        
+        self.waits = WaitEngine(page, round_trips=self.round_trips)
+
+    @contextmanager
+    def step_span(self, name: str):
+        """步骤计时上下文：开始/结束各发一个事件，支持嵌套（子步骤）"""
+        parent = self._step_stack[-1]["step"] if self._step_stack else None
+        span = {"step": name, "parent": parent, "depth": len(self._step_stack), "outcome": "passed"}
+        self.events.emit({"event": "step_start", "step": name, "parent": parent, "depth": span["depth"]})
+
+        start = time.perf_counter()
+        start_round_trips = self.round_trips.count
+        start_wait = self.waits.actual_total if self.waits else 0.0
+        start_legacy = self.waits.legacy_total if self.waits else 0.0
+        self._step_stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span["outcome"] = "failed"
+            span["error"] = str(e)[:500]
+            raise
+        finally:
+            self._step_stack.pop()
+            end_event = {
+                "event": "step_end",
+                "step": name,
+                "parent": parent,
+                "depth": span["depth"],
+                "outcome": span["outcome"],
+                "wall_ms": round((time.perf_counter() - start) * 1000, 1),
+                "round_trips": self.round_trips.count - start_round_trips,
+                "wait_ms": round(((self.waits.actual_total if self.waits else 0.0) - start_wait) * 1000, 1),
+                "legacy_sleep_ms": round(((self.waits.legacy_total if self.waits else 0.0) - start_legacy) * 1000, 1),
+            }
+            if "error" in span:
+                end_event["error"] = span["error"]
+            self.events.emit(end_event)
+
+    def _selector_cache_key(self, name: str) -> str:
+        """生成选择器缓存键（固件版本 + 当前页面路由 + 逻辑名称）"""
+        route = urlparse(self.page.url).fragment.split('?')[0]
+        return SelectorCache.make_key(getattr(self.config, "firmware", ""), route, name)
+
+    def find_element(self, name: str, selectors: List[str], scope=None, visible: bool = True,
+                     accept: Callable[[str, Locator], bool] = None) -> Optional[Tuple[str, Locator]]:
+        """按学习结果查找元素，返回(命中的选择器, 元素)
+
+        优先尝试上次命中的选择器；失效时回退完整列表并重新学习。
+        accept可对候选元素做额外校验（或直接尝试操作），返回False则继续查找。
+        """
+        scope = scope or self.page
+        key = self._selector_cache_key(name)
+        cached = self.selector_cache.get(key)
+        ordered = list(selectors)
+        if cached in ordered:
+            ordered.remove(cached)
+            ordered.insert(0, cached)
+
+        for selector in ordered:
+            try:
+                candidates = scope.locator(selector)
+                self.round_trips.add()
+                for i in range(candidates.count()):
+                    element = candidates.nth(i)
+                    if visible:
+                        self.round_trips.add()
+                        if not element.is_visible():
+                            continue
+                    if accept and not accept(selector, element):
+                        continue
+                    if selector == cached:
+                        self.selector_cache.hits += 1
+                    else:
+                        self.selector_cache.misses += 1
+                        self.selector_cache.learn(key, selector)
+                    return selector, element
+            except Exception:
+                continue
+
+        if cached:
+            self.selector_cache.misses += 1
+            self.selector_cache.forget(key)
+        return None
+
+    def snapshot_table(self, selector: str = 'table') -> RouterTable:
+        """一次性读取当前页面表格"""
+        self.round_trips.add()
+        return RouterTable.snapshot(self.page, selector)
+
     @abstractmethod
     def get_module_info(self) -> Dict:
         """获取模块信息"""
@@ -42,109 +1122,264 @@ class BaseTestModule(ABC):
         pass
         
     def login(self):
-        """通用登录功能"""
+        """通用登录功能（优先复用已保存的登录态）"""
         print(f"步骤1: 登录")
+        if self.session_restored and self._validate_session():
+            print("登录成功（复用已保存的登录态）")
+            return
+        
         self.page.goto(self.config.router_url)
         self.page.get_by_placeholder("用户名").fill(self.config.username)
         self.page.get_by_placeholder("密码").fill(self.config.password)
         self.page.get_by_role("button", name="登录").click()
         expect(self.page.locator('a:has-text("系统概况")')).to_be_visible(timeout=10000)
         print("登录成功")
+        
+        if getattr(self.config, "reuse_session", False):
+            store = SessionStore(self.config.session_state_dir)
+            if store.save(self.page.context, self.config):
+                print("💾 已保存登录态，后续模块将复用")
+    
+    def _validate_session(self) -> bool:
+        """打开首页，看到"系统概况"说明登录态有效，看到登录框说明已过期"""
+        home = self.page.locator('a:has-text("系统概况")')
+        login_box = self.page.get_by_placeholder("用户名")
+        try:
+            self.page.goto(base_url_from_router_url(self.config.router_url) + '/')
+            self.waits.until(lambda: home.first.is_visible() or login_box.first.is_visible(),
+                             timeout=10, description="校验登录态")
+            if home.first.is_visible():
+                return True
+        except Exception as e:
+            print(f"⚠️  校验登录态出错: {e}")
+        print("⚠️  登录态已过期，重新登录")
+        SessionStore(self.config.session_state_dir).discard(self.config)
+        return False
 
 class TableOperationsMixin:
     """表格操作混入类"""
     
-    def select_all_configs(self, operation_name: str = "操作") -> bool:
-        """通用的全选配置功能"""
-        print(f"🔲 点击表头全选框，选中所有配置...")
-        
-        select_all_found = False
+    def table_pager(self) -> Dict[str, Any]:
+        """读取表格分页信息 {total, page, hasNext}，没有分页控件时total/page为None"""
+        try:
+            return self.page.evaluate(_TABLE_PAGER_JS) or {}
+        except Exception:
+            return {}
+    
+    def goto_table_page(self, which: str = "next") -> bool:
+        """翻到下一页（next）或第一页（first），页码变化后返回True"""
+        pager = self.table_pager()
+        current = pager.get("page")
+        if which == "first" and current in (None, 1):
+            return True
+        if which == "next" and not pager.get("hasNext"):
+            return False
         
-        # 方法1：直接点击表头最后一列的复选框
+        name, selectors = ("分页下一页", NEXT_PAGE_SELECTORS) if which == "next" else ("分页第一页", FIRST_PAGE_SELECTORS)
+        found = self.find_element(name, selectors)
+        if not found:
+            print(f"⚠️  未找到{name}按钮")
+            return False
         try:
-            last_header_checkbox = self.page.locator('th:last-child input[type="checkbox"]').first
-            if last_header_checkbox.is_visible():
-                last_header_checkbox.scroll_into_view_if_needed()
-                last_header_checkbox.click()
-                print("✅ 成功点击表头最后一列的全选框")
-                select_all_found = True
+            found[1].click()
         except Exception as e:
-            print(f"方法1失败: {e}")
-        
-        # 方法2：使用chk_all类名
-        if not select_all_found:
+            print(f"⚠️  点击{name}失败: {e}")
+            return False
+        expected = 1 if which == "first" else None
+        return self.waits.until(
+            lambda: self.table_pager().get("page") == expected if expected else self.table_pager().get("page") != current,
+            timeout=10, description=f"{name}加载")
+    
+    def iter_table_rows(self, selector: str = 'table', from_first: bool = True, max_pages: int = None,
+                        current: RouterTable = None):
+        """逐页读取表格数据行的生成器
+
+        每页一次evaluate，读完当前页才翻到下一页；调用方找到需要的行后break，就不会再翻页，
+        表格停留在该行所在的页。没有分页控件时只读当前页。
+        current为调用方已经读取的当前页快照：直接使用，不再重复读取该页（此时不回到第一页）。
+        """
+        if from_first and current is None:
+            self.goto_table_page("first")
+        pages = 0
+        while True:
+            table = current if current is not None else self.snapshot_table(selector)
+            current = None
+            pages += 1
+            yield from table
+            if max_pages and pages >= max_pages:
+                return
+            if not self.goto_table_page("next"):
+                return
+    
+    def find_table_row(self, predicate: Callable[[TableRow], bool], selector: str = 'table') -> Optional[TableRow]:
+        """逐页查找第一条满足条件的数据行，找到后停止翻页"""
+        for row in self.iter_table_rows(selector):
+            if predicate(row):
+                return row
+        return None
+    
+    def count_table_rows(self, selector: str = 'table') -> int:
+        """表格数据总行数：优先读取分页显示的总条数，否则逐页统计"""
+        total = self.table_pager().get("total")
+        if total is not None:
+            return total
+        return sum(1 for _ in self.iter_table_rows(selector))
+    
+    def count_configs(self, table: RouterTable = None) -> int:
+        """统计当前命名空间的配置行数（不传table时包含所有分页）"""
+        if table is not None:
+            if not self.namespace:
+                return len(table)
+            return len(table.containing(self.namespace, case_sensitive=True))
+        if not self.namespace:
+            return self.count_table_rows()
+        return sum(1 for row in self.iter_table_rows() if self.namespace in row.text)
+    
+    def reserve_router_subnets(self, allocator):
+        """登记路由器管理地址所在网段和LAN网段，生成的IP不会落在路由器自己的网络里"""
+        subnets = list(getattr(self.config, "lan_subnets", []))
+        host = urlparse(self.config.router_url).hostname
+        if host:
+            subnets.append(host)
+            # 本机访问路由器使用的源地址就在路由器的LAN网段中（只查路由表，不发包）
             try:
-                chk_all = self.page.locator('input.chk_all').first
-                if chk_all.is_visible():
-                    chk_all.scroll_into_view_if_needed()
-                    chk_all.click()
-                    print("✅ 成功点击chk_all全选框")
-                    select_all_found = True
-            except Exception as e:
-                print(f"方法2失败: {e}")
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+                    probe.connect((host, 80))
+                    subnets.append(probe.getsockname()[0])
+            except OSError:
+                pass
+        allocator.reserve(subnets=subnets)
+    
+    def reserve_existing_values(self, allocator) -> List[TableRow]:
+        """把路由器自身网段和表格（所有分页）中已有的名称、MAC和IP登记到分配器，生成的配置不会与之冲突"""
+        self.reserve_router_subnets(allocator)
+        rows = list(self.iter_table_rows())
+        for row in rows:
+            allocator.reserve(names=row.cells)
+            allocator.reserve_values(row.cells)
+        print(f"🧮 已登记路由器上现有的 {len(rows)} 条配置，分配时跳过")
+        return rows
+    
+    def filter_to_namespace(self) -> bool:
+        """用搜索框只显示当前命名空间的配置，之后的全选/批量操作只作用于这些行"""
+        if not self.namespace:
+            return True
+        print(f"🏷️ 按命名空间过滤表格: {self.namespace}")
+        search_input = self._find_search_input()
+        if not search_input or not self._perform_search(search_input, self.namespace):
+            print("❌ 无法按命名空间过滤，为避免影响其他数据，跳过批量操作")
+            return False
+        return self._check_namespace_filter(self.snapshot_table())
+    
+    def _check_namespace_filter(self, table: RouterTable) -> bool:
+        """搜索可能被忽略或匹配过宽：过滤后的表格里只要有一行不属于本命名空间就放弃"""
+        foreign = [row for row in table if not self.in_namespace(row.text)]
+        if foreign:
+            print(f"❌ 过滤后的表格中有 {len(foreign)} 行不属于命名空间 {self.namespace}"
+                  f"（例如: {foreign[0].key}），为避免影响其他数据，跳过批量操作")
+            return False
+        return True
+    
+    @instrument_step()
+    def select_all_configs(self, operation_name: str = "操作") -> bool:
+        """通用的全选配置功能"""
+        if not self.filter_to_namespace():
+            return False
+        scope = f"命名空间 {self.namespace} 的" if self.namespace else "所有"
+        print(f"🔲 点击表头全选框，选中{scope}配置...")
         
-        # 方法3：备用方案
-        if not select_all_found:
-            try:
-                last_header = self.page.locator('thead th:last-child, tr:first-child th:last-child').first
-                if last_header.is_visible():
-                    clickable_elements = last_header.locator('input, label, span').all()
-                    for elem in clickable_elements:
-                        try:
-                            if elem.is_visible():
-                                elem.click()
-                                print("✅ 备用方案成功：点击了表头最后一列的元素")
-                                select_all_found = True
-                                break
-                        except:
-                            continue
-            except Exception as e:
-                print(f"备用方案失败: {e}")
+        # 依次尝试：表头最后一列复选框、chk_all类名、表头最后一列的可点击元素（备用方案）
+        select_all_selectors = [
+            'th:last-child input[type="checkbox"]',
+            'input.chk_all',
+            'thead th:last-child input, tr:first-child th:last-child input',
+            'thead th:last-child label, tr:first-child th:last-child label',
+            'thead th:last-child span, tr:first-child th:last-child span'
+        ]
         
-        if not select_all_found:
+        found = self.find_element("表头全选框", select_all_selectors)
+        if not found:
             print(f"❌ 无法找到全选框，跳过{operation_name}")
             return False
         
-        time.sleep(1)
+        try:
+            selector, checkbox = found
+            checkbox.scroll_into_view_if_needed()
+            checkbox.click()
+            print(f"✅ 成功点击表头全选框: {selector}")
+        except Exception as e:
+            print(f"❌ 点击全选框失败: {e}")
+            return False
+
+        self.waits.for_dom_quiet(200, legacy_sleep=1, description="全选后DOM静默")
         print("✅ 全选操作完成")
         return True
     
+    @instrument_step()
     def batch_operation(self, operation_type: str, button_selectors: List[str]) -> bool:
         """通用批量操作"""
         print(f"🔄 执行批量{operation_type}操作...")
         
-        operation_button_found = False
-        for selector in button_selectors:
-            try:
-                buttons = self.page.locator(selector)
-                for i in range(buttons.count()):
-                    button = buttons.nth(i)
-                    if button.is_visible():
-                        button.scroll_into_view_if_needed()
-                        button.click()
-                        print(f"✅ 成功点击批量{operation_type}按钮")
-                        operation_button_found = True
-                        break
-                if operation_button_found:
-                    break
-            except Exception as e:
-                continue
-        
-        if not operation_button_found:
+        marker = self.waits.mark()
+        found = self.find_element(f"批量{operation_type}按钮", button_selectors)
+        if not found:
             print(f"❌ 未找到批量{operation_type}按钮")
             return False
-            
-        time.sleep(2)
+        
+        try:
+            button = found[1]
+            button.scroll_into_view_if_needed()
+            button.click()
+            print(f"✅ 成功点击批量{operation_type}按钮")
+        except Exception as e:
+            print(f"❌ 点击批量{operation_type}按钮失败: {e}")
+            return False
+
+        # 操作生效的标志：弹出确认框（删除）或收到/Action/call响应（启用/停用）
+        self.waits.until(
+            lambda: self.waits.has_action_call_since(marker) or self.waits.is_visible(MODAL_SELECTORS),
+            timeout=5, legacy_sleep=2, description=f"批量{operation_type}响应"
+        )
         print(f"✅ 批量{operation_type}操作执行完成")
         return True
     
+    @instrument_step()
     def batch_delete_all_configs(self, need_select_all: bool = True) -> bool:
-        """批量删除所有配置"""
+        """批量删除所有配置
+
+        表格分页时全选只选中当前页，每删除一页后继续删除剩余的配置，直到清空或不再减少。
+        """
         print("🗑️ 执行批量删除所有配置...")
         
+        while True:
+            deleted, total_before = self._delete_selected_page(need_select_all)
+            if not deleted:
+                return False
+            
+            # 检查删除结果
+            try:
+                row_count = self.count_configs()
+                print(f"🔍 删除后剩余配置数量: {row_count}")
+                
+                if row_count == 0:
+                    print("✅ 所有配置已成功删除")
+                    return True
+                if total_before is None or row_count >= total_before:
+                    print(f"⚠️  仍有 {row_count} 个配置未删除")
+                    return False
+                
+                print(f"📄 表格分页，继续删除剩余的 {row_count} 个配置")
+                need_select_all = True
+                
+            except Exception as e:
+                print(f"检查删除结果时出错: {e}")
+                return False
+    
+    def _delete_selected_page(self, need_select_all: bool) -> Tuple[bool, Optional[int]]:
+        """全选当前页并删除，返回(是否完成删除操作, 删除前分页显示的总条数)"""
         if need_select_all:
             if not self.select_all_configs("批量删除"):
-                return False
+                return False, None
         else:
             print("🔲 全选框已选中，跳过全选步骤")
         
@@ -156,11 +1391,13 @@ class TableOperationsMixin:
             'input[value="删除"]'
         ]
         
+        total_before = self.table_pager().get("total")
         if not self.batch_operation("删除", delete_selectors):
-            return False
+            return False, total_before
         
         # 处理确认弹窗
-        time.sleep(1)
+        self.waits.for_modal(timeout=5, legacy_sleep=1)
+        marker = self.waits.mark()
         try:
             confirm_modal_selectors = [
                 'div.el-message-box',
@@ -170,73 +1407,46 @@ class TableOperationsMixin:
             ]
             
             modal_found = False
-            for selector in confirm_modal_selectors:
-                modals = self.page.locator(selector)
-                if modals.count() > 0:
-                    modal = modals.first
-                    if modal.is_visible():
-                        print(f"✅ 找到确认弹窗")
-                        
-                        confirm_selectors = [
-                            'button:has-text("确定")',
-                            'button:has-text("删除")',
-                            'button.el-button--primary',
-                            '.btn-primary'
-                        ]
-                        
-                        for confirm_selector in confirm_selectors:
-                            confirm_buttons = modal.locator(confirm_selector)
-                            if confirm_buttons.count() > 0:
-                                confirm_button = confirm_buttons.first
-                                if confirm_button.is_visible():
-                                    print(f"✅ 找到确定按钮")
-                                    confirm_button.click()
-                                    print(f"✅ 点击确定删除按钮")
-                                    modal_found = True
-                                    break
-                        if modal_found:
-                            break
+            found_modal = self.find_element("删除确认弹窗", confirm_modal_selectors)
+            if found_modal:
+                modal = found_modal[1]
+                print(f"✅ 找到确认弹窗")
+                
+                confirm_selectors = [
+                    'button:has-text("确定")',
+                    'button:has-text("删除")',
+                    'button.el-button--primary',
+                    '.btn-primary'
+                ]
+                
+                found_confirm = self.find_element("删除确认按钮", confirm_selectors, scope=modal)
+                if found_confirm:
+                    print(f"✅ 找到确定按钮")
+                    found_confirm[1].click()
+                    print(f"✅ 点击确定删除按钮")
+                    modal_found = True
             
             if not modal_found:
                 print("❌ 未找到确认弹窗")
-                return False
+                return False, total_before
                 
         except Exception as e:
             print(f"处理确认弹窗时出错: {e}")
-            return False
-        
-        time.sleep(3)
+            return False, total_before
+
+        self.waits.for_action_call(marker, timeout=10, legacy_sleep=1, description="批量删除响应")
+        self.waits.for_modal_gone(timeout=5, legacy_sleep=1)
+        # 不分页时表格清空；分页时下一页的数据会补上来，以总条数变化为准
+        self.waits.until(lambda: self.waits.row_count() == 0 or
+                         (total_before is not None and self.table_pager().get("total") != total_before),
+                         timeout=5, legacy_sleep=1, description="删除后表格刷新")
         print("✅ 批量删除操作执行完成")
-        
-        # 检查删除结果
-        try:
-            rows = self.page.locator('table tr:not(:first-child)')
-            row_count = 0
-            
-            for i in range(rows.count()):
-                row = rows.nth(i)
-                cells = row.locator('td')
-                if cells.count() > 0:
-                    config_name = cells.nth(0).text_content().strip()
-                    if config_name and config_name not in ["拨号名称", "配置名称", "vlanID", "VLAN ID", ""]:
-                        row_count += 1
-            
-            print(f"🔍 删除后剩余配置数量: {row_count}")
-            
-            if row_count == 0:
-                print("✅ 所有配置已成功删除")
-                return True
-            else:
-                print(f"⚠️  仍有 {row_count} 个配置未删除")
-                return False
-                
-        except Exception as e:
-            print(f"检查删除结果时出错: {e}")
-            return False
+        return True, total_before
 
 class SearchOperationsMixin:
     """搜索操作混入类"""
     
+    @instrument_step()
     def search_function_test(self, test_cases: List[Dict[str, str]], clear_after_each: bool = True):
         """通用搜索功能测试
         
@@ -280,12 +1490,12 @@ class SearchOperationsMixin:
             # 清空搜索框（如果需要）
             if clear_after_each and i < len(test_cases):
                 self._clear_search(search_input)
-                time.sleep(1)
-        
+                self.waits.for_dom_quiet(300, legacy_sleep=1, description="清空搜索后DOM静默")
+
         # 最后清空搜索框，显示所有结果
         print(f"\n🧹 清空搜索框，显示所有结果...")
         self._clear_search(search_input)
-        time.sleep(2)
+        self.waits.for_dom_quiet(300, legacy_sleep=2, description="清空搜索后DOM静默")
         
         if all_passed:
             print("✅ 所有搜索测试都通过")
@@ -307,16 +1517,10 @@ class SearchOperationsMixin:
             'input[class*="search"]'
         ]
         
-        for selector in search_selectors:
-            try:
-                inputs = self.page.locator(selector)
-                if inputs.count() > 0:
-                    search_input = inputs.first
-                    if search_input.is_visible():
-                        print(f"✅ 找到搜索框: {selector}")
-                        return search_input
-            except Exception as e:
-                continue
+        found = self.find_element("搜索框", search_selectors)
+        if found:
+            print(f"✅ 找到搜索框: {found[0]}")
+            return found[1]
         
         print("❌ 未找到搜索输入框")
         return None
@@ -330,7 +1534,7 @@ class SearchOperationsMixin:
             
             # 尝试触发搜索 - 按回车键
             search_input.press('Enter')
-            time.sleep(2)
+            self.waits.for_dom_quiet(300, legacy_sleep=2, description="搜索后DOM静默")
             
             # 如果按回车没有效果，尝试查找搜索按钮
             search_button_selectors = [
@@ -342,19 +1546,15 @@ class SearchOperationsMixin:
                 'button[type="submit"]'
             ]
             
-            for selector in search_button_selectors:
+            found = self.find_element("搜索按钮", search_button_selectors)
+            if found:
                 try:
-                    buttons = self.page.locator(selector)
-                    if buttons.count() > 0:
-                        button = buttons.first
-                        if button.is_visible():
-                            button.click()
-                            print(f"✅ 点击搜索按钮")
-                            break
+                    found[1].click()
+                    print(f"✅ 点击搜索按钮")
                 except:
-                    continue
-            
-            time.sleep(2)
+                    pass
+
+            self.waits.for_dom_quiet(300, legacy_sleep=2, description="搜索后DOM静默")
             return True
             
         except Exception as e:
@@ -364,23 +1564,18 @@ class SearchOperationsMixin:
     def _verify_search_results(self, search_value: str, target_field: str = "") -> bool:
         """验证搜索结果"""
         try:
-            # 查找表格行
-            table_rows = self.page.locator('table tr:not(:first-child)')
+            # 一次读取表格（已排除空行和提示行）
+            table = self.snapshot_table()
             
-            if table_rows.count() == 0:
+            if len(table.rows) == 0:
                 print(f"⚠️  搜索结果为空")
                 return False
             
             found_matching_results = False
             
             # 检查每一行是否包含搜索值
-            for i in range(table_rows.count()):
-                row = table_rows.nth(i)
-                row_text = row.text_content().strip()
-                
-                # 跳过空行或提示行
-                if not row_text or "暂无数据" in row_text or "没有找到" in row_text:
-                    continue
+            for row in table:
+                row_text = row.text
                 
                 # 检查行内容是否包含搜索值
                 if search_value.lower() in row_text.lower():
@@ -444,6 +1639,157 @@ class FormOperationsMixin:
             print(f"点击 {field_name} 失败: {e}")
             raise
     
+    def _form_payload(self, bound: List[Tuple[FormField, Any]]) -> List[Dict[str, Any]]:
+        """字段声明转为传给页面脚本的参数，上次命中的选择器排在最前"""
+        payload = []
+        for field, value in bound:
+            selectors = list(field.selectors)
+            cached = self.selector_cache.get(self._selector_cache_key(f"form:{field.label}"))
+            if cached in selectors:
+                selectors.remove(cached)
+                selectors.insert(0, cached)
+            payload.append({"label": field.label, "selectors": selectors, "kind": field.kind, "value": value})
+        return payload
+    
+    def fill_form(self, schema: FormSchema, values: Dict[str, Any]) -> bool:
+        """按表单声明填写表单，所有必填字段回读一致时返回True
+
+        一次evaluate完成所有字段的定位、写值、事件派发和回读；
+        没找到或回读不一致的字段再用Playwright逐个填写。
+        """
+        bound = schema.bind(values)
+        payload = self._form_payload(bound)
+
+        start = time.perf_counter()
+        try:
+            results = self.page.evaluate(_FORM_FILL_JS, payload)
+        except Exception as e:
+            print(f"⚠️  {schema.name}批量填写失败，改为逐个字段填写: {e}")
+            results = [{"label": field.label, "found": False, "ok": False} for field, _ in bound]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        failed = []
+        for (field, value), result in zip(bound, results):
+            if result.get("selector"):
+                key = self._selector_cache_key(f"form:{field.label}")
+                if self.selector_cache.get(key) == result["selector"]:
+                    self.selector_cache.hits += 1
+                else:
+                    self.selector_cache.misses += 1
+                    self.selector_cache.learn(key, result["selector"])
+            if result.get("message"):
+                print(f"⚠️  {field.label}: {result['message']}")
+            if result.get("ok"):
+                print(f"{field.label}填写: {value}")
+            else:
+                failed.append((field, value, result))
+        print(f"⚡ {schema.name}一次填写 {len(bound) - len(failed)}/{len(bound)} 个字段，用时 {elapsed_ms:.0f}ms")
+
+        success = True
+        for field, value, result in failed:
+            if self._fill_form_field_fallback(field, value, result):
+                continue
+            if field.required:
+                print(f"❌ {field.label}填写失败")
+                success = False
+            else:
+                print(f"⚠️  {field.label}填写失败（非必填）")
+        return success
+    
+    def _fill_form_field_fallback(self, field: FormField, value: Any, result: Dict[str, Any]) -> bool:
+        """批量填写未成功的字段，用Playwright逐个定位填写"""
+        if result.get("error"):
+            print(f"⚠️  {field.label}: {result['error']}")
+        found = self.find_element(f"form:{field.label}", field.fallback_selectors)
+        if not found:
+            return False
+        selector, element = found
+        try:
+            if field.kind == "checkbox":
+                element.set_checked(bool(value))
+            elif field.kind == "select":
+                element.select_option(str(value))
+            else:
+                element.fill(str(value))
+            print(f"{field.label}填写: {value} (逐个填写: {selector})")
+            return True
+        except Exception as e:
+            print(f"填写字段 {field.label} 失败: {e}")
+            return False
+    
+    def _trigger_form_validation(self) -> bool:
+        """点击保存触发表单校验，等待错误提示出现"""
+        found = self.find_element("表单保存按钮", FORM_SAVE_SELECTORS)
+        if not found:
+            print("⚠️  未找到保存按钮，无法触发校验")
+            return False
+        found[1].click()
+        self.waits.for_visible("p.error_tip", timeout=3, legacy_sleep=2, description="校验提示")
+        return True
+    
+    def _collect_form_errors(self, schema: FormSchema) -> Dict[str, Any]:
+        """一次读取表单上所有错误提示：{"fields": {标签: 提示或None}, "unattributed": [提示]}"""
+        payload = self._form_payload([(field, None) for field in schema])
+        return self.page.evaluate(_FORM_ERRORS_JS, payload)
+    
+    def validate_required_fields(self, schema: FormSchema, values: Dict[str, Any],
+                                 labels: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """必填项校验矩阵，返回{字段标签: 错误提示或None}
+
+        一次清空labels中的所有文本字段、点一次保存，再一次读取所有错误提示并按表单行归属到字段；
+        只有出现无法归属的提示时，没拿到提示的字段才逐个清空、保存隔离校验。
+        结束后把所有字段恢复为values中的值。
+        """
+        bound = [(field, value) for field, value in schema.bind(values)
+                 if field.kind == "text" and (labels is None or field.label in labels)]
+        if not bound:
+            return {}
+        
+        def clear(fields):
+            self.page.evaluate(_FORM_FILL_JS, self._form_payload([(field, "") for field, _ in fields]))
+        
+        def restore():
+            self.page.evaluate(_FORM_FILL_JS, self._form_payload(bound))
+        
+        messages: Dict[str, Optional[str]] = {field.label: None for field, _ in bound}
+        start = time.perf_counter()
+        try:
+            clear(bound)
+            if self._trigger_form_validation():
+                collected = self._collect_form_errors(schema)
+                messages.update({label: collected["fields"].get(label) for label in messages})
+                unattributed = collected["unattributed"]
+            else:
+                unattributed = []
+            print(f"⚡ {schema.name}校验矩阵: 同时清空 {len(bound)} 个字段，"
+                  f"{sum(1 for message in messages.values() if message)} 个有错误提示，"
+                  f"用时 {(time.perf_counter() - start) * 1000:.0f}ms")
+            
+            # 有提示无法归属时，对没拿到提示的字段逐个隔离校验
+            isolated = [(field, value) for field, value in bound if not messages[field.label]] if unattributed else []
+            if isolated:
+                print(f"⚠️  {len(unattributed)} 条错误提示无法归属到字段，逐个校验 {len(isolated)} 个字段")
+            for field, value in isolated:
+                restore()
+                clear([(field, value)])
+                if not self._trigger_form_validation():
+                    break
+                collected = self._collect_form_errors(schema)
+                # 只清空了一个字段，无法归属的提示也属于它
+                messages[field.label] = collected["fields"].get(field.label) or next(iter(collected["unattributed"]), None)
+        except Exception as e:
+            print(f"❌ {schema.name}校验矩阵执行失败: {e}")
+        finally:
+            try:
+                restore()
+            except Exception as e:
+                print(f"⚠️  恢复{schema.name}字段值失败: {e}")
+        
+        for label, message in messages.items():
+            print(f"验证字段: {label}")
+            print(f"  错误提示: {message}" if message else f"  未找到{label}的错误提示")
+        return messages
+    
     def save_form(self, save_button_text: str = "保存"):
         """保存表单"""
         try:
@@ -457,19 +1803,10 @@ class FormOperationsMixin:
 class ImportExportMixin:
     """导入导出操作混入类"""
     
-    def get_cookies_from_page(self):
-        """从页面获取cookies"""
-        cookies = self.page.context.cookies()
-        return {cookie['name']: cookie['value'] for cookie in cookies}
-
-    def get_filename_from_headers(self, headers):
-        """从响应头中提取文件名"""
-        content_disposition = headers.get('Content-Disposition', '')
-        if content_disposition:
-            match = re.search(r'filename="([^"]+)"', content_disposition)
-            if match:
-                return match.group(1)
-        return None
+    # 批量导入后用来确认配置已出现的名称字段
+    profile_name_field: str = "name"
+    
+    last_export_sha256: Optional[str] = None
     
     def get_filename_from_url(self, url):
         """从URL中提取文件名"""
@@ -482,45 +1819,40 @@ class ImportExportMixin:
             print(f"从URL提取文件名时出错: {e}")
         return None
     
-    def export_data(self, format_type: str, download_path: str) -> Optional[str]:
-        """导出数据"""
+    @instrument_step()
+    def export_data(self, format_type: str, download_path: str, filename: str = None) -> Optional[str]:
+        """导出数据
+
+        监听浏览器的download事件，文件到达后立即分块写入download_path并计算sha256，
+        不会二次下载。filename为空时使用服务器给出的文件名。
+        """
         print(f"🔹 导出{format_type.upper()}格式...")
         
+        downloads = []
+        export_results = []
+        
+        def handle_download(download):
+            downloads.append(download)
+        
+        def handle_response(response):
+            # 导出接口返回失败时无需等待下载
+            try:
+                if "/Action/call" in response.url and "EXPORT" in (response.request.post_data or ""):
+                    export_results.append(response.json())
+                    print(f"🔍 捕获到导出API响应: {response.url}")
+            except Exception:
+                export_results.append({})
+        
+        def handle_page(page):
+            # 部分固件在新窗口中打开下载链接
+            page.on("download", handle_download)
+        
+        context = self.page.context
+        self.page.on("download", handle_download)
+        self.page.on("response", handle_response)
+        context.on("page", handle_page)
+        
         try:
-            # 记录导出请求
-            export_requests = []
-            download_requests = []
-            actual_filename = None
-            
-            def handle_request(request):
-                try:
-                    if "/Action/call" in request.url and request.post_data:
-                        post_data = request.post_data
-                        if "EXPORT" in post_data:
-                            export_requests.append({
-                                "url": request.url,
-                                "data": post_data
-                            })
-                            print(f"🔍 捕获到导出API请求: {request.url}")
-                    elif "/Action/download" in request.url:
-                        # 从URL中提取实际的文件名
-                        filename = self.get_filename_from_url(request.url)
-                        if filename:
-                            nonlocal actual_filename
-                            actual_filename = filename
-                        download_requests.append({
-                            "url": request.url,
-                            "filename": filename
-                        })
-                        print(f"🔍 捕获到下载请求: {request.url}")
-                        if filename:
-                            print(f"🔍 提取到实际文件名: {filename}")
-                except Exception as e:
-                    print(f"⚠️  处理请求时出错: {e}")
-                    
-            # 添加请求监听器
-            self.page.on("request", handle_request)
-            
             # 查找并点击导出按钮
             export_button_selectors = [
                 'a:has-text("导出")',
@@ -529,26 +1861,19 @@ class ImportExportMixin:
                 'input[value="导出"]'
             ]
             
-            export_button_found = False
-            for selector in export_button_selectors:
-                export_buttons = self.page.locator(selector)
-                if export_buttons.count() > 0:
-                    export_button = export_buttons.first
-                    if export_button.is_visible():
-                        print(f"✅ 找到可见的导出按钮")
-                        export_button.scroll_into_view_if_needed()
-                        export_button.click()
-                        export_button_found = True
-                        break
-            
-            if not export_button_found:
+            found = self.find_element("导出按钮", export_button_selectors)
+            if not found:
                 print(f"❌ 未找到导出按钮")
-                self.page.remove_listener("request", handle_request)
                 return None
+            print(f"✅ 找到可见的导出按钮")
+            export_button = found[1]
+            export_button.scroll_into_view_if_needed()
+            export_button.click()
             
             # 等待下拉菜单
-            time.sleep(1)
-            
+            self.waits.for_visible(f'a:has-text("{format_type.upper()}"), li:has-text("{format_type.upper()}")',
+                                   timeout=5, legacy_sleep=1, description="导出下拉菜单")
+
             # 选择格式
             format_option_selectors = [
                 f'a:has-text("{format_type.upper()}")',
@@ -556,105 +1881,121 @@ class ImportExportMixin:
                 f'[data-format="{format_type}"]'
             ]
             
-            format_option_found = False
-            for selector in format_option_selectors:
-                format_options = self.page.locator(selector)
-                if format_options.count() > 0:
-                    format_option = format_options.first
-                    if format_option.is_visible():
-                        print(f"✅ 找到{format_type.upper()}选项")
-                        format_option.click()
-                        format_option_found = True
-                        break
-            
-            if not format_option_found:
+            found = self.find_element(f"导出{format_type.upper()}选项", format_option_selectors)
+            if not found:
                 print(f"❌ 未找到{format_type.upper()}选项")
-                self.page.remove_listener("request", handle_request)
                 return None
+            print(f"✅ 找到{format_type.upper()}选项")
+            found[1].click()
             
-            # 等待API请求
-            time.sleep(3)
-            
-            # 移除监听器
-            self.page.remove_listener("request", handle_request)
+            # 等待下载到达；导出接口明确失败时提前结束
+            def export_failed():
+                return any(result.get("Result") not in (None, 30000) for result in export_results)
             
-            # 使用requests下载文件
-            if export_requests or download_requests:
-                cookies = self.get_cookies_from_page()
-                
-                # 构造下载URL - 使用实际捕获到的文件名或默认文件名
-                base_url = self.config.router_url.replace('/login#/login', '')
-                
-                if actual_filename:
-                    download_url = f"{base_url}/Action/download?filename={actual_filename}"
-                    expected_filename = actual_filename
-                else:
-                    # 尝试常见的文件名模式
-                    possible_filenames = [
-                        f"vlan_config.{format_type}",
-                        f"pptp_client.{format_type}",
-                        f"export.{format_type}"
-                    ]
-                    expected_filename = possible_filenames[0]
-                    download_url = f"{base_url}/Action/download?filename={expected_filename}"
-                
-                headers = {
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'zh-CN,zh;q=0.9',
-                    'Cache-Control': 'no-cache',
-                    'Connection': 'keep-alive',
-                    'Pragma': 'no-cache',
-                    'Referer': base_url + '/',
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                
-                response = requests.get(download_url, headers=headers, cookies=cookies, verify=False, timeout=10)
-                
-                if response.status_code == 200:
-                    # 优先使用响应头中的文件名
-                    real_filename = self.get_filename_from_headers(dict(response.headers))
-                    
-                    if real_filename:
-                        final_filename = real_filename
-                    elif actual_filename:
-                        final_filename = actual_filename
-                    else:
-                        final_filename = expected_filename
-                    
-                    file_path = os.path.join(download_path, final_filename)
-                    
-                    with open(file_path, 'wb') as f:
-                        f.write(response.content)
-                    
-                    if os.path.exists(file_path):
-                        file_size = os.path.getsize(file_path)
-                        print(f"✅ {format_type.upper()}格式导出成功: {file_path}")
-                        print(f"   文件大小: {file_size} 字节")
-                        return file_path
-                    else:
-                        print(f"❌ 文件保存失败: {file_path}")
-                        return None
+            self.waits.until(lambda: bool(downloads) or export_failed(), timeout=15, legacy_sleep=3,
+                             description="导出文件下载")
+            if not downloads:
+                if export_failed():
+                    print(f"❌ 导出接口返回失败: {export_results[-1].get('ErrMsg', export_results[-1])}")
                 else:
-                    print(f"❌ 下载失败，状态码: {response.status_code}")
-                    return None
-            else:
-                print(f"❌ 未检测到导出相关请求")
+                    print(f"❌ 未检测到导出文件下载")
                 return None
+            
+            return self._save_download(downloads[0], download_path, filename, format_type)
                 
         except Exception as e:
             print(f"❌ 导出{format_type.upper()}格式时出错: {e}")
-            try:
-                self.page.remove_listener("request", handle_request)
-            except:
-                pass
             return None
+        finally:
+            self.page.remove_listener("download", handle_download)
+            self.page.remove_listener("response", handle_response)
+            context.remove_listener("page", handle_page)
+    
+    def _save_download(self, download, download_path: str, filename: Optional[str], format_type: str) -> Optional[str]:
+        """把浏览器下载的文件分块写入目标目录，同时计算sha256"""
+        failure = download.failure()
+        if failure:
+            print(f"❌ 下载失败: {failure}")
+            return None
+        
+        return self._store_export(download.path(), download_path, format_type, filename or
+                                  download.suggested_filename or self.get_filename_from_url(download.url))
+    
+    def _store_export(self, source_path: str, download_path: str, format_type: str,
+                      filename: Optional[str] = None) -> str:
+        """把已下载的临时文件分块写入download_path，记录sha256（同步/异步共用）"""
+        final_filename = filename or f"export.{format_type}"
+        os.makedirs(download_path, exist_ok=True)
+        file_path = os.path.join(download_path, os.path.basename(final_filename))
+        temp_path = f"{file_path}.part"
+        
+        sha256 = hashlib.sha256()
+        file_size = 0
+        with open(source_path, 'rb') as src, open(temp_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(64 * 1024), b''):
+                sha256.update(chunk)
+                dst.write(chunk)
+                file_size += len(chunk)
+        os.replace(temp_path, file_path)
+        
+        self.last_export_sha256 = sha256.hexdigest()
+        print(f"✅ {format_type.upper()}格式导出成功: {file_path}")
+        print(f"   文件大小: {file_size} 字节, sha256: {self.last_export_sha256[:16]}...")
+        return file_path
+    
+    @instrument_step()
+    def filter_file_to_namespace(self, file_path: str, file_type: str) -> str:
+        """把只含当前命名空间行的副本（CSV保留表头）写到临时目录，返回副本路径
+
+        副本与原文件同名，原文件不做任何修改；调用方用完后删除副本所在目录。
+        """
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            lines = f.read().splitlines(keepends=True)
+        header = lines[:1] if file_type.lower() == "csv" else []
+        kept = [line for line in lines[len(header):] if line.strip() and self.in_namespace(line)]
+        filtered_path = os.path.join(tempfile.mkdtemp(prefix="ns_import_"), os.path.basename(file_path))
+        with open(filtered_path, 'w', encoding='utf-8', newline='') as f:
+            f.writelines(header + kept)
+        print(f"🏷️ 导入文件按命名空间过滤: 保留 {len(kept)}/{len(lines) - len(header)} 行")
+        return filtered_path
     
     def import_data(self, file_path: str, file_type: str, merge_to_current: bool = False) -> bool:
-        """导入数据"""
+        """导入数据
+
+        设置了命名空间时只导入本命名空间的行，并且总是合并导入：
+        不合并的导入会先清空整张表，会删掉其他并行模块的数据。
+        """
+        prepared = self._prepare_import(file_path, file_type, merge_to_current)
+        if prepared is None:
+            return False
+        file_path, merge_to_current, filtered_dir = prepared
+        try:
+            return self._import_file(file_path, file_type, merge_to_current)
+        finally:
+            if filtered_dir:
+                shutil.rmtree(filtered_dir, ignore_errors=True)
+    
+    def _prepare_import(self, file_path: str, file_type: str,
+                        merge_to_current: bool) -> Optional[Tuple[str, bool, Optional[str]]]:
+        """按命名空间准备导入，返回(实际导入的文件, 是否合并, 需要删除的临时目录)，失败返回None"""
         print(f"📥 导入{file_type.upper()}文件: {os.path.basename(file_path)}")
+        filtered_dir = None
+        if self.namespace:
+            try:
+                file_path = self.filter_file_to_namespace(file_path, file_type)
+                filtered_dir = os.path.dirname(file_path)
+            except Exception as e:
+                print(f"❌ 按命名空间过滤导入文件失败: {e}")
+                return None
+            if not merge_to_current:
+                print("🏷️ 命名空间模式下改为合并导入，避免清空其他数据")
+                merge_to_current = True
         if merge_to_current:
             print("🔀 将勾选'合并到当前数据'选项")
-        
+        return file_path, merge_to_current, filtered_dir
+    
+    def _import_file(self, file_path: str, file_type: str, merge_to_current: bool) -> bool:
+        """通过导入弹窗上传file_path并确认导入"""
         try:
             # 查找导入按钮
             import_button_selectors = [
@@ -664,24 +2005,19 @@ class ImportExportMixin:
                 'input[value="导入"]'
             ]
             
-            import_button_found = False
-            for selector in import_button_selectors:
-                import_buttons = self.page.locator(selector)
-                if import_buttons.count() > 0:
-                    import_button = import_buttons.first
-                    if import_button.is_visible():
-                        import_button.scroll_into_view_if_needed()
-                        import_button.click()
-                        import_button_found = True
-                        break
-            
-            if not import_button_found:
+            found = self.find_element("导入按钮", import_button_selectors)
+            if found:
+                import_button = found[1]
+                import_button.scroll_into_view_if_needed()
+                import_button.click()
+            else:
                 print("❌ 未找到导入按钮")
                 return False
             
             # 等待导入弹窗
-            time.sleep(2)
-            
+            self.waits.until(lambda: self.page.locator('input[type="file"]').count() > 0,
+                             timeout=5, legacy_sleep=2, description="导入弹窗")
+
             # 查找文件选择框
             file_input_selectors = [
                 'input[type="file"]',
@@ -692,28 +2028,25 @@ class ImportExportMixin:
                 'input[class*="fileField"]'
             ]
             
-            file_input_found = False
-            for selector in file_input_selectors:
-                file_inputs = self.page.locator(selector)
-                if file_inputs.count() > 0:
-                    for i in range(file_inputs.count()):
-                        file_input = file_inputs.nth(i)
-                        try:
-                            file_input.set_input_files(file_path)
-                            print(f"✅ 成功选择文件: {os.path.basename(file_path)}")
-                            file_input_found = True
-                            break
-                        except:
-                            continue
-                if file_input_found:
-                    break
+            def try_set_file(selector, file_input):
+                try:
+                    file_input.set_input_files(file_path)
+                    return True
+                except:
+                    return False
+            
+            # 文件输入框通常是隐藏的，不要求可见，能成功设置文件即命中
+            file_input_found = self.find_element("导入文件输入框", file_input_selectors,
+                                                 visible=False, accept=try_set_file) is not None
+            if file_input_found:
+                print(f"✅ 成功选择文件: {os.path.basename(file_path)}")
             
             if not file_input_found:
                 print("❌ 所有文件输入框都无法使用")
                 return False
-            
-            time.sleep(2)
-            
+
+            self.waits.for_dom_quiet(300, legacy_sleep=2, description="选择文件后DOM静默")
+
             # 如果需要勾选合并选项
             if merge_to_current:
                 self._check_merge_option()
@@ -729,40 +2062,24 @@ class ImportExportMixin:
                 '.el-button--primary:has-text("确定")'
             ]
             
-            confirm_button_found = False
-            for selector in confirm_button_selectors:
-                confirm_buttons = self.page.locator(selector)
-                if confirm_buttons.count() > 0:
-                    for i in range(confirm_buttons.count()):
-                        confirm_button = confirm_buttons.nth(i)
-                        if confirm_button.is_visible():
-                            confirm_button.scroll_into_view_if_needed()
-                            confirm_button.click()
-                            confirm_button_found = True
-                            break
-                if confirm_button_found:
-                    break
-            
-            if not confirm_button_found:
+            marker = self.waits.mark()
+            found = self.find_element("确定导入按钮", confirm_button_selectors)
+            if found:
+                confirm_button = found[1]
+                confirm_button.scroll_into_view_if_needed()
+                confirm_button.click()
+            else:
                 print("❌ 未找到确定导入按钮")
                 return False
-            
-            time.sleep(5)
+
+            self.waits.for_action_call(marker, timeout=15, legacy_sleep=2, description="导入响应")
+            self.waits.for_modal_gone(timeout=5, legacy_sleep=1)
+            self.waits.until(lambda: self.waits.row_count() > 0, timeout=5, legacy_sleep=2, description="导入后表格刷新")
             print("✅ 导入操作执行完成")
             
             # 检查导入结果
             try:
-                rows = self.page.locator('table tr:not(:first-child)')
-                imported_count = 0
-                
-                for i in range(rows.count()):
-                    row = rows.nth(i)
-                    cells = row.locator('td')
-                    if cells.count() > 0:
-                        config_name = cells.nth(0).text_content().strip()
-                        if config_name and config_name not in ["拨号名称", "配置名称", "vlanID", "VLAN ID", ""]:
-                            imported_count += 1
-                
+                imported_count = self.count_table_rows()
                 print(f"🔍 导入后配置数量: {imported_count}")
                 
                 if imported_count > 0:
@@ -780,6 +2097,100 @@ class ImportExportMixin:
             print(f"❌ 导入{file_type.upper()}文件时出错: {e}")
             return False
     
+    def bulk_create_enabled(self) -> bool:
+        """是否通过导入文件批量创建配置"""
+        return bool(getattr(self.config, "bulk_create", ""))
+    
+    @staticmethod
+    def read_export_layout(file_path: str, file_type: str) -> List[str]:
+        """从路由器导出的文件中读取列布局：CSV取首行表头，TXT取首行的key=value字段顺序"""
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            if file_type == "csv":
+                return next(csv.reader(f), [])
+            for line in f:
+                if line.strip():
+                    return [token.partition("=")[0] for token in shlex.split(line) if "=" in token]
+        return []
+    
+    def export_layout(self, file_type: str, download_path: str) -> List[str]:
+        """导出一次当前表格，返回路由器实际使用的列布局；失败或无法识别时返回空列表"""
+        layout_file = None
+        try:
+            layout_file = self.export_data(file_type, download_path, f"{self.api_kind or 'profiles'}_layout.{file_type}")
+            if layout_file:
+                return self.read_export_layout(layout_file, file_type)
+        except Exception as e:
+            print(f"⚠️  读取导出文件的列布局失败: {e}")
+        finally:
+            if layout_file and os.path.exists(layout_file):
+                os.remove(layout_file)
+        return []
+    
+    def write_import_file(self, entries: List[Dict], file_path: str, file_type: str,
+                          layout: Optional[List[str]] = None) -> str:
+        """按导出文件的列布局写入导入文件：CSV首行为表头，TXT每行一条 key=value
+
+        layout为路由器导出文件中的列顺序，条目中没有的列留空；为空时按条目的字段顺序写。
+        """
+        fields = list(layout) if layout else (list(entries[0].keys()) if entries else [])
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            if file_type == "csv":
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(fields)
+                for entry in entries:
+                    writer.writerow([entry.get(field, "") for field in fields])
+            else:
+                for entry in entries:
+                    f.write(" ".join(f"{field}={shlex.quote(str(entry.get(field, '')))}" for field in fields) + "\n")
+        return file_path
+    
+    def bulk_import_profiles(self, profiles: List[Dict], file_type: str = None) -> Optional[List[Dict]]:
+        """把profiles写成一个导入文件，一次导入全部创建
+
+        返回表格中已出现的profile；导入失败时返回None，由调用方回退到逐个填写表单。
+        """
+        if not profiles:
+            return []
+        file_type = file_type or getattr(self.config, "bulk_create", "") or "csv"
+        print(f"📦 通过{file_type.upper()}导入文件批量创建{len(profiles)}条配置...")
+        
+        download_path = os.path.abspath("./downloads")
+        os.makedirs(download_path, exist_ok=True)
+        file_path = os.path.join(download_path, f"{self.api_kind or 'profiles'}_bulk.{file_type}")
+        try:
+            entries = [self._profile_to_api_entry(profile) for profile in profiles]
+            layout = self.export_layout(file_type, download_path)
+            if layout and not set(layout) & set(entries[0]):
+                print(f"⚠️  导出文件的列({', '.join(layout[:5])}...)与配置字段对应不上，回退到逐个创建")
+                return None
+            if not layout:
+                print("⚠️  未能从导出文件获得列布局（表格为空或导出失败），按接口字段顺序写入导入文件")
+            self.write_import_file(entries, file_path, file_type, layout)
+            if not self.import_data(file_path, file_type, merge_to_current=True):
+                print("⚠️  批量导入失败，回退到逐个创建")
+                return None
+            
+            # 逐页查找，所有名称都找到后停止翻页
+            missing = {profile[self.profile_name_field] for profile in profiles}
+            for row in self.iter_table_rows():
+                # 按单元格精确比较，避免prefix_1误匹配prefix_10
+                cells = {cell.strip() for cell in row.cells}
+                missing -= cells
+                if not missing:
+                    break
+            created = [profile for profile in profiles if profile[self.profile_name_field] not in missing]
+            if len(created) == len(profiles):
+                print(f"✅ 批量导入完成，{len(created)}条配置全部出现在表格中")
+            else:
+                print(f"⚠️  批量导入后只找到 {len(created)}/{len(profiles)} 条配置，缺少: {', '.join(sorted(missing)[:10])}")
+            return created
+        except Exception as e:
+            print(f"⚠️  批量导入出错，回退到逐个创建: {e}")
+            return None
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    
     def _check_merge_option(self):
         """勾选合并到当前数据选项"""
         print("🔍 查找'合并到当前数据'选项...")
@@ -792,91 +2203,406 @@ class ImportExportMixin:
             'input[type="checkbox"]'
         ]
         
+        def is_merge_option(selector, option):
+            # 通用复选框需要确认其父元素包含"合并到当前数据"
+            if selector == 'input[type="checkbox"]':
+                return "合并到当前数据" in (option.locator('..').text_content() or "")
+            return True
+        
         merge_option_found = False
-        for selector in merge_option_selectors:
+        found = self.find_element("合并到当前数据选项", merge_option_selectors, accept=is_merge_option)
+        if found:
+            selector, option = found
             try:
-                merge_options = self.page.locator(selector)
-                for i in range(merge_options.count()):
-                    option = merge_options.nth(i)
-                    if option.is_visible():
-                        if selector == 'input[type="checkbox"]':
-                            parent = option.locator('..')
-                            parent_text = parent.text_content()
-                            if "合并到当前数据" in parent_text:
-                                if not option.is_checked():
-                                    option.click()
-                                    print("✅ 已勾选'合并到当前数据'选项")
-                                else:
-                                    print("✅ '合并到当前数据'选项已经勾选")
-                                merge_option_found = True
-                                break
-                        else:
-                            option.click()
-                            print("✅ 已勾选'合并到当前数据'选项")
-                            merge_option_found = True
-                            break
-                if merge_option_found:
-                    break
+                if selector == 'input[type="checkbox"]' and option.is_checked():
+                    print("✅ '合并到当前数据'选项已经勾选")
+                else:
+                    option.click()
+                    print("✅ 已勾选'合并到当前数据'选项")
+                merge_option_found = True
             except Exception as e:
-                continue
+                print(f"⚠️  勾选'合并到当前数据'选项失败: {e}")
         
         if not merge_option_found:
             print("⚠️  未找到'合并到当前数据'选项，继续执行导入")
 
-class RouterTestModule(BaseTestModule, TableOperationsMixin, SearchOperationsMixin, FormOperationsMixin, ImportExportMixin):
+class ApiFixtureMixin(ABC):
+    """接口前置/清理混入类 - 通过/Action/call直接准备和清理数据
+
+    子类设置api_kind（vlan/pptp/l2tp）并实现_profile_to_api_entry（抽象方法，未实现时无法实例化）。
+    """
+    
+    api_kind: str = ""
+    _api_client: Optional[RouterApiClient] = None
+    
+    def api_fixtures_enabled(self) -> bool:
+        """是否启用接口前置/清理"""
+        return bool(self.api_kind) and getattr(self.config, "use_api_fixtures", False)
+    
+    def get_api_client(self) -> RouterApiClient:
+        """获取（必要时创建并登录）接口客户端"""
+        if self._api_client is None:
+            self._api_client = RouterApiClient.from_config(self.config)
+            self._api_client.login()
+        return self._api_client
+    
+    @abstractmethod
+    def _profile_to_api_entry(self, profile: Dict) -> Dict:
+        """把测试用的配置字典转换为接口参数"""
+    
+    def api_create_profiles(self, profiles: List[Dict]) -> Optional[List[Dict]]:
+        """通过接口批量创建配置，返回创建成功的profile；接口不可用时返回None"""
+        print(f"⚡ 通过接口批量创建{len(profiles)}条{self.api_kind.upper()}配置...")
+        try:
+            client = self.get_api_client()
+            created = []
+            for profile in profiles:
+                try:
+                    client.add(self.api_kind, self._profile_to_api_entry(profile))
+                    created.append(profile)
+                except RouterApiError as e:
+                    print(f"⚠️  接口创建失败: {e}")
+            print(f"✅ 接口创建完成: {len(created)}/{len(profiles)}")
+            return created
+        except Exception as e:
+            print(f"⚠️  接口不可用，回退到UI操作: {e}")
+            return None
+    
+    def api_cleanup_all(self) -> bool:
+        """通过接口删除所有配置（设置了命名空间时只删除本命名空间的配置）"""
+        print(f"⚡ 通过接口清理所有{self.api_kind.upper()}配置...")
+        try:
+            predicate = None
+            if self.namespace:
+                predicate = lambda entry: self.in_namespace(" ".join(str(value) for value in entry.values()))
+            deleted = self.get_api_client().delete_all(self.api_kind, predicate)
+            print(f"✅ 接口删除 {deleted} 条配置")
+            return True
+        except Exception as e:
+            print(f"⚠️  接口清理失败，回退到UI操作: {e}")
+            return False
+    
+    def refresh_after_api(self):
+        """接口修改数据后刷新页面，让表格显示最新数据"""
+        self.page.reload()
+        self.waits.for_dom_quiet(300, timeout=8, legacy_sleep=3, description="接口操作后刷新")
+        self.navigate_to_module()
+
+class RouterTestModule(BaseTestModule, TableOperationsMixin, SearchOperationsMixin, FormOperationsMixin, ImportExportMixin, ApiFixtureMixin):
     """路由器测试模块基类，组合所有功能"""
     pass
 
+class BrowserPool:
+    """浏览器池 - 常驻Chromium进程，按模块/步骤分配隔离的浏览器上下文
+
+    size个浏览器进程轮流分配；每个进程使用max_uses次（分配的上下文数）后回收重启，
+    单个浏览器（含其子进程）内存超过max_memory_mb（需要psutil）时也会回收。
+    断开连接的浏览器在分配前替换，不会交给新的上下文。
+    Playwright同步API不是线程安全的，浏览器池只能在创建它的线程中使用。
+    """
+
+    def __init__(self, playwright, size: int = 1, headless: bool = False, slow_mo: int = 100,
+                 max_uses: int = 20, max_memory_mb: Optional[float] = None):
+        self.playwright = playwright
+        self.size = max(1, size)
+        self.headless = headless
+        self.slow_mo = slow_mo
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.slots: List[Dict[str, Any]] = []
+        self.context_slots: Dict[int, Dict[str, Any]] = {}
+        self.next_slot = 0
+        self.launch_count = 0
+        self.recycle_count = 0
+        self.context_count = 0
+
+    @staticmethod
+    def _chromium_processes() -> Dict[int, int]:
+        """当前进程下的Chromium子进程 {pid: 父pid}，没有psutil时为空"""
+        processes = {}
+        if psutil is None:
+            return processes
+        try:
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    if "chrom" in child.name().lower():
+                        processes[child.pid] = child.ppid()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except Exception:
+            pass
+        return processes
+
+    def _launch(self) -> Dict[str, Any]:
+        """启动一个浏览器进程，并记下它的主进程pid（用于按浏览器统计内存）"""
+        before = self._chromium_processes()
+        browser = self.playwright.chromium.launch(headless=self.headless, slow_mo=self.slow_mo)
+        self.launch_count += 1
+        started = {pid: ppid for pid, ppid in self._chromium_processes().items() if pid not in before}
+        roots = [pid for pid, ppid in started.items() if ppid not in started]
+        return {"browser": browser, "uses": 0, "active": 0, "pid": roots[0] if len(roots) == 1 else None}
+
+    @staticmethod
+    def _connected(slot: Dict[str, Any]) -> bool:
+        try:
+            return slot["browser"].is_connected()
+        except Exception:
+            return False
+
+    def _healthy(self, slot: Dict[str, Any]) -> bool:
+        """健康检查：进程仍连接且未达到使用次数上限"""
+        return self._connected(slot) and slot["uses"] < self.max_uses
+
+    def browser_memory_mb(self, slot: Dict[str, Any]) -> Optional[float]:
+        """单个浏览器主进程及其子进程的内存占用（MB），没有psutil或未识别到pid时返回None"""
+        if psutil is None or not slot.get("pid"):
+            return None
+        try:
+            process = psutil.Process(slot["pid"])
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except Exception:
+            return None
+        return total / 1024 / 1024
+
+    def _recycle(self, index: int):
+        """关闭并重启指定的浏览器进程（断开的浏览器上残留的上下文一并作废）"""
+        slot = self.slots[index]
+        try:
+            slot["browser"].close()
+        except Exception:
+            pass
+        self.recycle_count += 1
+        self.slots[index] = self._launch()
+
+    def _pick_slot(self) -> int:
+        """轮询选择健康的浏览器，必要时启动、替换或回收
+
+        断开连接的浏览器直接替换；达到使用次数上限的浏览器空闲时回收，
+        仍有活动上下文时跳过。所有浏览器都不可用时临时多启动一个。
+        """
+        if len(self.slots) < self.size:
+            self.slots.append(self._launch())
+            return len(self.slots) - 1
+        for _ in range(len(self.slots)):
+            index = self.next_slot % len(self.slots)
+            self.next_slot += 1
+            slot = self.slots[index]
+            if self._healthy(slot):
+                return index
+            if not self._connected(slot):
+                print(f"♻️  浏览器进程 #{index + 1} 已断开，替换")
+                self._recycle(index)
+                return index
+            if slot["active"] == 0:
+                print(f"♻️  回收浏览器进程 #{index + 1}（已使用{slot['uses']}次）")
+                self._recycle(index)
+                return index
+        print(f"⚠️  {len(self.slots)}个浏览器都在使用中且已达使用上限，临时增加一个")
+        self.slots.append(self._launch())
+        return len(self.slots) - 1
+
+    def acquire(self, storage_state: Optional[str] = None):
+        """分配一个新的隔离上下文"""
+        index = self._pick_slot()
+        slot = self.slots[index]
+        if storage_state:
+            context = slot["browser"].new_context(storage_state=storage_state)
+        else:
+            context = slot["browser"].new_context()
+        slot["uses"] += 1
+        slot["active"] += 1
+        self.context_count += 1
+        self.context_slots[id(context)] = slot
+        return context
+
+    def release(self, context):
+        """关闭上下文，检查内存阈值"""
+        slot = self.context_slots.pop(id(context), None)
+        try:
+            context.close()
+        except Exception:
+            pass
+        if slot is None:
+            return
+        slot["active"] -= 1
+        # 分配时已被替换的浏览器不再处理
+        index = next((i for i, item in enumerate(self.slots) if item is slot), None)
+        if index is None or slot["active"] > 0:
+            return
+        if len(self.slots) > self.size and not self._healthy(slot):
+            # 临时增加的浏览器用完后关闭，池恢复到size个
+            try:
+                slot["browser"].close()
+            except Exception:
+                pass
+            self.slots.pop(index)
+            return
+        if self.max_memory_mb:
+            memory = self.browser_memory_mb(slot)
+            if memory is not None and memory > self.max_memory_mb:
+                print(f"♻️  浏览器进程 #{index + 1} 内存 {memory:.0f}MB 超过阈值 {self.max_memory_mb:.0f}MB，回收")
+                self._recycle(index)
+
+    def browser_for(self, context):
+        """上下文所属的浏览器"""
+        slot = self.context_slots.get(id(context))
+        return slot["browser"] if slot else None
+
+    def close(self):
+        """关闭所有浏览器进程"""
+        for slot in self.slots:
+            try:
+                slot["browser"].close()
+            except Exception:
+                pass
+        self.slots = []
+        print(f"🌐 浏览器池: 启动{self.launch_count}次, 回收{self.recycle_count}次, 分配上下文{self.context_count}个")
+
 class TestRunner:
-    """测试运行器"""
+    """测试运行器（浏览器池复用浏览器进程）"""
+    
+    # 常驻工作进程（worker_pool.py）设置的共享浏览器池：设置后模块脚本不再各自启动Playwright和浏览器
+    shared_pool: Optional["BrowserPool"] = None
     
-    def __init__(self, config: RouterTestConfig, headless: bool = False):
+    def __init__(self, config: RouterTestConfig, headless: bool = False, pool_size: int = 1,
+                 max_uses: int = 20, max_memory_mb: Optional[float] = None, isolate_steps: bool = False):
         self.config = config
         self.headless = headless
+        self.pool_size = pool_size
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.isolate_steps = isolate_steps
+        self.pool: Optional[BrowserPool] = None
         self.browser = None
         self.page = None
+    
+    def _create_pool(self, playwright) -> BrowserPool:
+        """创建浏览器池"""
+        return BrowserPool(playwright, size=self.pool_size, headless=self.headless, slow_mo=100,
+                           max_uses=self.max_uses, max_memory_mb=self.max_memory_mb)
         
     def run_test_module(self, module_class, test_methods: List[str] = None):
         """运行测试模块"""
+        if self.pool is not None:
+            return self._run_with_pool(module_class, test_methods)
+        
+        if TestRunner.shared_pool is not None:
+            self.pool = TestRunner.shared_pool
+            try:
+                return self._run_with_pool(module_class, test_methods)
+            finally:
+                self.pool = None
+        
         with sync_playwright() as p:
-            self.browser = p.chromium.launch(headless=self.headless, slow_mo=100)
-            self.page = self.browser.new_page()
-            
+            self.pool = self._create_pool(p)
             try:
-                # 创建测试模块实例
-                module = module_class(self.config)
-                module.setup(self.page)
-                
-                # 登录
+                return self._run_with_pool(module_class, test_methods)
+            finally:
+                self.pool.close()
+                self.pool = None
+    
+    def run_suite(self, module_classes: List, test_methods: List[str] = None) -> Dict[str, bool]:
+        """在同一个浏览器池中依次运行多个模块，浏览器只启动一次"""
+        results = {}
+        with sync_playwright() as p:
+            self.pool = self._create_pool(p)
+            try:
+                for module_class in module_classes:
+                    print(f"\n{'=' * 20} {module_class.__name__} {'=' * 20}")
+                    try:
+                        self._run_with_pool(module_class, test_methods)
+                        results[module_class.__name__] = True
+                    except Exception as e:
+                        print(f"❌ 模块 {module_class.__name__} 失败: {e}")
+                        results[module_class.__name__] = False
+            finally:
+                self.pool.close()
+                self.pool = None
+        
+        passed = sum(1 for ok in results.values() if ok)
+        print(f"\n📊 套件完成: {passed}/{len(results)} 个模块通过")
+        return results
+    
+    def _run_with_pool(self, module_class, test_methods: List[str] = None):
+        """按模块（或按步骤）分配上下文运行"""
+        if self.isolate_steps and test_methods:
+            for method_name in test_methods:
+                self._run_in_context(module_class, [method_name])
+        else:
+            self._run_in_context(module_class, test_methods)
+    
+    def _run_in_context(self, module_class, test_methods: List[str] = None):
+        """在一个新的隔离上下文中运行模块"""
+        # 加载已保存的登录态（同一路由器+账号只需登录一次）
+        state_path = None
+        if getattr(self.config, "reuse_session", False):
+            state_path = SessionStore(self.config.session_state_dir).load(self.config)
+        context = self.pool.acquire(storage_state=state_path)
+        self.browser = self.pool.browser_for(context)
+        
+        # 拦截非必要资源、缓存静态JS/CSS
+        routing = RoutingProfile.from_config(self.config)
+        if routing:
+            routing.attach(context)
+        self.page = context.new_page()
+        
+        # 创建测试模块实例
+        module = module_class(self.config)
+        module.setup(self.page)
+        module.session_restored = bool(state_path)
+
+        module.events.emit({"event": "module_start", "methods": test_methods or ["run_full_test"]})
+        module_start = time.perf_counter()
+        outcome = "passed"
+        try:
+            # 登录
+            with module.step_span("step1_login"):
                 module.login()
-                
-                # 导航到模块页面
+            
+            # 导航到模块页面
+            with module.step_span("step2_navigate"):
                 module.navigate_to_module()
-                
-                # 运行指定的测试方法
-                if test_methods:
-                    for method_name in test_methods:
-                        if hasattr(module, method_name):
-                            print(f"\n=== 运行测试方法: {method_name} ===")
-                            method = getattr(module, method_name)
-                            method()
-                        else:
-                            print(f"警告: 测试模块中不存在方法 {method_name}")
-                else:
-                    # 运行默认的完整测试
-                    if hasattr(module, 'run_full_test'):
-                        module.run_full_test()
+            
+            # 运行指定的测试方法
+            if test_methods:
+                for method_name in test_methods:
+                    if hasattr(module, method_name):
+                        print(f"\n=== 运行测试方法: {method_name} ===")
+                        method = getattr(module, method_name)
+                        method()
                     else:
-                        print("警告: 测试模块中没有 run_full_test 方法")
-                
-                print("\n✅ 所有测试完成")
-                
-            except Exception as e:
-                print(f"❌ 测试失败: {e}")
-                # 截图保存错误
-                error_screenshot = f"error_{module_class.__name__}.png"
-                self.page.screenshot(path=error_screenshot)
-                print(f"错误截图已保存: {error_screenshot}")
-                raise
-            finally:
-                self.browser.close()
\ No newline at end of file
+                        print(f"警告: 测试模块中不存在方法 {method_name}")
+            else:
+                # 运行默认的完整测试
+                if hasattr(module, 'run_full_test'):
+                    module.run_full_test()
+                else:
+                    print("警告: 测试模块中没有 run_full_test 方法")
+            
+            print("\n✅ 所有测试完成")
+            
+        except Exception as e:
+            outcome = "failed"
+            print(f"❌ 测试失败: {e}")
+            # 截图保存错误
+            error_screenshot = f"error_{module_class.__name__}.png"
+            self.page.screenshot(path=error_screenshot)
+            print(f"错误截图已保存: {error_screenshot}")
+            raise
+        finally:
+            module.events.emit({"event": "module_end", "outcome": outcome,
+                                "wall_ms": round((time.perf_counter() - module_start) * 1000, 1)})
+            module.waits.report()
+            module.waits.close()
+            module.selector_cache.report()
+            if getattr(module, "_api_client", None):
+                print(f"⚡ 接口调用次数: {module._api_client.call_count}")
+                module._api_client.close()
+            if routing:
+                routing.report()
+            self.pool.release(context)
\ No newline at end of file
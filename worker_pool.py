@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""常驻工作进程池
+
+每个工作进程启动时预先导入Playwright和test_framework并启动浏览器，之后通过管道
+（stdin/stdout上的JSON Lines）接收模块脚本任务：在进程内以__main__方式运行脚本，
+浏览器由TestRunner.shared_pool共享，逐行回传输出，最后回传结构化结果。
+只有进程崩溃或内存比首个任务后增长超过阈值时才重启工作进程。
+
+协议（每行一个JSON对象）：
+    父 -> 子:  {"type": "job", "id": 1, "script": "...", "args": [...], "env": {...}, "cwd": "..."}
+               {"type": "stop"}
+    子 -> 父:  {"type": "ready", "pid": 123, "startup_s": 2.1}
+               {"type": "output", "id": 1, "line": "..."}
+               {"type": "result", "id": 1, "return_code": 0, "error": "", "duration_s": 12.3, "memory_mb": 480.0}
+
+用法（由GUI等调用方使用）：
+    pool = WorkerPool(size=2)
+    result = pool.run(script_path, args, env={...}, on_output=print)
+    pool.shutdown()
+"""
+import argparse
+import json
+import os
+import queue
+import runpy
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import psutil  # 可选：统计工作进程（含浏览器）的内存
+except ImportError:
+    psutil = None
+
+WORKER_SCRIPT = os.path.abspath(__file__)
+
+# 工作进程内存（含Chromium）比首个任务完成后增长超过该值（MB）时重启
+DEFAULT_MAX_MEMORY_GROWTH_MB = 800.0
+
+# 等待工作进程预加载完成的超时时间，秒
+WORKER_STARTUP_TIMEOUT = 120.0
+
+def process_memory_mb(pid: Optional[int] = None) -> Optional[float]:
+    """进程及其所有子进程的内存占用（MB），没有psutil时返回None"""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(pid)
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    except Exception:
+        return None
+    return total / 1024 / 1024
+
+class WorkerCrashed(Exception):
+    """工作进程在任务执行中退出"""
+
+class _Worker:
+    """父进程一侧的工作进程句柄：启动进程，后台线程把子进程消息放入队列"""
+
+    def __init__(self, index: int, headless: bool):
+        self.index = index
+        self.headless = headless
+        self.messages: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self.baseline_mb: Optional[float] = None
+        self.jobs_done = 0
+        cmd = [sys.executable, '-u', WORKER_SCRIPT, '--worker']
+        if headless:
+            cmd.append('--headless')
+        env = os.environ.copy()
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['PYTHONUNBUFFERED'] = '1'
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+                                        encoding='utf-8', errors='replace', env=env,
+                                        cwd=os.path.dirname(WORKER_SCRIPT), bufsize=1)
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            try:
+                self.messages.put(json.loads(line))
+            except ValueError:
+                # 不是协议消息（例如子进程直接写了标准输出），当作普通输出
+                self.messages.put({"type": "output", "id": None, "line": line.rstrip()})
+        self.messages.put(None)
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def send(self, message: Dict[str, Any]):
+        self.process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+        self.process.stdin.flush()
+
+    def wait_ready(self, timeout: float = WORKER_STARTUP_TIMEOUT) -> Dict[str, Any]:
+        """等待预加载完成，期间的输出丢弃"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                message = self.messages.get(timeout=max(0.1, deadline - time.monotonic()))
+            except queue.Empty:
+                raise WorkerCrashed(f"工作进程 #{self.index} 启动超时（{timeout:.0f}秒）")
+            if message is None:
+                raise WorkerCrashed(f"工作进程 #{self.index} 启动失败，退出码: {self.process.poll()}")
+            if message.get("type") == "ready":
+                return message
+
+    def stop(self, timeout: float = 10.0):
+        """请求工作进程退出，超时则强制结束"""
+        if self.alive():
+            try:
+                self.send({"type": "stop"})
+                self.process.wait(timeout=timeout)
+            except Exception:
+                pass
+        self.kill()
+
+    def kill(self):
+        """强制结束并回收进程（进程正在退出时也等待它结束）"""
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except Exception:
+            pass
+
+class WorkerPool:
+    """常驻工作进程池 - 模块脚本在预加载了Playwright和浏览器的工作进程中运行
+
+    run()可以从多个线程同时调用，最多size个任务并行；工作进程按需启动，
+    崩溃、被取消或内存增长超过max_memory_growth_mb后才重启。
+    """
+
+    def __init__(self, size: int = 1, headless: bool = False,
+                 max_memory_growth_mb: Optional[float] = DEFAULT_MAX_MEMORY_GROWTH_MB,
+                 log: Callable[[str], None] = print):
+        self.size = max(1, size)
+        self.headless = headless
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.log = log
+        self.idle: "queue.Queue[_Worker]" = queue.Queue()
+        self.workers: List[_Worker] = []
+        self.lock = threading.Lock()
+        self.started = 0
+        self.job_counter = 0
+        self.restart_count = 0
+        self.closed = False
+
+    def _start_worker(self, index: int) -> _Worker:
+        start = time.perf_counter()
+        worker = _Worker(index, self.headless)
+        ready = worker.wait_ready()
+        self.log(f"🧰 工作进程 #{index} 已就绪 (pid {ready.get('pid')}，预加载 {time.perf_counter() - start:.1f}s)")
+        return worker
+
+    def _acquire(self) -> _Worker:
+        """取一个空闲工作进程，没有空闲且未达上限时启动新的"""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("工作进程池已关闭")
+            spawn = self.idle.empty() and self.started < self.size
+            if spawn:
+                self.started += 1
+                index = self.started
+        if spawn:
+            try:
+                worker = self._start_worker(index)
+            except Exception:
+                with self.lock:
+                    self.started -= 1
+                raise
+            with self.lock:
+                self.workers.append(worker)
+            return worker
+        worker = self.idle.get()
+        if not worker.alive():
+            worker = self._replace(worker, "进程已退出")
+        return worker
+
+    def _replace(self, worker: _Worker, reason: str) -> _Worker:
+        """重启一个工作进程；启动失败时把旧句柄放回空闲队列，下次取用时再试"""
+        self.log(f"♻️  重启工作进程 #{worker.index}（{reason}）")
+        worker.kill()
+        try:
+            new_worker = self._start_worker(worker.index)
+        except Exception:
+            self.idle.put(worker)
+            raise
+        with self.lock:
+            self.workers[self.workers.index(worker)] = new_worker
+            self.restart_count += 1
+        return new_worker
+
+    def _release(self, worker: _Worker, memory_mb: Optional[float]):
+        """任务结束后放回空闲队列；内存增长超过阈值时先停止，下次取用时重启"""
+        worker.jobs_done += 1
+        if worker.alive() and memory_mb is not None and self.max_memory_growth_mb:
+            if worker.baseline_mb is None:
+                worker.baseline_mb = memory_mb
+            elif memory_mb - worker.baseline_mb > self.max_memory_growth_mb:
+                self.log(f"♻️  工作进程 #{worker.index} 内存 {worker.baseline_mb:.0f}MB -> {memory_mb:.0f}MB，"
+                         f"超过增长阈值 {self.max_memory_growth_mb:.0f}MB")
+                worker.stop()
+        self.idle.put(worker)
+
+    def run(self, script: str, args: List[str] = None, env: Dict[str, str] = None, cwd: str = None,
+            on_output: Callable[[str], None] = None,
+            should_cancel: Callable[[], bool] = None) -> Dict[str, Any]:
+        """在工作进程中运行一个模块脚本，返回{"return_code", "error", "duration_s", "memory_mb", "worker"}"""
+        with self.lock:
+            self.job_counter += 1
+            job_id = self.job_counter
+        worker = self._acquire()
+        start = time.perf_counter()
+        result: Dict[str, Any] = {}
+        try:
+            worker.send({"type": "job", "id": job_id, "script": os.path.abspath(script), "args": list(args or []),
+                         "env": dict(env or {}), "cwd": cwd or os.path.dirname(os.path.abspath(script))})
+            while True:
+                if should_cancel and should_cancel():
+                    # 取消时直接结束工作进程（浏览器随之退出），下次使用时重启
+                    worker.kill()
+                    result = {"return_code": None, "error": "已取消"}
+                    break
+                try:
+                    message = worker.messages.get(timeout=0.2)
+                except queue.Empty:
+                    if not worker.alive():
+                        raise WorkerCrashed(f"工作进程 #{worker.index} 异常退出，退出码: {worker.process.poll()}")
+                    continue
+                if message is None:
+                    worker.kill()
+                    raise WorkerCrashed(f"工作进程 #{worker.index} 异常退出，退出码: {worker.process.poll()}")
+                if message.get("type") == "output":
+                    if on_output:
+                        on_output(message.get("line", ""))
+                elif message.get("type") == "result" and message.get("id") == job_id:
+                    result = message
+                    break
+        except (WorkerCrashed, OSError) as e:
+            worker.kill()
+            result = {"return_code": None, "error": str(e)}
+        finally:
+            self._release(worker, result.get("memory_mb"))
+
+        result.setdefault("duration_s", round(time.perf_counter() - start, 1))
+        result["worker"] = worker.index
+        return result
+
+    def shutdown(self):
+        """停止所有工作进程"""
+        with self.lock:
+            self.closed = True
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.stop()
+        if workers:
+            self.log(f"🧰 工作进程池已关闭（重启 {self.restart_count} 次）")
+
+# ----------------------------------------------------------------------
+# 工作进程一侧
+# ----------------------------------------------------------------------
+
+class _PipeWriter:
+    """替换工作进程的sys.stdout/sys.stderr：按行封装成output消息写入协议管道"""
+
+    def __init__(self, channel, lock: threading.Lock):
+        self.channel = channel
+        self.lock = lock
+        self.job_id = None
+        self.buffer = ""
+        self.encoding = "utf-8"
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        while "\n" in self.buffer:
+            line, self.buffer = self.buffer.split("\n", 1)
+            _send(self.channel, self.lock, {"type": "output", "id": self.job_id, "line": line})
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            _send(self.channel, self.lock, {"type": "output", "id": self.job_id, "line": self.buffer})
+            self.buffer = ""
+
+    def isatty(self) -> bool:
+        return False
+
+def _send(channel, lock: threading.Lock, message: Dict[str, Any]):
+    with lock:
+        channel.write(json.dumps(message, ensure_ascii=False) + "\n")
+        channel.flush()
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """在当前进程中以__main__方式运行模块脚本，临时替换argv/环境变量/工作目录"""
+    saved_argv, saved_path, saved_cwd = sys.argv, list(sys.path), os.getcwd()
+    saved_env = {key: os.environ.get(key) for key in job.get("env", {})}
+    os.environ.update(job.get("env", {}))
+    sys.argv = [job["script"]] + job.get("args", [])
+    start = time.perf_counter()
+    return_code, error = 0, ""
+    try:
+        os.chdir(job.get("cwd") or os.path.dirname(job["script"]))
+        runpy.run_path(job["script"], run_name="__main__")
+    except SystemExit as e:
+        return_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException as e:
+        return_code, error = 1, f"{type(e).__name__}: {e}"
+        sys.stdout.flush()
+        traceback.print_exc()
+    finally:
+        sys.argv, sys.path[:] = saved_argv, saved_path
+        os.chdir(saved_cwd)
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    return {"return_code": return_code, "error": error, "duration_s": round(time.perf_counter() - start, 1)}
+
+def worker_main(headless: bool = False) -> int:
+    """工作进程入口：预加载后循环处理stdin上的任务"""
+    start = time.perf_counter()
+    # 协议使用原始标准输出；脚本里的print和误写到fd 1的内容都改走stderr/输出消息
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    lock = threading.Lock()
+    writer = _PipeWriter(channel, lock)
+    sys.stdout = sys.stderr = writer
+
+    sys.path.insert(0, os.path.dirname(WORKER_SCRIPT))
+    from playwright.sync_api import sync_playwright
+    from test_framework import BrowserPool, TestRunner
+
+    playwright = sync_playwright().start()
+    pool = BrowserPool(playwright, size=1, headless=headless, slow_mo=100)
+    # 先启动浏览器，第一个任务不再等待
+    pool.release(pool.acquire())
+    TestRunner.shared_pool = pool
+    _send(channel, lock, {"type": "ready", "pid": os.getpid(), "startup_s": round(time.perf_counter() - start, 1)})
+
+    try:
+        for line in sys.stdin:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("type") == "stop":
+                break
+            if message.get("type") != "job":
+                continue
+            writer.job_id = message.get("id")
+            result = _run_job(message)
+            writer.flush()
+            result.update({"type": "result", "id": message.get("id"), "memory_mb": process_memory_mb()})
+            writer.job_id = None
+            _send(channel, lock, result)
+    finally:
+        TestRunner.shared_pool = None
+        pool.close()
+        playwright.stop()
+    return 0
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='常驻工作进程（由WorkerPool启动）')
+    parser.add_argument('--worker', action='store_true', help='以工作进程方式运行')
+    parser.add_argument('--headless', action='store_true', help='无头模式运行浏览器')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    if not args.worker:
+        print("worker_pool.py 由WorkerPool启动，不直接运行")
+        sys.exit(2)
+    sys.exit(worker_main(headless=args.headless))